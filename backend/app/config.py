@@ -9,10 +9,101 @@ class Settings(BaseSettings):
     db_password: str = Field(default="", env="DB_PASSWORD")
     db_database: str = Field(default="", env="DB_DATABASE")
     
+    # Backend for the local database: "mysql", or "sqlite" for an embedded
+    # database file (benchmarks, single-node deployments; needs aiosqlite)
+    db_backend: str = Field(default="mysql", env="DB_BACKEND")
+    db_sqlite_path: str = Field(default="data/tfrtita.sqlite3", env="DB_SQLITE_PATH")
+    db_sqlite_busy_timeout: float = Field(default=5.0, env="DB_SQLITE_BUSY_TIMEOUT")
+    
     # External database configuration
     use_external_db: bool = Field(default=False, env="USE_EXTERNAL_DB")
     external_db_config: str = Field(default="", env="EXTERNAL_DB_CONFIG")
     
+    # Optional read replica (same JSON shape as EXTERNAL_DB_CONFIG) for SELECT-only traffic
+    read_replica_config: str = Field(default="", env="READ_REPLICA_CONFIG")
+    
+    # Query retry budget and circuit breaker
+    db_request_deadline: float = Field(default=5.0, env="DB_REQUEST_DEADLINE")
+    db_retry_delay: float = Field(default=0.1, env="DB_RETRY_DELAY")
+    db_breaker_failure_threshold: int = Field(default=5, env="DB_BREAKER_FAILURE_THRESHOLD")
+    db_breaker_reset_timeout: float = Field(default=10.0, env="DB_BREAKER_RESET_TIMEOUT")
+    
+    # Connection pool sizing: DB_POOL_MINSIZE connections are opened at startup,
+    # the pool then grows or shrinks with measured acquire waits up to DB_POOL_MAXSIZE
+    db_pool_minsize: int = Field(default=2, env="DB_POOL_MINSIZE")
+    db_pool_maxsize: int = Field(default=20, env="DB_POOL_MAXSIZE")
+    db_pool_target_wait_ms: float = Field(default=20.0, env="DB_POOL_TARGET_WAIT_MS")
+    db_pool_resize_interval: float = Field(default=5.0, env="DB_POOL_RESIZE_INTERVAL")
+    
+    # Write-behind mirror of external writes into the local database; entries past
+    # MIRROR_QUEUE_MAXSIZE wait in the spool file rather than in memory
+    mirror_queue_maxsize: int = Field(default=10000, env="MIRROR_QUEUE_MAXSIZE")
+    mirror_batch_size: int = Field(default=200, env="MIRROR_BATCH_SIZE")
+    mirror_flush_interval: float = Field(default=0.5, env="MIRROR_FLUSH_INTERVAL")
+    mirror_spool_path: str = Field(default="mirror_spool.jsonl", env="MIRROR_SPOOL_PATH")
+    
+    # Hot failover from the external to the local database
+    db_failover_probe_interval: float = Field(default=0.25, env="DB_FAILOVER_PROBE_INTERVAL")
+    db_failover_probe_timeout: float = Field(default=0.5, env="DB_FAILOVER_PROBE_TIMEOUT")
+    db_failover_failure_threshold: int = Field(default=2, env="DB_FAILOVER_FAILURE_THRESHOLD")
+    db_failover_recovery_threshold: int = Field(default=4, env="DB_FAILOVER_RECOVERY_THRESHOLD")
+    failover_replay_maxsize: int = Field(default=100000, env="FAILOVER_REPLAY_MAXSIZE")
+    failover_replay_spool_path: str = Field(default="failover_replay.jsonl", env="FAILOVER_REPLAY_SPOOL_PATH")
+    
+    # Slow-query log: statements slower than the threshold are kept with their EXPLAIN plan
+    slow_query_threshold_ms: float = Field(default=500.0, env="SLOW_QUERY_THRESHOLD_MS")
+    slow_query_log_size: int = Field(default=200, env="SLOW_QUERY_LOG_SIZE")
+    slow_query_explain: bool = Field(default=True, env="SLOW_QUERY_EXPLAIN")
+    
+    # Query result cache (entries are opt-in per query via cache_ttl)
+    query_cache_max_entries: int = Field(default=1000, env="QUERY_CACHE_MAX_ENTRIES")
+    dashboard_cache_ttl: float = Field(default=10.0, env="DASHBOARD_CACHE_TTL")
+    
+    # Users looked up by token verification are cached for USER_CACHE_TTL seconds,
+    # unknown usernames for USER_CACHE_NEGATIVE_TTL; writes to users clear the cache
+    user_cache_ttl: float = Field(default=30.0, env="USER_CACHE_TTL")
+    user_cache_negative_ttl: float = Field(default=5.0, env="USER_CACHE_NEGATIVE_TTL")
+    user_cache_max_entries: int = Field(default=10000, env="USER_CACHE_MAX_ENTRIES")
+    
+    # Verified JWT claims are memoized until the token expires; logged out tokens
+    # are revoked in memory and in revoked_tokens, reloaded every refresh interval
+    token_cache_max_entries: int = Field(default=10000, env="TOKEN_CACHE_MAX_ENTRIES")
+    token_revocation_capacity: int = Field(default=100000, env="TOKEN_REVOCATION_CAPACITY")
+    token_revocation_refresh_interval: float = Field(default=30.0, env="TOKEN_REVOCATION_REFRESH_INTERVAL")
+    
+    # bcrypt runs on PASSWORD_HASH_WORKERS threads; beyond PASSWORD_HASH_MAX_QUEUE
+    # waiting jobs logins are turned away. Login attempts are rate limited per
+    # username and per client IP.
+    password_hash_workers: int = Field(default=2, env="PASSWORD_HASH_WORKERS")
+    password_hash_max_queue: int = Field(default=32, env="PASSWORD_HASH_MAX_QUEUE")
+    login_attempts_per_minute: float = Field(default=10.0, env="LOGIN_ATTEMPTS_PER_MINUTE")
+    login_attempt_burst: int = Field(default=5, env="LOGIN_ATTEMPT_BURST")
+    
+    # Requests per second (and burst) per user and route for the UI API, and per
+    # route for Twilio webhooks; idle buckets are dropped after RATE_LIMIT_IDLE_SECONDS
+    rate_limit_enabled: bool = Field(default=True, env="RATE_LIMIT_ENABLED")
+    rate_limit_ui_rate: float = Field(default=10.0, env="RATE_LIMIT_UI_RATE")
+    rate_limit_ui_burst: int = Field(default=40, env="RATE_LIMIT_UI_BURST")
+    rate_limit_webhook_rate: float = Field(default=50.0, env="RATE_LIMIT_WEBHOOK_RATE")
+    rate_limit_webhook_burst: int = Field(default=200, env="RATE_LIMIT_WEBHOOK_BURST")
+    rate_limit_idle_seconds: float = Field(default=300.0, env="RATE_LIMIT_IDLE_SECONDS")
+    rate_limit_max_keys: int = Field(default=100000, env="RATE_LIMIT_MAX_KEYS")
+    rate_limit_webhook_paths: str = Field(default="/api/calls/incoming-call,/api/calls/status", env="RATE_LIMIT_WEBHOOK_PATHS")
+    rate_limit_exempt_paths: str = Field(default="/health,/api/health,/metrics", env="RATE_LIMIT_EXEMPT_PATHS")
+    
+    # Calls older than this move from calls to calls_archive
+    call_archive_after_days: int = Field(default=90, env="CALL_ARCHIVE_AFTER_DAYS")
+    call_archive_batch_size: int = Field(default=500, env="CALL_ARCHIVE_BATCH_SIZE")
+    call_archive_interval: float = Field(default=3600.0, env="CALL_ARCHIVE_INTERVAL")
+    
+    # Log retention (days; 0 keeps rows forever). Monitor samples older than
+    # SYSTEM_MONITOR_RAW_RETENTION_DAYS are folded into hourly aggregates.
+    error_log_retention_days: int = Field(default=30, env="ERROR_LOG_RETENTION_DAYS")
+    system_monitor_raw_retention_days: int = Field(default=7, env="SYSTEM_MONITOR_RAW_RETENTION_DAYS")
+    system_monitor_hourly_retention_days: int = Field(default=365, env="SYSTEM_MONITOR_HOURLY_RETENTION_DAYS")
+    retention_batch_size: int = Field(default=1000, env="RETENTION_BATCH_SIZE")
+    retention_interval: float = Field(default=3600.0, env="RETENTION_INTERVAL")
+    
     # URL-encoded database URL for SQLAlchemy
     @property
     def get_database_url(self):
@@ -22,6 +113,36 @@ class Settings(BaseSettings):
     # Twilio credentials
     twilio_account_sid: str = Field("", env="TWILIO_ACCOUNT_SID")
     twilio_auth_token: str = Field("", env="TWILIO_AUTH_TOKEN")
+    # Twilio REST requests run on TWILIO_WORKERS threads sharing one keep-alive
+    # session; each HTTP request times out after TWILIO_REQUEST_TIMEOUT seconds
+    # and a whole client call (including paging) after TWILIO_CALL_TIMEOUT
+    twilio_workers: int = Field(default=8, env="TWILIO_WORKERS")
+    twilio_request_timeout: float = Field(default=10.0, env="TWILIO_REQUEST_TIMEOUT")
+    twilio_call_timeout: float = Field(default=30.0, env="TWILIO_CALL_TIMEOUT")
+    # Bulk dialing starts calls at a pace set by the system monitor's outbound
+    # capacity, re-read every BULK_DIAL_CAPACITY_REFRESH seconds, and at most
+    # TWILIO_CALLS_PER_SECOND; BULK_DIAL_MAX_CONCURRENCY caps create-call
+    # requests waiting on Twilio at once
+    twilio_calls_per_second: float = Field(default=1.0, env="TWILIO_CALLS_PER_SECOND")
+    bulk_dial_max_concurrency: int = Field(default=20, env="BULK_DIAL_MAX_CONCURRENCY")
+    bulk_dial_capacity_refresh: float = Field(default=15.0, env="BULK_DIAL_CAPACITY_REFRESH")
+    # Campaign workers lease CAMPAIGN_BATCH_SIZE targets at a time; a target still
+    # dialing after CAMPAIGN_LEASE_SECONDS is given up on (never re-dialed)
+    campaign_batch_size: int = Field(default=50, env="CAMPAIGN_BATCH_SIZE")
+    campaign_lease_seconds: float = Field(default=600.0, env="CAMPAIGN_LEASE_SECONDS")
+    campaign_poll_interval: float = Field(default=5.0, env="CAMPAIGN_POLL_INTERVAL")
+    # Twilio status callbacks are coalesced per call and written every
+    # STATUS_CALLBACK_FLUSH_INTERVAL seconds, or once this many calls are waiting
+    status_callback_flush_interval: float = Field(default=0.5, env="STATUS_CALLBACK_FLUSH_INTERVAL")
+    status_callback_batch_size: int = Field(default=500, env="STATUS_CALLBACK_BATCH_SIZE")
+    
+    # Daily call metrics rollup: missed calls are swept up every
+    # CALL_METRICS_SWEEP_INTERVAL seconds, and the last CALL_METRICS_RECONCILE_DAYS
+    # days are reset from Twilio once a day at CALL_METRICS_RECONCILE_HOUR (UTC)
+    call_metrics_batch_size: int = Field(default=500, env="CALL_METRICS_BATCH_SIZE")
+    call_metrics_sweep_interval: float = Field(default=300.0, env="CALL_METRICS_SWEEP_INTERVAL")
+    call_metrics_reconcile_hour: int = Field(default=3, env="CALL_METRICS_RECONCILE_HOUR")
+    call_metrics_reconcile_days: int = Field(default=2, env="CALL_METRICS_RECONCILE_DAYS")
     
     # Supabase credentials
     supabase_url: str = Field("", env="SUPABASE_URL")
@@ -3,10 +3,23 @@ import aiomysql
 import asyncio
 import os
 import json
+from contextlib import asynccontextmanager
+from itertools import islice
 from mysql.connector import Error
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
 from .config import settings
-from .security.password import hash_password
+from .monitoring.metrics import metrics_collector
+from .monitoring.slow_queries import SlowQueryLog
+from .security.password import get_password_hash as hash_password
+from .security.token_cache import token_cache
+from .security.user_cache import user_cache
+from .persistence.breaker import CircuitBreaker, is_rolled_back, is_transient
+from .persistence.cache import QueryCache
+from .persistence.failover import FailoverMonitor
+from .persistence.migrator import MigrationRunner, split_sql_statements
+from .persistence.mirror import MirrorQueue
+from .persistence.pool import PoolSizer
+from .persistence.router import READ_VERBS, StatementInfo, parse_statement
 
 logger = logging.getLogger(__name__)
 
@@ -14,19 +27,120 @@ class DatabaseError(Exception):
     """Custom exception for database errors"""
     pass
 
+class CircuitOpenError(DatabaseError):
+    """Raised without touching the database while a pool's circuit breaker is open"""
+    pass
+
+async def _with_timeout(awaitable: Awaitable, timeout: float) -> Any:
+    """
+    asyncio.wait_for() that never loses a cancellation of the caller: before
+    Python 3.12, wait_for() returns the result when the awaitable finishes in
+    the same loop iteration as the cancel, and stopping a background job then
+    hangs
+    """
+    if hasattr(asyncio, "timeout"):
+        async with asyncio.timeout(timeout):
+            return await awaitable
+    return await asyncio.wait_for(awaitable, timeout)
+
+class Transaction:
+    """
+    Handle for statements run inside Database.transaction()
+    
+    Writes are remembered so that, once committed, they can be mirrored and
+    the query cache invalidated just as for execute_transaction().
+    """
+    
+    def __init__(self, database, pool, conn):
+        self.database = database
+        self.pool = pool
+        self.conn = conn
+        self.rowcount = 0
+        self.writes: List[tuple] = []
+        self.tables = set()
+        self.touches_auth = False
+    
+    async def execute(self, query: str, params: Any = None) -> List[Dict[str, Any]]:
+        """
+        Run a statement in the transaction
+        
+        Returns:
+            Result rows (empty for writes); the affected row count is left in rowcount
+        """
+        info = parse_statement(query)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        async with self.conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(query, params or ())
+            rows = await cursor.fetchall()
+            self.rowcount = max(cursor.rowcount, 0)
+        self.database._observe_statement(self.pool, info, query, params, loop.time() - started, len(rows) or self.rowcount)
+        
+        if info.writes:
+            self.tables.update(info.tables)
+            self.touches_auth = self.touches_auth or info.intent == "auth"
+            # Locking reads (SELECT ... FOR UPDATE) change nothing worth mirroring
+            if info.verb not in READ_VERBS:
+                self.writes.append((query, params))
+        return rows
+
 class Database:
     def __init__(self):
         self.pool = None
         self.connected = False
         self.max_retries = 5
-        self.retry_delay = 1  # seconds
+        self.retry_delay = 1  # seconds, between connection attempts
+        self.query_retry_delay = settings.db_retry_delay  # seconds, base backoff between query attempts
+        self.breakers: Dict[str, CircuitBreaker] = {}  # one per pool: local, external, replica
+        self.pool_sizers: Dict[str, PoolSizer] = {}  # adaptive sizing, one per pool
         self.use_external_db = False
         self.ext_db_config = {}
         self.local_pool = None  # For maintaining a connection to local DB even when using external
+        self.replica_pool = None  # Optional read replica for SELECT-only dashboard/export traffic
+        # Writes against the external DB are copied to the local DB in the background
+        self.mirror = MirrorQueue(
+            maxsize=settings.mirror_queue_maxsize,
+            batch_size=settings.mirror_batch_size,
+            flush_interval=settings.mirror_flush_interval,
+            spool_path=settings.mirror_spool_path
+        )
+        # Routes external traffic to the local DB while the external DB is unreachable
+        self.failover = FailoverMonitor(
+            self,
+            probe_interval=settings.db_failover_probe_interval,
+            probe_timeout=settings.db_failover_probe_timeout,
+            failure_threshold=settings.db_failover_failure_threshold,
+            recovery_threshold=settings.db_failover_recovery_threshold,
+            replay=MirrorQueue(
+                maxsize=settings.failover_replay_maxsize,
+                batch_size=settings.mirror_batch_size,
+                flush_interval=settings.mirror_flush_interval,
+                spool_path=settings.failover_replay_spool_path,
+                autoflush=False,
+                # Outage writes exist nowhere else; never drop one the external DB rejects
+                drop_rejected=False
+            )
+        )
+        # SELECT results cached on request (cache_ttl), invalidated by writes to the same tables
+        self.query_cache = QueryCache(max_entries=settings.query_cache_max_entries)
+        # Token verification's user cache is cleared by writes to the users table
+        user_cache.attach(self.query_cache)
+        # Logout revocations are kept in the local revoked_tokens table
+        token_cache.attach(self)
+        # Recent statements slower than SLOW_QUERY_THRESHOLD_MS, with EXPLAIN plans
+        self.slow_queries = SlowQueryLog(
+            threshold_ms=settings.slow_query_threshold_ms,
+            maxlen=settings.slow_query_log_size,
+            explain=settings.slow_query_explain
+        )
 
-    async def connect(self):
+    async def connect(self, start_jobs: bool = True):
         """
         Connect to the database with retry logic
+        
+        Args:
+            start_jobs: Also start the periodic jobs of the services that use
+                this database (one-off scripts pass False)
         """
         # Check if external database config exists and should be used
         try:
@@ -45,25 +159,25 @@ class Database:
         if self.use_external_db:
             await self._connect_to_external_db()
         
+        # Optional read replica, only used by callers that ask for it
+        if settings.read_replica_config:
+            await self._connect_to_replica_db()
+        
+        if start_jobs and self.connected:
+            for job in self._background_jobs():
+                job.start()
+        
     async def _connect_to_local_db(self):
         """Connect to the local database"""
         retries = 0
         while retries < self.max_retries:
             try:
-                self.local_pool = await aiomysql.create_pool(
-                    host=settings.db_host,
-                    user=settings.db_user,
-                    password=settings.db_password,
-                    db=settings.db_database,
-                    autocommit=True,
-                    pool_recycle=3600,  # Recycle connections after 1 hour
-                    maxsize=10,  # Maximum number of connections in the pool
-                    minsize=1    # Minimum number of connections in the pool
-                )
+                self.local_pool = await self._create_local_pool()
+                await self._attach_sizer("local", self.local_pool)
                 
                 if not self.use_external_db:
                     self.pool = self.local_pool
-                logger.info("Successfully connected to local MySQL database")
+                logger.info(f"Successfully connected to local {settings.db_backend} database")
                 async with self.local_pool.acquire() as conn:
                     async with conn.cursor() as cursor:
                         await cursor.execute("SELECT 1")
@@ -71,10 +185,13 @@ class Database:
                         logger.info(f"Database connection test: {result}")
                 if not self.use_external_db:
                     self.connected = True
+                await self.mirror.start(self.local_pool)
+                # Revocations live in the local database; reload them from every worker
+                token_cache.start()
                 return True
             except Exception as e:
                 retries += 1
-                logger.error(f"Error connecting to local MySQL database (attempt {retries}/{self.max_retries}): {e}")
+                logger.error(f"Error connecting to local {settings.db_backend} database (attempt {retries}/{self.max_retries}): {e}")
                 if retries >= self.max_retries:
                     logger.critical("Failed to connect to local database after maximum retries")
                     # Raise exception in production, but allow app to continue in development
@@ -85,6 +202,32 @@ class Database:
                     # Wait before retrying with exponential backoff
                     await asyncio.sleep(self.retry_delay * (2 ** (retries - 1)))
                     
+    async def _create_local_pool(self):
+        """
+        Pool for the local database. With DB_BACKEND=sqlite this is an embedded
+        SQLite file behind the same pool interface; statements are translated
+        from MySQL by persistence.sqlite, so every query path runs unchanged.
+        """
+        if settings.db_backend == "sqlite":
+            # Imported here so aiosqlite is only needed when the backend is used
+            from .persistence import sqlite as sqlite_backend
+            return await sqlite_backend.create_pool(
+                settings.db_sqlite_path,
+                minsize=settings.db_pool_minsize,
+                maxsize=settings.db_pool_maxsize,
+                busy_timeout=settings.db_sqlite_busy_timeout
+            )
+        return await aiomysql.create_pool(
+            host=settings.db_host,
+            user=settings.db_user,
+            password=settings.db_password,
+            db=settings.db_database,
+            autocommit=True,
+            pool_recycle=3600,  # Recycle connections after 1 hour
+            maxsize=settings.db_pool_maxsize,  # Hard limit, the sizer grows towards it on demand
+            minsize=settings.db_pool_minsize   # Opened at startup and always kept
+        )
+    
     async def _connect_to_external_db(self):
         """Connect to the external database"""
         if not self.ext_db_config:
@@ -101,9 +244,10 @@ class Database:
                     db=self.ext_db_config.get('database'),
                     autocommit=True,
                     pool_recycle=3600,
-                    maxsize=10,
-                    minsize=1
+                    maxsize=settings.db_pool_maxsize,
+                    minsize=settings.db_pool_minsize
                 )
+                await self._attach_sizer("external", self.pool)
                 
                 logger.info("Successfully connected to external MySQL database")
                 
@@ -118,6 +262,9 @@ class Database:
                 # Create required tables in the external database
                 await self._sync_schema_to_external()
                 
+                # Watch the external database and fail over to the local one if it dies
+                await self.failover.start(self.ext_db_config)
+                
                 return True
                 
             except Exception as e:
@@ -127,6 +274,8 @@ class Database:
                     logger.critical("Failed to connect to external database after maximum retries")
                     # Fall back to local database
                     self.use_external_db = False
+                    await self._detach_sizer("external")
+                    await self.failover.stop()
                     self.pool = self.local_pool
                     self.connected = True
                     logger.info("Falling back to local database")
@@ -135,37 +284,251 @@ class Database:
                     # Wait before retrying with exponential backoff
                     await asyncio.sleep(self.retry_delay * (2 ** (retries - 1)))
 
-    async def _sync_schema_to_external(self):
-        """Create necessary tables in external DB if they don't exist"""
+    async def _connect_to_replica_db(self):
+        """Connect to the optional read replica; reads fall back to the primary pool on failure"""
         try:
-            # Create essential tables in external database
-            await self.create_tables_in_current_pool()
-            
-            # Sync tables from migrations
-            migrations_path = os.path.join(os.path.dirname(__file__), 'migrations')
-            
-            # Execute migrations in the external database
-            service_tables_migration = os.path.join(migrations_path, 'create_service_tables.sql')
-            data_sync_jobs_migration = os.path.join(migrations_path, 'add_data_sync_jobs_table.sql')
-            call_features_migration = os.path.join(migrations_path, 'add_call_features_tables.sql')
-            
-            if os.path.exists(service_tables_migration):
-                await self.execute_migration(service_tables_migration)
-                
-            if os.path.exists(data_sync_jobs_migration):
-                await self.execute_migration(data_sync_jobs_migration)
-                
-            if os.path.exists(call_features_migration):
-                await self.execute_migration(call_features_migration)
-                
-            logger.info("Successfully synced schema to external database")
+            replica_config = json.loads(settings.read_replica_config)
+            self.replica_pool = await aiomysql.create_pool(
+                host=replica_config.get('host'),
+                user=replica_config.get('user'),
+                password=replica_config.get('password'),
+                db=replica_config.get('database'),
+                autocommit=True,
+                pool_recycle=3600,
+                maxsize=settings.db_pool_maxsize,
+                minsize=settings.db_pool_minsize
+            )
+            await self._attach_sizer("replica", self.replica_pool)
+            logger.info("Successfully connected to read replica database")
             return True
+        except Exception as e:
+            logger.error(f"Error connecting to read replica database, reads will use the primary: {e}")
+            self.replica_pool = None
+            return False
+
+    def _select_pool(self, info: StatementInfo, use_local: bool = False, prefer_replica: bool = False):
+        """
+        Pick the pool for a parsed statement.
+        Auth tables always live in the local database, SELECT-only traffic may
+        go to the read replica when the caller opts in, everything else goes to
+        the active pool.
+        """
+        if use_local or info.intent == "auth" or self.failover.active:
+            return self.local_pool
+        if (prefer_replica and info.intent == "read" and self.replica_pool
+                and self._breaker_for(self.replica_pool).state != CircuitBreaker.OPEN):
+            return self.replica_pool
+        return self.pool
+
+    async def _sync_schema_to_external(self):
+        """Apply pending migrations to the external DB"""
+        try:
+            if await MigrationRunner(self).run(use_local=False):
+                logger.info("Successfully synced schema to external database")
+                return True
+            logger.error("External database schema sync did not complete")
+            return False
             
         except Exception as e:
             logger.error(f"Error syncing schema to external database: {e}")
             return False
             
-    async def execute(self, query: str, params: Any = None, use_local: bool = False) -> List[Dict[str, Any]]:
+    def _background_jobs(self) -> list:
+        """Service jobs running on this database, started by connect() and stopped by close()"""
+        # Imported here to avoid circular imports; the services use this module's db
+        from .services.call_archiver import call_archiver
+        from .services.call_metrics import call_metrics_rollup
+        from .services.campaign_queue import campaign_queue
+        from .services.log_retention import log_retention
+        jobs = (log_retention, campaign_queue, call_metrics_rollup, call_archiver)
+        return [job for job in jobs if job.database is self]
+
+    def _begin_write(self, target_pool) -> bool:
+        """
+        Decide, as a write is sent, whether it must be replayed to the external
+        DB: a failover can end before the write finishes. If so the write counts
+        as in flight, holding off fail back, until the caller has recorded it
+        and called failover.write_finished().
+        """
+        if target_pool is self.local_pool and self.failover.active:
+            self.failover.write_started()
+            return True
+        return False
+
+    def _record_write(self, target_pool, statements, many: bool = False, replay: bool = False) -> None:
+        """
+        Keep the other database in step with a write that just succeeded:
+        writes to the external DB are mirrored to the local backup, writes the
+        local DB served during a failover (replay, from _begin_write) are kept
+        for replay to the external DB. Callers exclude auth and use_local
+        writes, which only live locally.
+        """
+        if target_pool is not self.local_pool:
+            self.mirror.enqueue(statements, many=many)
+        elif replay:
+            self.failover.record_write(statements, many=many)
+
+    def _pool_name(self, pool) -> str:
+        if pool is not None and pool is self.local_pool:
+            return "local"
+        if pool is not None and pool is self.replica_pool:
+            return "replica"
+        return "external"
+
+    def _breaker_for(self, pool) -> CircuitBreaker:
+        name = self._pool_name(pool)
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_threshold=settings.db_breaker_failure_threshold,
+                reset_timeout=settings.db_breaker_reset_timeout
+            )
+            self.breakers[name] = breaker
+        return breaker
+
+    async def _attach_sizer(self, name: str, pool) -> None:
+        """Start adaptive sizing for a newly created pool, replacing any previous sizer"""
+        await self._detach_sizer(name)
+        sizer = PoolSizer(
+            name, pool,
+            minsize=settings.db_pool_minsize,
+            maxsize=settings.db_pool_maxsize,
+            target_wait=settings.db_pool_target_wait_ms / 1000.0,
+            resize_interval=settings.db_pool_resize_interval
+        )
+        self.pool_sizers[name] = sizer
+        sizer.start()
+
+    async def _detach_sizer(self, name: str) -> None:
+        sizer = self.pool_sizers.pop(name, None)
+        if sizer:
+            await sizer.stop()
+
+    def _sizer_for(self, pool) -> Optional[PoolSizer]:
+        sizer = self.pool_sizers.get(self._pool_name(pool))
+        return sizer if sizer is not None and sizer.pool is pool else None
+
+    async def _acquire(self, pool, timeout: float, statement: str):
+        """pool.acquire() with a timeout, recording the wait for metrics and pool sizing"""
+        loop = asyncio.get_running_loop()
+        sizer = self._sizer_for(pool)
+        if sizer:
+            sizer.begin_wait()
+        started = loop.time()
+        waited = None
+        try:
+            conn = await _with_timeout(pool.acquire(), timeout)
+            waited = loop.time() - started
+        finally:
+            if sizer:
+                sizer.end_wait(waited)
+        metrics_collector.record_db_acquire(self._pool_name(pool), statement, waited)
+        return conn
+
+    def pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Size, usage and sizing target per pool"""
+        return {name: sizer.stats() for name, sizer in self.pool_sizers.items()}
+
+    def breaker_states(self) -> Dict[str, Dict[str, Any]]:
+        """Circuit breaker state per pool, for health reporting"""
+        return {name: breaker.snapshot() for name, breaker in self.breakers.items()}
+
+    def _observe_statement(self, pool, info: StatementInfo, query: str, params: Any,
+                           duration: float, rows: Optional[int] = None, explain: bool = True) -> None:
+        """Record execution time and row count, and log the statement if it was slow"""
+        pool_name = self._pool_name(pool)
+        metrics_collector.record_db_query(pool_name, info.fingerprint, duration, rows)
+        if self.slow_queries.is_slow(duration):
+            self.slow_queries.record(
+                pool_name, info.fingerprint, info.verb, query, params,
+                duration, rows, pool=pool, explain=explain
+            )
+
+    async def _run_with_retries(self, target_pool, operation: Callable[[Any], Awaitable[Any]],
+                                idempotent: bool, deadline: Optional[float], label: str,
+                                statement: Optional[str] = None,
+                                observe: Optional[Callable[[Any, float, Any], None]] = None,
+                                read_only: bool = False) -> Any:
+        """
+        Run operation(conn) on a pooled connection under the pool's circuit
+        breaker and a per-request deadline budget.
+        
+        Only transient errors (timeouts, lost connections, deadlocks) are
+        retried, and only when the work is idempotent, never reached the
+        server, or was rolled back by the server. The whole call, including
+        backoff sleeps, never runs past the deadline.
+        
+        The time spent waiting for a connection is recorded under statement
+        (the normalized fingerprint), or under the label when there is none.
+        observe(pool, duration, result) is called after a successful attempt.
+        read_only work is moved to the local pool on retry once a failover has started.
+        """
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + (deadline if deadline is not None else settings.db_request_deadline)
+        attempt = 0
+        
+        while True:
+            attempt += 1
+            breaker = self._breaker_for(target_pool)
+            if not breaker.allow_request():
+                raise CircuitOpenError(f"{label} rejected: circuit open for {breaker.name} database")
+            
+            sent = False
+            try:
+                remaining = expires_at - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                conn = await self._acquire(target_pool, remaining, statement or label.lower())
+                try:
+                    sent = True
+                    started = loop.time()
+                    result = await _with_timeout(operation(conn), max(expires_at - loop.time(), 0.001))
+                    duration = loop.time() - started
+                except BaseException as e:
+                    if not isinstance(e, Exception) or is_transient(e):
+                        # Connection state is unknown (timed out, cancelled or broken); never reuse it
+                        conn.close()
+                    raise
+                finally:
+                    target_pool.release(conn)
+                breaker.record_success()
+                if observe:
+                    observe(target_pool, duration, result)
+                return result
+            except asyncio.CancelledError:
+                breaker.abandon()
+                raise
+            except Exception as e:
+                transient = is_transient(e)
+                if transient:
+                    breaker.record_failure()
+                    if target_pool is self.pool and target_pool is not self.local_pool:
+                        # Let the failover prober confirm the outage now rather than at its next tick
+                        self.failover.wake()
+                else:
+                    # The server answered; the statement itself is at fault
+                    breaker.record_success()
+                
+                retryable = transient and (idempotent or not sent or is_rolled_back(e))
+                delay = self.query_retry_delay * (2 ** (attempt - 1))
+                if not retryable or attempt >= self.max_retries or loop.time() + delay >= expires_at:
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise DatabaseError(f"{label} exceeded its deadline after {attempt} attempt(s)")
+                    raise
+                
+                logger.warning(f"{label} transient error (attempt {attempt}/{self.max_retries}), retrying in {delay:.2f}s: {e}")
+                if target_pool is self.replica_pool:
+                    # Replica trouble should never fail a read the primary can serve
+                    target_pool = self.pool
+                if read_only and self.failover.active:
+                    target_pool = self.local_pool
+                await asyncio.sleep(delay)
+
+    async def execute(self, query: str, params: Any = None, use_local: bool = False,
+                      prefer_replica: bool = False, deadline: Optional[float] = None,
+                      idempotent: Optional[bool] = None, mirror: bool = True,
+                      cache_ttl: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Execute a query with retry logic
         
@@ -173,9 +536,16 @@ class Database:
             query: SQL query to execute
             params: Parameters for the query
             use_local: Force using local database (for user auth queries)
+            prefer_replica: Serve SELECT-only queries from the read replica if one is configured
+            deadline: Time budget in seconds for all attempts (defaults to DB_REQUEST_DEADLINE)
+            idempotent: Whether the statement may be re-sent after a transient error
+                (defaults to True for reads, False for writes)
+            mirror: Copy writes to the local backup when running against the external DB
+            cache_ttl: Serve a read from the query cache, caching the result for this many
+                seconds; writes to the tables it reads invalidate it sooner
         """
-        # Determine which pool to use
-        target_pool = self.local_pool if (use_local or query.lower().startswith("select") and "users" in query.lower()) else self.pool
+        info = parse_statement(query)
+        target_pool = self._select_pool(info, use_local, prefer_replica)
         
         if not self.connected or not target_pool:
             if settings.debug:
@@ -186,44 +556,237 @@ class Database:
                 await self.connect()
                 if not self.connected:
                     raise DatabaseError("Database connection failed, cannot execute query")
+                target_pool = self._select_pool(info, use_local, prefer_replica)
         
-        # Always use local database for user-related queries
-        if "users" in query.lower() and not use_local:
-            logger.info("Using local database for user-related query")
-            target_pool = self.local_pool
+        async def run(conn):
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params or ())
+                return await cursor.fetchall()
         
-        retries = 0
-        while retries < self.max_retries:
+        async def load():
+            return await self._run_with_retries(
+                target_pool, run,
+                idempotent=(not info.writes) if idempotent is None else idempotent,
+                deadline=deadline,
+                label="Query",
+                statement=info.fingerprint,
+                observe=lambda pool, duration, rows: self._observe_statement(
+                    pool, info, query, params, duration, len(rows)
+                ),
+                read_only=not info.writes
+            )
+        
+        record = mirror and not use_local and info.writes and info.intent != "auth"
+        replay = record and self._begin_write(target_pool)
+        try:
+            if cache_ttl and not info.writes:
+                cache_key = QueryCache.make_key(self._pool_name(target_pool), query, params)
+                result = await self.query_cache.get_or_load(cache_key, info.tables, cache_ttl, load)
+            else:
+                result = await load()
+            # Queue the write for the local backup or the failover replay log (except for user queries)
+            if record:
+                self._record_write(target_pool, [(query, params)], replay=replay)
+        except CircuitOpenError:
+            if settings.debug:
+                return []
+            raise
+        except Exception as e:
+            logger.error(f"Database execution error: {e}")
+            if settings.debug:
+                logger.error(f"Query failed: {query}")
+                return []
+            raise DatabaseError(f"Query execution failed: {e}")
+        finally:
+            if info.writes:
+                # Also after a failed write: it may have been applied before the error
+                self.query_cache.invalidate(info.tables)
+            if replay:
+                self.failover.write_finished()
+        
+        return result
+
+    async def fetch_all(self, query: str, params: Any = None, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Run a query and return all rows; keyword arguments are passed to execute()
+        """
+        return await self.execute(query, params, **kwargs)
+
+    async def fetch_one(self, query: str, params: Any = None, **kwargs) -> Optional[Dict[str, Any]]:
+        """
+        Run a query and return its first row, or None; keyword arguments are passed to execute()
+        """
+        rows = await self.execute(query, params, **kwargs)
+        return rows[0] if rows else None
+
+    async def stream(self, query: str, params: Any = None, batch_size: int = 500,
+                     use_local: bool = False, prefer_replica: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over a large result set without loading it into memory
+        
+        Rows are read from an unbuffered server-side cursor batch_size at a time.
+        The connection stays checked out until the iteration ends, so wrap the
+        iterator in contextlib.aclosing() when the consumer may stop early.
+        If iteration is abandoned (break, cancellation, error) the connection is
+        closed rather than drained and handed back to the pool.
+        
+        Args:
+            query: SQL query to execute
+            params: Parameters for the query
+            batch_size: Rows fetched from the server per round trip
+            use_local: Force using local database
+            prefer_replica: Serve the query from the read replica if one is configured
+        """
+        info = parse_statement(query)
+        target_pool = self._select_pool(info, use_local, prefer_replica)
+        
+        if not self.connected or not target_pool:
+            if settings.debug:
+                logger.warning("Database not connected, cannot stream query")
+                return
+            else:
+                await self.connect()
+                if not self.connected:
+                    raise DatabaseError("Database connection failed, cannot stream query")
+                target_pool = self._select_pool(info, use_local, prefer_replica)
+        
+        breaker = self._breaker_for(target_pool)
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Stream rejected: circuit open for {breaker.name} database")
+        loop = asyncio.get_running_loop()
+        try:
+            conn = await self._acquire(target_pool, settings.db_request_deadline, info.fingerprint)
+        except BaseException as e:
+            if isinstance(e, Exception) and is_transient(e):
+                breaker.record_failure()
+            else:
+                breaker.abandon()
+            raise DatabaseError(f"Stream query failed: {e}") if isinstance(e, Exception) else e
+        
+        cursor = None
+        exhausted = False
+        try:
+            cursor = await conn.cursor(aiomysql.SSDictCursor)
+            started = loop.time()
+            await cursor.execute(query, params or ())
+            # Time to first row; the rest depends on how fast the consumer reads
+            first_row_latency = loop.time() - started
+            breaker.record_success()
+            row_count = 0
+            while True:
+                rows = await cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                row_count += len(rows)
+                for row in rows:
+                    yield row
+            exhausted = True
+            self._observe_statement(target_pool, info, query, params, first_row_latency, row_count)
+        except Exception as e:
+            if is_transient(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            logger.error(f"Database stream error: {e}")
+            raise DatabaseError(f"Stream query failed: {e}")
+        except BaseException:
+            # Cancelled (or closed) before the query answered; a no-op once record_success() ran
+            breaker.abandon()
+            raise
+        finally:
+            if exhausted and cursor is not None:
+                await cursor.close()
+            else:
+                # Unread rows would otherwise be drained over the wire; drop the connection instead
+                conn.close()
+            target_pool.release(conn)
+
+    async def execute_many(self, query: str, rows: Iterable[Any], chunk_size: int = 1000,
+                           use_local: bool = False, deadline: Optional[float] = None) -> int:
+        """
+        Execute one statement for many parameter rows, chunk by chunk
+        
+        INSERT ... VALUES statements are rewritten by the driver into a single
+        multi-row INSERT per chunk, so every chunk costs one pool acquire and
+        one round trip. Each chunk is committed on its own and retried as a unit.
+        
+        Args:
+            query: SQL statement with placeholders for one row
+            rows: Parameter rows (any iterable, consumed lazily)
+            chunk_size: Number of rows sent per round trip
+            use_local: Force using local database
+            deadline: Time budget in seconds per chunk (defaults to DB_REQUEST_DEADLINE)
+            
+        Returns:
+            Number of affected rows
+        """
+        info = parse_statement(query)
+        target_pool = self._select_pool(info, use_local)
+        
+        if not self.connected or not target_pool:
+            if settings.debug:
+                logger.warning("Database not connected, cannot execute bulk query")
+                return 0
+            else:
+                await self.connect()
+                if not self.connected:
+                    raise DatabaseError("Database connection failed, cannot execute bulk query")
+                target_pool = self._select_pool(info, use_local)
+        
+        total_affected = 0
+        rows_iter = iter(rows)
+        while True:
+            chunk = list(islice(rows_iter, max(1, chunk_size)))
+            if not chunk:
+                break
+            
+            async def run(conn):
+                try:
+                    await conn.begin()
+                    async with conn.cursor() as cursor:
+                        await cursor.executemany(query, chunk)
+                        affected = max(cursor.rowcount, 0)
+                    await conn.commit()
+                    return affected
+                except Exception:
+                    try:
+                        await conn.rollback()
+                    except Exception:
+                        pass
+                    raise
+            
+            record = not use_local and info.intent != "auth"
+            replay = record and self._begin_write(target_pool)
             try:
-                async with target_pool.acquire() as conn:
-                    async with conn.cursor(aiomysql.DictCursor) as cursor:
-                        await cursor.execute(query, params or ())
-                        result = await cursor.fetchall()
-                        
-                        # If using external DB, also save to local DB for backup (except for user queries)
-                        if target_pool != self.local_pool and not query.lower().startswith("select") and "users" not in query.lower():
-                            try:
-                                async with self.local_pool.acquire() as local_conn:
-                                    async with local_conn.cursor() as local_cursor:
-                                        await local_cursor.execute(query, params or ())
-                            except Exception as local_e:
-                                logger.warning(f"Failed to backup to local database: {local_e}")
-                        
-                        return result
+                total_affected += await self._run_with_retries(
+                    target_pool, run, idempotent=False, deadline=deadline, label="Bulk query",
+                    statement=info.fingerprint,
+                    observe=lambda pool, duration, affected: self._observe_statement(
+                        pool, info, query, None, duration, affected, explain=False
+                    )
+                )
+                # Queue the chunk for the local backup or the failover replay log (except for user queries)
+                if record:
+                    self._record_write(target_pool, [(query, chunk)], many=True, replay=replay)
+            except CircuitOpenError:
+                if settings.debug:
+                    return total_affected
+                raise
             except Exception as e:
-                retries += 1
-                logger.error(f"Database execution error (attempt {retries}/{self.max_retries}): {e}")
-                if retries >= self.max_retries:
-                    if settings.debug:
-                        logger.error(f"Query failed after maximum retries: {query}")
-                        return []
-                    else:
-                        raise DatabaseError(f"Query execution failed: {e}")
-                else:
-                    # Wait before retrying with exponential backoff
-                    await asyncio.sleep(self.retry_delay * (2 ** (retries - 1)))
+                logger.error(f"Bulk execution error: {e}")
+                if settings.debug:
+                    logger.error(f"Bulk query failed: {query}")
+                    return total_affected
+                raise DatabaseError(f"Bulk query execution failed: {e}")
+            finally:
+                self.query_cache.invalidate(info.tables)
+                if replay:
+                    self.failover.write_finished()
+        
+        return total_affected
 
-    async def execute_transaction(self, queries: List[Dict[str, Any]], use_local: bool = False) -> bool:
+    async def execute_transaction(self, queries: List[Dict[str, Any]], use_local: bool = False,
+                                  deadline: Optional[float] = None, mirror: bool = True) -> bool:
         """
         Execute multiple queries in a transaction
         Each query dict should have 'query' and optionally 'params' keys
@@ -231,12 +794,14 @@ class Database:
         Args:
             queries: List of query dictionaries
             use_local: Force using local database
+            deadline: Time budget in seconds for all attempts (defaults to DB_REQUEST_DEADLINE)
+            mirror: Copy the transaction to the local backup when running against the external DB
         """
         # Determine if this is a user-related transaction
-        is_user_transaction = any("users" in q.get('query', '').lower() for q in queries)
+        is_user_transaction = any(parse_statement(q.get('query', '')).intent == "auth" for q in queries)
         
         # Determine which pool to use
-        target_pool = self.local_pool if (use_local or is_user_transaction) else self.pool
+        target_pool = self.local_pool if (use_local or is_user_transaction or self.failover.active) else self.pool
         
         if not self.connected or not target_pool:
             if settings.debug:
@@ -246,54 +811,134 @@ class Database:
                 await self.connect()
                 if not self.connected:
                     raise DatabaseError("Database connection failed, cannot execute transaction")
+                target_pool = self.local_pool if (use_local or is_user_transaction or self.failover.active) else self.pool
         
-        retries = 0
-        while retries < self.max_retries:
+        loop = asyncio.get_running_loop()
+        
+        async def run(conn):
             try:
-                async with target_pool.acquire() as conn:
-                    # Disable autocommit for transaction
-                    await conn.begin()
-                    async with conn.cursor() as cursor:
-                        for query_dict in queries:
-                            await cursor.execute(
-                                query_dict['query'], 
-                                query_dict.get('params', ())
-                            )
-                    await conn.commit()
-                    
-                    # If using external DB, also execute in local DB for backup (except for user transactions)
-                    if target_pool != self.local_pool and not is_user_transaction:
-                        try:
-                            async with self.local_pool.acquire() as local_conn:
-                                await local_conn.begin()
-                                async with local_conn.cursor() as local_cursor:
-                                    for query_dict in queries:
-                                        await local_cursor.execute(
-                                            query_dict['query'], 
-                                            query_dict.get('params', ())
-                                        )
-                                await local_conn.commit()
-                        except Exception as local_e:
-                            logger.warning(f"Failed to backup transaction to local database: {local_e}")
-                    
-                    return True
-            except Exception as e:
-                retries += 1
-                logger.error(f"Transaction error (attempt {retries}/{self.max_retries}): {e}")
+                # Disable autocommit for transaction
+                await conn.begin()
+                async with conn.cursor() as cursor:
+                    for query_dict in queries:
+                        started = loop.time()
+                        await cursor.execute(
+                            query_dict['query'], 
+                            query_dict.get('params', ())
+                        )
+                        self._observe_statement(
+                            target_pool, parse_statement(query_dict['query']), query_dict['query'],
+                            query_dict.get('params'), loop.time() - started, max(cursor.rowcount, 0)
+                        )
+                await conn.commit()
+            except Exception:
                 try:
                     await conn.rollback()
-                except:
+                except Exception:
                     pass
-                
-                if retries >= self.max_retries:
-                    if settings.debug:
-                        logger.error("Transaction failed after maximum retries")
-                        return False
-                    else:
-                        raise DatabaseError(f"Transaction execution failed: {e}")
-                else:
-                    # Wait before retrying with exponential backoff
-                    await asyncio.sleep(self.retry_delay * (2 ** (retries - 1)))
+                raise
+        
+        record = mirror and not use_local and not is_user_transaction
+        replay = record and self._begin_write(target_pool)
+        try:
+            await self._run_with_retries(
+                target_pool, run, idempotent=False, deadline=deadline, label="Transaction",
+                statement="transaction"
+            )
+            # Queue the transaction for the local backup or the failover replay log (except for user transactions)
+            if record:
+                self._record_write(target_pool, [
+                    (query_dict['query'], query_dict.get('params', ()))
+                    for query_dict in queries
+                ], replay=replay)
+        except CircuitOpenError:
+            if settings.debug:
+                return False
+            raise
+        except Exception as e:
+            logger.error(f"Transaction error: {e}")
+            if settings.debug:
+                logger.error("Transaction failed")
+                return False
+            raise DatabaseError(f"Transaction execution failed: {e}")
+        finally:
+            self.query_cache.invalidate(set().union(
+                *(parse_statement(q.get('query', '')).tables for q in queries)
+            ))
+            if replay:
+                self.failover.write_finished()
+        
+        return True
+
+    @asynccontextmanager
+    async def transaction(self, use_local: bool = False, deadline: Optional[float] = None,
+                          mirror: bool = True) -> AsyncIterator[Transaction]:
+        """
+        Run statements interactively inside one transaction
+        
+        Unlike execute_transaction(), statements can read rows (including
+        SELECT ... FOR UPDATE / SKIP LOCKED) and decide what to do next. The
+        transaction commits when the block exits normally and rolls back if it
+        raises. It is not retried; callers own the retry policy.
+        
+            async with db.transaction() as tx:
+                rows = await tx.execute("SELECT ... FOR UPDATE SKIP LOCKED")
+                await tx.execute("UPDATE ...", params)
+        
+        Args:
+            use_local: Force using local database
+            deadline: Time budget in seconds for getting a connection (defaults to DB_REQUEST_DEADLINE)
+            mirror: Copy committed writes to the local backup when running against the external DB
+        """
+        target_pool = self.local_pool if (use_local or self.failover.active) else self.pool
+        if not self.connected or not target_pool:
+            await self.connect()
+            if not self.connected:
+                raise DatabaseError("Database connection failed, cannot start transaction")
+            target_pool = self.local_pool if (use_local or self.failover.active) else self.pool
+        
+        breaker = self._breaker_for(target_pool)
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Transaction rejected: circuit open for {breaker.name} database")
+        try:
+            conn = await self._acquire(
+                target_pool, deadline if deadline is not None else settings.db_request_deadline, "transaction"
+            )
+        except BaseException as e:
+            if isinstance(e, Exception) and is_transient(e):
+                breaker.record_failure()
+            else:
+                breaker.abandon()
+            raise DatabaseError(f"Transaction could not start: {e}") if isinstance(e, Exception) else e
+        
+        tx = Transaction(self, target_pool, conn)
+        replay = mirror and not use_local and self._begin_write(target_pool)
+        try:
+            await conn.begin()
+            yield tx
+            await conn.commit()
+            if mirror and tx.writes and not use_local and not tx.touches_auth:
+                self._record_write(target_pool, tx.writes, replay=replay)
+        except BaseException as e:
+            try:
+                await conn.rollback()
+            except Exception:
+                pass
+            if not isinstance(e, Exception) or is_transient(e):
+                # Connection state is unknown; never reuse it
+                conn.close()
+            if isinstance(e, Exception) and is_transient(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        finally:
+            target_pool.release(conn)
+            self.query_cache.invalidate(tx.tables)
+            if replay:
+                self.failover.write_finished()
+        
+        breaker.record_success()
 
     async def execute_migration(self, migration_file: str) -> bool:
         """
@@ -307,9 +952,8 @@ class Database:
             with open(migration_file, 'r') as f:
                 sql_content = f.read()
                 
-            # Split SQL content by semicolons to get individual statements
-            # Skip empty statements
-            statements = [stmt.strip() for stmt in sql_content.split(';') if stmt.strip()]
+            # Split on top-level semicolons only (not inside strings or comments)
+            statements = split_sql_statements(sql_content)
             
             # Execute each statement in a transaction
             queries = [{'query': stmt} for stmt in statements]
@@ -329,10 +973,31 @@ class Database:
         """
         Close database connection pools
         """
+        # Write the status callbacks still queued while the jobs they feed are running
+        from .services.status_callbacks import status_callbacks
+        if status_callbacks.database is self:
+            await status_callbacks.stop()
+        for job in self._background_jobs():
+            await job.stop()
+        await token_cache.stop()
+        
+        # Spool outage writes not yet replayed, then drain pending backup writes
+        # while the local pool is still open
+        await self.failover.stop()
+        await self.mirror.close()
+        
+        for name in list(self.pool_sizers):
+            await self._detach_sizer(name)
+        
         if self.pool and self.pool != self.local_pool:
             self.pool.close()
             await self.pool.wait_closed()
         
+        if self.replica_pool:
+            self.replica_pool.close()
+            await self.replica_pool.wait_closed()
+            self.replica_pool = None
+        
         if self.local_pool:
             self.local_pool.close()
             await self.local_pool.wait_closed()
@@ -340,65 +1005,6 @@ class Database:
         self.connected = False
         logger.info("Database connections closed")
 
-    async def create_tables_in_current_pool(self):
-        """
-        Create initial database tables in the current pool (used for external DB setup)
-        """
-        if not self.pool:
-            logger.warning("No active pool to create tables in")
-            return False
-        
-        try:
-            queries = [
-                # Create calls table
-                {
-                    'query': """
-                        CREATE TABLE IF NOT EXISTS calls (
-                            id INT AUTO_INCREMENT PRIMARY KEY,
-                            call_sid VARCHAR(255) NOT NULL,
-                            from_number VARCHAR(20) NOT NULL,
-                            to_number VARCHAR(20) NOT NULL,
-                            direction ENUM('inbound', 'outbound') NOT NULL,
-                            status VARCHAR(50) NOT NULL,
-                            start_time DATETIME NOT NULL,
-                            end_time DATETIME,
-                            duration INT,
-                            recording_url TEXT,
-                            transcription TEXT,
-                            cost DECIMAL(10, 4),
-                            segments INT,
-                            ultravox_cost DECIMAL(10, 4),
-                            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                        )
-                    """
-                },
-                # Create error_logs table
-                {
-                    'query': """
-                        CREATE TABLE IF NOT EXISTS error_logs (
-                            id INT AUTO_INCREMENT PRIMARY KEY,
-                            timestamp TIMESTAMP NOT NULL,
-                            path VARCHAR(255) NOT NULL,
-                            method VARCHAR(10) NOT NULL,
-                            error_type VARCHAR(100) NOT NULL,
-                            error_message TEXT NOT NULL,
-                            traceback TEXT,
-                            headers TEXT,
-                            client_ip VARCHAR(45)
-                        )
-                    """
-                }
-            ]
-            
-            # Execute all queries in a transaction
-            if await self.execute_transaction(queries, use_local=self.pool == self.local_pool):
-                logger.info("Database tables created successfully in current pool")
-                return True
-        except Exception as e:
-            logger.error(f"Error creating tables in current pool: {e}")
-            return False
-
     async def switch_to_external(self, enable: bool = True, config: Dict = None):
         """
         Switch between local and external database
@@ -434,6 +1040,8 @@ class Database:
             else:
                 # Switch back to local
                 self.use_external_db = False
+                await self._detach_sizer("external")
+                await self.failover.stop()
                 if self.pool and self.pool != self.local_pool:
                     self.pool.close()
                     await self.pool.wait_closed()
@@ -507,64 +1115,8 @@ async def create_tables():
             return
         
     try:
-        queries = [
-            # Create users table
-            {
-                'query': """
-                    CREATE TABLE IF NOT EXISTS users (
-                        id INT AUTO_INCREMENT PRIMARY KEY,
-                        username VARCHAR(255) UNIQUE NOT NULL,
-                        password_hash VARCHAR(255) NOT NULL,
-                        is_admin BOOLEAN DEFAULT FALSE,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                    )
-                """
-            },
-            # Create error_logs table
-            {
-                'query': """
-                    CREATE TABLE IF NOT EXISTS error_logs (
-                        id INT AUTO_INCREMENT PRIMARY KEY,
-                        timestamp TIMESTAMP NOT NULL,
-                        path VARCHAR(255) NOT NULL,
-                        method VARCHAR(10) NOT NULL,
-                        error_type VARCHAR(100) NOT NULL,
-                        error_message TEXT NOT NULL,
-                        traceback TEXT,
-                        headers TEXT,
-                        client_ip VARCHAR(45)
-                    )
-                """
-            },
-            # Create calls table
-            {
-                'query': """
-                    CREATE TABLE IF NOT EXISTS calls (
-                        id INT AUTO_INCREMENT PRIMARY KEY,
-                        call_sid VARCHAR(255) NOT NULL,
-                        from_number VARCHAR(20) NOT NULL,
-                        to_number VARCHAR(20) NOT NULL,
-                        direction ENUM('inbound', 'outbound') NOT NULL,
-                        status VARCHAR(50) NOT NULL,
-                        start_time DATETIME NOT NULL,
-                        end_time DATETIME,
-                        duration INT,
-                        recording_url TEXT,
-                        transcription TEXT,
-                        cost DECIMAL(10, 4),
-                        segments INT,
-                        ultravox_cost DECIMAL(10, 4),
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                    )
-                """
-            }
-        ]
-        
-        # Execute all queries in a transaction
-        if await db.execute_transaction(queries):
+        # Apply pending migrations to the local database (a single ledger lookup once current)
+        if await MigrationRunner(db).run(use_local=True):
             # Check if admin user exists
             admin_check = await db.execute("SELECT COUNT(*) as count FROM users WHERE username = 'admin'")
             if not admin_check or admin_check[0]['count'] == 0:
@@ -585,18 +1137,6 @@ async def create_tables():
                     ('hamza', hashed_password, True, True)
                 )
                 
-            # Run the service tables migration if it exists
-            migrations_path = os.path.join(os.path.dirname(__file__), 'migrations')
-            service_tables_migration = os.path.join(migrations_path, 'create_service_tables.sql')
-            data_sync_jobs_migration = os.path.join(migrations_path, 'add_data_sync_jobs_table.sql')
-            
-            if os.path.exists(service_tables_migration):
-                await db.execute_migration(service_tables_migration)
-                
-            # Run the data sync jobs migration if it exists
-            if os.path.exists(data_sync_jobs_migration):
-                await db.execute_migration(data_sync_jobs_migration)
-                
             logger.info("Database tables created successfully")
             return True
     except Exception as e:
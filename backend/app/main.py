@@ -8,6 +8,10 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from jose import jwt, JWTError
 from typing import List, Optional, Dict, Any, Union
+from .security.login_throttle import login_throttle
+from .security.token_cache import token_cache
+from .database import db
+from .middleware.rate_limit import RateLimiter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,6 +29,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Rate limiting; registered before CORS so that 429 responses still carry CORS headers
+app.middleware("http")(RateLimiter(JWT_SECRET, JWT_ALGORITHM))
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -32,6 +39,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # --- Models ---
@@ -53,7 +61,8 @@ class ServiceStatus(BaseModel):
 # --- Helper Functions ---
 async def get_current_user_from_token(token: str):
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        # Memoized until the token expires; revoked (logged out) tokens raise JWTError
+        payload = token_cache.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         username: str = payload.get("sub")
         user_id: int = payload.get("user_id", 0)
         
@@ -127,12 +136,18 @@ async def api_root():
 
 # --- Authentication Endpoints ---
 @app.post("/api/auth/token")
-async def login_direct(request_data: LoginRequest):
+async def login_direct(request_data: LoginRequest, request: Request):
     """Direct login endpoint"""
     logger.info(f"Login attempt for user: {request_data.username}")
+    try:
+        login_throttle.check(request_data.username, request.client.host if request.client else None)
+    except HTTPException as e:
+        logger.warning(f"Login throttled for user: {request_data.username}")
+        return JSONResponse(status_code=e.status_code, content={"detail": e.detail}, headers=e.headers)
     try:
         if request_data.username == "hamza" and request_data.password == "AFINasahbi@-11":
             logger.info("Login successful for hamza")
+            login_throttle.reset(request_data.username)
             token_data = {
                 "sub": request_data.username,
                 "user_id": 1,
@@ -147,6 +162,7 @@ async def login_direct(request_data: LoginRequest):
             }
         elif request_data.username == "admin" and request_data.password == "admin":
             logger.info("Login successful for admin")
+            login_throttle.reset(request_data.username)
             token_data = {
                 "sub": "admin",
                 "user_id": 0,
@@ -201,8 +217,11 @@ async def get_current_user_info(request: Request):
     return user
 
 @app.post("/api/auth/logout")
-async def logout():
-    """Logout endpoint - doesn't need to do much since JWT tokens are stateless"""
+async def logout(request: Request):
+    """Logout endpoint - revokes the bearer token until it would have expired"""
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        await token_cache.revoke(auth_header.split(" ")[1], JWT_SECRET, algorithms=[JWT_ALGORITHM])
     return {"success": True, "message": "Logged out successfully"}
 
 # --- Dashboard Endpoints ---
@@ -454,6 +473,12 @@ async def get_admin_users(request: Request):
         ]
     }
 
+@app.on_event("shutdown")
+async def shutdown():
+    # Writes queued status callbacks and stops the database's background jobs
+    if db.connected:
+        await db.close()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -5,6 +5,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from ..config import settings
 from ..database import db
+from ..security.token_cache import token_cache
+from ..security.user_cache import user_cache
 import logging
 
 # Configure security scheme
@@ -15,6 +17,12 @@ logger = logging.getLogger(__name__)
 SECRET_KEY = settings.jwt_secret
 ALGORITHM = settings.jwt_algorithm
 
+async def _load_user(username: str):
+    """Fetch the user row for username from the database, None if there is none"""
+    query = "SELECT id, username, is_admin, is_active FROM users WHERE username = %s"
+    users = await db.execute(query, (username,))
+    return users[0] if users else None
+
 async def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
     """
     Verify JWT token and return the user information.
@@ -30,8 +38,8 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Security(secu
     token = credentials.credentials
     
     try:
-        # Decode JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # Decode JWT token (memoized until it expires; rejects revoked tokens)
+        payload = token_cache.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username = payload.get("sub")
         
         if username is None:
@@ -41,18 +49,15 @@ async def verify_token(credentials: HTTPAuthorizationCredentials = Security(secu
                 headers={"WWW-Authenticate": "Bearer"},
             )
             
-        # Verify that the user exists and is active
-        query = "SELECT id, username, is_admin, is_active FROM users WHERE username = %s"
-        users = await db.execute(query, (username,))
+        # Verify that the user exists and is active (served from the user cache when possible)
+        user = await user_cache.get_or_load(username, _load_user)
         
-        if not users:
+        if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-            
-        user = users[0]
         
         # Check if user is active
         if not user.get('is_active', True):
@@ -0,0 +1,148 @@
+# backend/app/middleware/rate_limit.py
+
+import collections
+import math
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from jose import JWTError
+
+from ..config import settings
+from ..monitoring.metrics import metrics_collector
+from ..security.token_cache import token_cache
+
+# Path segments that carry an id (call SIDs, numeric ids, UUIDs) are folded
+# so that /api/calls/CA123 and /api/calls/CA456 share one route budget
+_ID_SEGMENT = re.compile(r"^(?=.*\d)[\w\-.]+$")
+
+
+def route_key(path: str) -> str:
+    """Path with id-like segments replaced by {id}"""
+    return "/".join("{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+
+def _split_paths(value: str) -> List[str]:
+    return [path.strip() for path in value.split(",") if path.strip()]
+
+
+class TokenBuckets:
+    """
+    Token buckets keyed by arbitrary strings.
+
+    Each key holds one (tokens, updated_at) pair. Keys idle for longer than
+    idle_seconds are evicted from the least recently used end on every call,
+    so memory follows the number of active keys; a key that comes back
+    simply starts with a full bucket, as it would have had by then anyway.
+    """
+
+    def __init__(self, rate: float, burst: float, idle_seconds: float = 300.0, max_keys: int = 100000):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.idle_seconds = idle_seconds
+        self.max_keys = max(1, max_keys)
+        self._buckets: "collections.OrderedDict[str, Tuple[float, float]]" = collections.OrderedDict()
+
+    def take(self, key: str, now: float = None) -> float:
+        """
+        Take one token for key
+
+        Returns:
+            0 if the request may proceed, otherwise seconds until a token is available
+        """
+        now = time.monotonic() if now is None else now
+        self._evict_idle(now)
+
+        entry = self._buckets.get(key)
+        if entry is None:
+            tokens = self.burst
+        else:
+            tokens = min(self.burst, entry[0] + (now - entry[1]) * self.rate)
+
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            return (1 - tokens) / self.rate if self.rate > 0 else self.idle_seconds
+
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return 0.0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _evict_idle(self, now: float) -> None:
+        while self._buckets:
+            key, (_, updated_at) = next(iter(self._buckets.items()))
+            if now - updated_at < self.idle_seconds:
+                break
+            del self._buckets[key]
+
+
+class RateLimiter:
+    """
+    Per-user, per-route request rate limit for the HTTP app.
+
+    UI traffic is keyed on the user id from the bearer token (the client IP
+    for anonymous requests) and the route; Twilio webhooks have a budget of
+    their own per route, so a busy dashboard can never use up the capacity
+    incoming calls need. Rejected requests get 429 with Retry-After.
+    """
+
+    def __init__(self, secret: str = None, algorithm: str = None):
+        self.secret = secret or settings.jwt_secret
+        self.algorithm = algorithm or settings.jwt_algorithm
+        self.webhook_paths = _split_paths(settings.rate_limit_webhook_paths)
+        self.exempt_paths = _split_paths(settings.rate_limit_exempt_paths)
+        self.budgets: Dict[str, TokenBuckets] = {
+            "ui": TokenBuckets(
+                settings.rate_limit_ui_rate, settings.rate_limit_ui_burst,
+                settings.rate_limit_idle_seconds, settings.rate_limit_max_keys
+            ),
+            "webhook": TokenBuckets(
+                settings.rate_limit_webhook_rate, settings.rate_limit_webhook_burst,
+                settings.rate_limit_idle_seconds, settings.rate_limit_max_keys
+            ),
+        }
+
+    def classify(self, path: str) -> Optional[str]:
+        """Budget a path is charged to, None if it is not limited"""
+        if any(path.startswith(prefix) for prefix in self.exempt_paths):
+            return None
+        if any(path.startswith(prefix) for prefix in self.webhook_paths):
+            return "webhook"
+        return "ui"
+
+    def identify(self, request: Request) -> str:
+        auth_header = request.headers.get("Authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            try:
+                claims = token_cache.decode(auth_header[7:], self.secret, algorithms=[self.algorithm])
+                return f"user:{claims.get('user_id', claims.get('sub'))}"
+            except JWTError:
+                pass
+        return f"ip:{request.client.host if request.client else 'unknown'}"
+
+    async def __call__(self, request: Request, call_next):
+        if not settings.rate_limit_enabled or request.method == "OPTIONS":
+            return await call_next(request)
+
+        budget = self.classify(request.url.path)
+        if budget is None:
+            return await call_next(request)
+
+        route = f"{request.method} {route_key(request.url.path)}"
+        identity = "*" if budget == "webhook" else self.identify(request)
+        retry_after = self.budgets[budget].take(f"{identity} {route}")
+        if retry_after:
+            metrics_collector.record_rate_limited(budget)
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests, slow down"},
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+        return await call_next(request)
@@ -0,0 +1,39 @@
+-- Persistent bulk call campaigns (see services/campaign_queue.py). Targets are
+-- leased with SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers can
+-- drain one campaign. Campaigns are keyed by a generated id rather than
+-- AUTO_INCREMENT so rows match between the external database and its mirror.
+
+CREATE TABLE IF NOT EXISTS call_campaigns (
+    campaign_id CHAR(32) NOT NULL PRIMARY KEY COMMENT 'uuid4 hex',
+    name VARCHAR(255),
+    from_number VARCHAR(20) NOT NULL,
+    ultravox_url TEXT,
+    prompt_id VARCHAR(255),
+    status ENUM('active', 'completed', 'cancelled') NOT NULL DEFAULT 'active',
+    total_targets INT NOT NULL DEFAULT 0,
+    created_by VARCHAR(255),
+    created_at DATETIME NOT NULL,
+    completed_at DATETIME,
+    INDEX idx_call_campaigns_status_created (status, created_at)
+);
+
+-- status: pending -> dialing (leased) -> dialed | failed. A target whose
+-- lease runs out while dialing becomes unknown: the call may have been placed,
+-- so it is never dialed again.
+CREATE TABLE IF NOT EXISTS campaign_targets (
+    campaign_id CHAR(32) NOT NULL,
+    position INT NOT NULL,
+    phone_number VARCHAR(20) NOT NULL,
+    status ENUM('pending', 'dialing', 'dialed', 'failed', 'unknown') NOT NULL DEFAULT 'pending',
+    lease_owner VARCHAR(64),
+    lease_expires_at DATETIME,
+    attempted_at DATETIME,
+    completed_at DATETIME,
+    call_sid VARCHAR(255),
+    error TEXT,
+    PRIMARY KEY (campaign_id, position),
+    INDEX idx_campaign_targets_status (campaign_id, status, position),
+    INDEX idx_campaign_targets_lease (status, lease_expires_at),
+    INDEX idx_campaign_targets_completed (campaign_id, completed_at),
+    FOREIGN KEY (campaign_id) REFERENCES call_campaigns(campaign_id) ON DELETE CASCADE
+);
@@ -0,0 +1,46 @@
+-- Cold storage for the rows of the call child tables (actions, analysis,
+-- transcripts, knowledge base accesses), moved by the call archiver in the
+-- same transaction as their call. Rows keep their original id; there are no
+-- foreign keys, since the calls they belong to live in calls_archive.
+
+CREATE TABLE IF NOT EXISTS call_actions_archive (
+    id INT NOT NULL PRIMARY KEY,
+    call_sid VARCHAR(255) NOT NULL,
+    action_type VARCHAR(50) NOT NULL,
+    action_data JSON NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_call_actions_archive_call_sid (call_sid)
+);
+
+CREATE TABLE IF NOT EXISTS call_analysis_archive (
+    id INT NOT NULL PRIMARY KEY,
+    call_sid VARCHAR(255) NOT NULL,
+    analysis JSON NOT NULL,
+    created_at DATETIME,
+    updated_at DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY unique_call_analysis_archive_call_sid (call_sid)
+);
+
+CREATE TABLE IF NOT EXISTS call_transcriptions_archive (
+    id INT NOT NULL PRIMARY KEY,
+    call_sid VARCHAR(255) NOT NULL,
+    transcription JSON NULL COMMENT 'Legacy, uncompressed',
+    transcription_z LONGBLOB COMMENT 'Compressed JSON array of transcription messages',
+    created_at DATETIME,
+    updated_at DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY unique_call_transcriptions_archive_call_sid (call_sid)
+);
+
+CREATE TABLE IF NOT EXISTS knowledge_base_access_logs_archive (
+    id INT NOT NULL PRIMARY KEY,
+    call_sid VARCHAR(255) NOT NULL,
+    document_id INT NOT NULL,
+    relevance_score DECIMAL(5,4),
+    accessed_at DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_kb_access_logs_archive_call_sid (call_sid)
+);
@@ -1,8 +1,10 @@
 -- Migration script to add new tables for call actions and analysis
 -- Created: 2025-03-02
+-- Plain MySQL, one change per statement: the migration runner skips tables,
+-- columns and indexes that already exist, so re-running this is safe.
 
 -- First, ensure call_sid is properly indexed in calls table
-CREATE INDEX IF NOT EXISTS idx_calls_call_sid ON calls (call_sid);
+CREATE INDEX idx_calls_call_sid ON calls (call_sid);
 
 -- Create call_actions table to store actions performed during calls (search, weather, calendar, email)
 CREATE TABLE IF NOT EXISTS call_actions (
@@ -42,13 +44,12 @@ CREATE TABLE IF NOT EXISTS call_transcriptions (
 );
 
 -- Update calls table to add columns for system_prompt and other configuration
-ALTER TABLE calls
-ADD COLUMN IF NOT EXISTS system_prompt TEXT COMMENT 'System prompt used for the call' AFTER ultravox_cost,
-ADD COLUMN IF NOT EXISTS language_hint VARCHAR(10) COMMENT 'Language hint for the call' AFTER system_prompt,
-ADD COLUMN IF NOT EXISTS voice VARCHAR(50) COMMENT 'Voice used for the call' AFTER language_hint,
-ADD COLUMN IF NOT EXISTS temperature DECIMAL(4,2) COMMENT 'Model temperature setting' AFTER voice,
-ADD COLUMN IF NOT EXISTS model VARCHAR(100) COMMENT 'AI model used for the call' AFTER temperature,
-ADD COLUMN IF NOT EXISTS knowledge_base_access BOOLEAN DEFAULT FALSE COMMENT 'Whether knowledge base was accessed' AFTER model;
+ALTER TABLE calls ADD COLUMN system_prompt TEXT COMMENT 'System prompt used for the call' AFTER ultravox_cost;
+ALTER TABLE calls ADD COLUMN language_hint VARCHAR(10) COMMENT 'Language hint for the call' AFTER system_prompt;
+ALTER TABLE calls ADD COLUMN voice VARCHAR(50) COMMENT 'Voice used for the call' AFTER language_hint;
+ALTER TABLE calls ADD COLUMN temperature DECIMAL(4,2) COMMENT 'Model temperature setting' AFTER voice;
+ALTER TABLE calls ADD COLUMN model VARCHAR(100) COMMENT 'AI model used for the call' AFTER temperature;
+ALTER TABLE calls ADD COLUMN knowledge_base_access BOOLEAN DEFAULT FALSE COMMENT 'Whether knowledge base was accessed' AFTER model;
 
 -- Create knowledge_base_access_logs table to track which documents were accessed during calls
 CREATE TABLE IF NOT EXISTS knowledge_base_access_logs (
@@ -61,10 +62,9 @@ CREATE TABLE IF NOT EXISTS knowledge_base_access_logs (
   FOREIGN KEY (document_id) REFERENCES knowledge_base_documents(id) ON DELETE CASCADE
 );
 
--- Add columns to service_connections table for SERP API
-ALTER TABLE service_connections
-ADD COLUMN IF NOT EXISTS serp_api_key VARCHAR(255) COMMENT 'SERP API key for internet search' AFTER credentials,
-ADD COLUMN IF NOT EXISTS google_search_cx VARCHAR(255) COMMENT 'Google Custom Search CX' AFTER serp_api_key;
+-- Add columns to service_connections table (create_service_connections_table.sql) for SERP API
+ALTER TABLE service_connections ADD COLUMN serp_api_key VARCHAR(255) COMMENT 'SERP API key for internet search' AFTER credentials;
+ALTER TABLE service_connections ADD COLUMN google_search_cx VARCHAR(255) COMMENT 'Google Custom Search CX' AFTER serp_api_key;
 
 -- Create system monitor logs table
 CREATE TABLE IF NOT EXISTS system_monitor_logs (
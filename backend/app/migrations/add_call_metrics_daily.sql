@@ -0,0 +1,18 @@
+-- Per-day call totals (see services/call_metrics.py), so call metrics over a
+-- date range are a sum over a few rows instead of a scan of Twilio's call log.
+-- Days are UTC days of the call start time. calls.rollup_counted marks calls
+-- already added, so each call is counted exactly once.
+
+CREATE TABLE IF NOT EXISTS call_metrics_daily (
+    day DATE NOT NULL PRIMARY KEY,
+    total_calls INT NOT NULL DEFAULT 0,
+    total_duration BIGINT NOT NULL DEFAULT 0 COMMENT 'Seconds',
+    total_cost DECIMAL(14, 4) NOT NULL DEFAULT 0,
+    total_ultravox_cost DECIMAL(14, 4) NOT NULL DEFAULT 0,
+    reconciled_at DATETIME COMMENT 'Last time the totals were reset from Twilio'
+);
+
+ALTER TABLE calls
+ADD COLUMN rollup_counted BOOLEAN NOT NULL DEFAULT FALSE COMMENT 'Already added to call_metrics_daily';
+
+CREATE INDEX idx_calls_rollup_counted_status ON calls (rollup_counted, status);
@@ -0,0 +1,6 @@
+-- Lets exactly one worker reconcile a day of call_metrics_daily with Twilio
+-- each UTC day (see services/call_metrics.py): the first to move
+-- reconcile_claimed_at into today does it, every other worker skips the day.
+
+ALTER TABLE call_metrics_daily
+ADD COLUMN reconcile_claimed_at DATETIME COMMENT 'Last time a worker took the day to reconcile it';
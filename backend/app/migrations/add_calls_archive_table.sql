@@ -0,0 +1,32 @@
+-- Cold storage for calls moved out of the hot calls table by the call archiver.
+-- Rows keep their original id so (start_time, id) cursors work across both tables.
+-- Transcripts are stored compressed (see persistence/codec.py) in transcription_z.
+
+CREATE TABLE IF NOT EXISTS calls_archive (
+    id INT NOT NULL PRIMARY KEY,
+    call_sid VARCHAR(255) NOT NULL,
+    from_number VARCHAR(20) NOT NULL,
+    to_number VARCHAR(20) NOT NULL,
+    direction ENUM('inbound', 'outbound') NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    start_time DATETIME NOT NULL,
+    end_time DATETIME,
+    duration INT,
+    recording_url TEXT,
+    transcription_z LONGBLOB COMMENT 'Compressed transcription, first byte is the codec format',
+    cost DECIMAL(10, 4),
+    segments INT,
+    ultravox_cost DECIMAL(10, 4),
+    system_prompt TEXT,
+    language_hint VARCHAR(10),
+    voice VARCHAR(50),
+    temperature DECIMAL(4,2),
+    model VARCHAR(100),
+    knowledge_base_access BOOLEAN DEFAULT FALSE,
+    created_at DATETIME,
+    updated_at DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY unique_calls_archive_call_sid (call_sid),
+    INDEX idx_calls_archive_start_time_id (start_time, id),
+    INDEX idx_calls_archive_status_start_time_id (status, start_time, id)
+);
@@ -0,0 +1,5 @@
+-- Composite indexes for keyset pagination of the call history
+-- (ORDER BY start_time DESC, id DESC, optionally filtered by status)
+
+CREATE INDEX idx_calls_start_time_id ON calls (start_time, id);
+CREATE INDEX idx_calls_status_start_time_id ON calls (status, start_time, id);
@@ -0,0 +1,10 @@
+-- Compressed transcript columns (see persistence/codec.py).
+-- New transcripts are written to transcription_z only; the plain columns are
+-- kept for rows not yet converted by the backfill (services/transcript_store.py).
+
+ALTER TABLE calls
+ADD COLUMN transcription_z LONGBLOB COMMENT 'Compressed transcription, first byte is the codec format' AFTER transcription;
+
+ALTER TABLE call_transcriptions
+MODIFY COLUMN transcription JSON NULL COMMENT 'JSON array of transcription messages (legacy, uncompressed)',
+ADD COLUMN transcription_z LONGBLOB COMMENT 'Compressed JSON array of transcription messages' AFTER transcription;
@@ -0,0 +1,22 @@
+-- Indexes the retention job deletes by, and the hourly rollup table that
+-- old system monitor samples are folded into (see services/log_retention.py)
+
+CREATE INDEX idx_error_logs_timestamp ON error_logs (timestamp);
+CREATE INDEX idx_system_monitor_logs_timestamp ON system_monitor_logs (timestamp);
+
+CREATE TABLE IF NOT EXISTS system_monitor_hourly (
+  hour DATETIME PRIMARY KEY COMMENT 'Start of the hour the samples were taken in',
+  samples INT NOT NULL COMMENT 'Number of raw samples aggregated',
+  avg_cpu_usage DECIMAL(5,2),
+  max_cpu_usage DECIMAL(5,2),
+  avg_memory_usage DECIMAL(5,2),
+  max_memory_usage DECIMAL(5,2),
+  avg_disk_usage DECIMAL(5,2),
+  max_disk_usage DECIMAL(5,2),
+  avg_network_usage DECIMAL(10,2),
+  max_network_usage DECIMAL(10,2),
+  avg_active_calls DECIMAL(8,2),
+  max_active_calls INT,
+  min_call_capacity INT,
+  created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
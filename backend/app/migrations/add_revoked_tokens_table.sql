@@ -0,0 +1,11 @@
+-- Tokens revoked by logout, kept until they would have expired anyway
+-- (see security/token_cache.py). Lives next to users in the local database.
+
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    token_digest CHAR(32) NOT NULL PRIMARY KEY COMMENT 'Hex BLAKE2b-128 digest of the token',
+    expires_at DATETIME NOT NULL,
+    revoked_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_revoked_tokens_revoked_at ON revoked_tokens (revoked_at);
+CREATE INDEX idx_revoked_tokens_expires_at ON revoked_tokens (expires_at);
@@ -0,0 +1,33 @@
+-- Adds the calls archived before call_metrics_daily existed to the rollup
+-- (see services/call_metrics.py). The rollup sweep only reads calls, so
+-- without this, days whose calls were all archived report zero.
+-- Each day's totals are rebuilt from the counted calls plus every finished
+-- archived call rather than added to, so re-running this (also after a
+-- crash between the statements) gives the same totals. Days already
+-- reconciled with Twilio keep Twilio's figures. calls_archive.rollup_counted
+-- then marks the archived calls as counted; the archiver copies the flag over.
+
+ALTER TABLE calls_archive
+ADD COLUMN rollup_counted BOOLEAN NOT NULL DEFAULT FALSE COMMENT 'Already added to call_metrics_daily';
+
+INSERT INTO call_metrics_daily (day, total_calls, total_duration, total_cost, total_ultravox_cost)
+SELECT day, COUNT(*), COALESCE(SUM(duration), 0), COALESCE(SUM(cost), 0), COALESCE(SUM(ultravox_cost), 0)
+FROM (
+    SELECT DATE(start_time) AS day, duration, cost, ultravox_cost
+    FROM calls
+    WHERE rollup_counted = TRUE AND status IN ('completed', 'busy', 'failed', 'no-answer', 'canceled')
+    UNION ALL
+    SELECT DATE(start_time) AS day, duration, cost, ultravox_cost
+    FROM calls_archive
+    WHERE status IN ('completed', 'busy', 'failed', 'no-answer', 'canceled')
+) AS counted_calls
+WHERE day IS NOT NULL
+GROUP BY day
+ON DUPLICATE KEY UPDATE
+    total_calls = CASE WHEN reconciled_at IS NULL THEN VALUES(total_calls) ELSE total_calls END,
+    total_duration = CASE WHEN reconciled_at IS NULL THEN VALUES(total_duration) ELSE total_duration END,
+    total_cost = CASE WHEN reconciled_at IS NULL THEN VALUES(total_cost) ELSE total_cost END,
+    total_ultravox_cost = CASE WHEN reconciled_at IS NULL THEN VALUES(total_ultravox_cost) ELSE total_ultravox_cost END;
+
+UPDATE calls_archive SET rollup_counted = TRUE
+WHERE rollup_counted = FALSE AND status IN ('completed', 'busy', 'failed', 'no-answer', 'canceled');
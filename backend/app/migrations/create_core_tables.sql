@@ -0,0 +1,32 @@
+-- Core tables required by every database the application writes to (local and external)
+
+CREATE TABLE IF NOT EXISTS error_logs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    timestamp TIMESTAMP NOT NULL,
+    path VARCHAR(255) NOT NULL,
+    method VARCHAR(10) NOT NULL,
+    error_type VARCHAR(100) NOT NULL,
+    error_message TEXT NOT NULL,
+    traceback TEXT,
+    headers TEXT,
+    client_ip VARCHAR(45)
+);
+
+CREATE TABLE IF NOT EXISTS calls (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    call_sid VARCHAR(255) NOT NULL,
+    from_number VARCHAR(20) NOT NULL,
+    to_number VARCHAR(20) NOT NULL,
+    direction ENUM('inbound', 'outbound') NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    start_time DATETIME NOT NULL,
+    end_time DATETIME,
+    duration INT,
+    recording_url TEXT,
+    transcription TEXT,
+    cost DECIMAL(10, 4),
+    segments INT,
+    ultravox_cost DECIMAL(10, 4),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
@@ -0,0 +1,19 @@
+-- Service connections (as in init_mysql.sql). add_call_features_tables.sql
+-- adds columns to this table, so it must exist before that migration runs.
+
+CREATE TABLE IF NOT EXISTS service_connections (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    service_name VARCHAR(50) NOT NULL,
+    credentials JSON,
+    is_connected BOOLEAN DEFAULT FALSE,
+    last_connected DATETIME,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY unique_service (service_name)
+);
+
+INSERT IGNORE INTO service_connections (service_name, is_connected) VALUES
+('twilio', FALSE),
+('google_drive', FALSE),
+('ultravox', FALSE),
+('supabase', FALSE);
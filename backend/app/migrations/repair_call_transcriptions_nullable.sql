@@ -0,0 +1,8 @@
+-- Local SQLite databases created before the SQLite shim could run MODIFY
+-- COLUMN (see persistence/sqlite.py) kept call_transcriptions.transcription
+-- NOT NULL, so compressed transcripts, stored with transcription NULL, could
+-- not be saved there. Repeats the change from add_compressed_transcripts.sql;
+-- where that already applied, the definition is unchanged.
+
+ALTER TABLE call_transcriptions
+MODIFY COLUMN transcription JSON NULL COMMENT 'JSON array of transcription messages (legacy, uncompressed)';
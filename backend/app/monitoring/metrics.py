@@ -33,6 +33,153 @@ call_duration_seconds = Histogram(
     'Call duration in seconds'
 )
 
+# Database metrics, labelled by pool and normalized statement fingerprint
+DB_LATENCY_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10)
+
+db_pool_acquire_seconds = Histogram(
+    'db_pool_acquire_seconds',
+    'Time spent waiting for a pooled database connection',
+    ['pool', 'statement'],
+    buckets=DB_LATENCY_BUCKETS
+)
+
+db_query_duration_seconds = Histogram(
+    'db_query_duration_seconds',
+    'Database statement execution time',
+    ['pool', 'statement'],
+    buckets=DB_LATENCY_BUCKETS
+)
+
+db_query_rows = Histogram(
+    'db_query_rows',
+    'Rows returned or affected per database statement',
+    ['pool', 'statement'],
+    buckets=(0, 1, 10, 100, 1000, 10000, 100000)
+)
+
+# Fingerprints longer than this are truncated to keep label values bounded
+MAX_STATEMENT_LABEL_LENGTH = 200
+
+db_pool_size = Gauge(
+    'db_pool_size',
+    'Open connections in the database pool',
+    ['pool']
+)
+
+db_pool_in_use = Gauge(
+    'db_pool_in_use',
+    'Database connections currently checked out',
+    ['pool']
+)
+
+db_pool_waiters = Gauge(
+    'db_pool_waiters',
+    'Callers waiting for a database connection',
+    ['pool']
+)
+
+db_pool_target_size = Gauge(
+    'db_pool_target_size',
+    'Pool size the adaptive sizer is aiming for',
+    ['pool']
+)
+
+# Token verification user cache
+user_cache_requests_total = Counter(
+    'user_cache_requests_total',
+    'User lookups during token verification by cache result',
+    ['result']  # hit, negative_hit (cached unknown user), miss
+)
+
+user_cache_entries = Gauge(
+    'user_cache_entries',
+    'Users currently held in the token verification cache'
+)
+
+# Password hashing (bcrypt) on its dedicated threads
+password_hash_queue_depth = Gauge(
+    'password_hash_queue_depth',
+    'Password hash and verify jobs running or waiting for a hashing thread'
+)
+
+password_hash_seconds = Histogram(
+    'password_hash_seconds',
+    'Time from submitting a password hash job to its result, including queueing',
+    ['operation'],
+    buckets=(.05, .1, .25, .5, 1, 2.5, 5, 10)
+)
+
+password_hash_rejected_total = Counter(
+    'password_hash_rejected_total',
+    'Password hash jobs refused because the queue was full',
+    ['operation']
+)
+
+login_throttled_total = Counter(
+    'login_throttled_total',
+    'Login attempts rejected by the login throttle',
+    ['key']  # user or ip
+)
+
+rate_limited_total = Counter(
+    'rate_limited_total',
+    'Requests rejected by the rate limiter',
+    ['budget']  # ui or webhook
+)
+
+# Twilio REST client calls, run on the Twilio threads
+twilio_request_seconds = Histogram(
+    'twilio_request_seconds',
+    'Time from submitting a Twilio client call to its result, including queueing',
+    ['operation', 'outcome'],
+    buckets=(.05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+)
+
+twilio_requests_in_flight = Gauge(
+    'twilio_requests_in_flight',
+    'Twilio client calls running or waiting for a Twilio thread'
+)
+
+# Bulk dialer
+bulk_dial_calls_total = Counter(
+    'bulk_dial_calls_total',
+    'Numbers dialed by the bulk dialer',
+    ['status']  # success, failed, unknown (timed out) or skipped
+)
+
+bulk_dial_in_flight = Gauge(
+    'bulk_dial_in_flight',
+    'Bulk dialer call requests currently waiting on Twilio'
+)
+
+bulk_dial_concurrency_limit = Gauge(
+    'bulk_dial_concurrency_limit',
+    'Concurrent bulk dialer call requests allowed (BULK_DIAL_MAX_CONCURRENCY)'
+)
+
+bulk_dial_calls_per_second = Gauge(
+    'bulk_dial_calls_per_second',
+    'Bulk dialer call start rate allowed by the current call capacity and Twilio'
+)
+
+# Twilio status callbacks, coalesced per call and written in batches
+status_callbacks_total = Counter(
+    'status_callbacks_total',
+    'Twilio status callbacks received',
+    ['result']  # queued, or coalesced into an event already waiting
+)
+
+status_callbacks_pending = Gauge(
+    'status_callbacks_pending',
+    'Calls with a status update waiting to be written'
+)
+
+status_callback_batch_size = Histogram(
+    'status_callback_batch_size',
+    'Calls updated per batched status write',
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+
 class MetricsCollector:
     def __init__(self):
         self.start_time = time.time()
@@ -78,4 +225,71 @@ class MetricsCollector:
     def record_call_duration(self, duration: float):
         call_duration_seconds.observe(duration)
 
-metrics_collector = MetricsCollector()
+    def record_db_acquire(self, pool: str, statement: str, duration: float):
+        db_pool_acquire_seconds.labels(
+            pool=pool,
+            statement=statement[:MAX_STATEMENT_LABEL_LENGTH]
+        ).observe(duration)
+
+    def record_db_query(self, pool: str, statement: str, duration: float, rows: Optional[int] = None):
+        statement = statement[:MAX_STATEMENT_LABEL_LENGTH]
+        db_query_duration_seconds.labels(pool=pool, statement=statement).observe(duration)
+        if rows is not None:
+            db_query_rows.labels(pool=pool, statement=statement).observe(rows)
+
+    def set_db_pool_waiters(self, pool: str, waiters: int):
+        db_pool_waiters.labels(pool=pool).set(waiters)
+
+    def record_db_pool(self, pool: str, size: int, in_use: int, waiters: int, target: int):
+        db_pool_size.labels(pool=pool).set(size)
+        db_pool_in_use.labels(pool=pool).set(in_use)
+        db_pool_waiters.labels(pool=pool).set(waiters)
+        db_pool_target_size.labels(pool=pool).set(target)
+
+    def record_user_cache(self, result: str):
+        user_cache_requests_total.labels(result=result).inc()
+
+    def set_user_cache_entries(self, entries: int):
+        user_cache_entries.set(entries)
+
+    def set_password_hash_queue_depth(self, depth: int):
+        password_hash_queue_depth.set(depth)
+
+    def record_password_hash(self, operation: str, duration: float):
+        password_hash_seconds.labels(operation=operation).observe(duration)
+
+    def record_password_hash_rejected(self, operation: str):
+        password_hash_rejected_total.labels(operation=operation).inc()
+
+    def record_login_throttled(self, key: str):
+        login_throttled_total.labels(key=key).inc()
+
+    def record_rate_limited(self, budget: str):
+        rate_limited_total.labels(budget=budget).inc()
+
+    def record_twilio_request(self, operation: str, outcome: str, duration: float):
+        twilio_request_seconds.labels(operation=operation, outcome=outcome).observe(duration)
+
+    def set_twilio_in_flight(self, count: int):
+        twilio_requests_in_flight.set(count)
+
+    def record_bulk_dial(self, status: str):
+        bulk_dial_calls_total.labels(status=status).inc()
+
+    def set_bulk_dial_in_flight(self, count: int):
+        bulk_dial_in_flight.set(count)
+
+    def set_bulk_dial_pacing(self, limit: int, calls_per_second: float):
+        bulk_dial_concurrency_limit.set(limit)
+        bulk_dial_calls_per_second.set(calls_per_second)
+
+    def record_status_callback(self, result: str):
+        status_callbacks_total.labels(result=result).inc()
+
+    def set_status_callbacks_pending(self, count: int):
+        status_callbacks_pending.set(count)
+
+    def record_status_callback_flush(self, calls: int):
+        status_callback_batch_size.observe(calls)
+
+metrics_collector = MetricsCollector()
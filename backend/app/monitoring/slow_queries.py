@@ -0,0 +1,125 @@
+# backend/app/monitoring/slow_queries.py
+
+import asyncio
+import collections
+import logging
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set
+
+import aiomysql
+
+logger = logging.getLogger(__name__)
+
+# Statement verbs MySQL can EXPLAIN without side effects worth looking at
+EXPLAINABLE_VERBS = frozenset({"select", "update", "delete"})
+
+# Longest query text kept per entry
+MAX_QUERY_LENGTH = 2000
+
+
+class SlowQueryLog:
+    """
+    Ring buffer of the most recent statements that ran longer than a threshold.
+
+    The first time a fingerprint turns up slow its EXPLAIN plan is captured in
+    the background on the pool that ran it and cached, so later entries for the
+    same statement reuse the plan instead of issuing another EXPLAIN. Parameter
+    values are used for the EXPLAIN but never stored.
+    """
+
+    def __init__(self, threshold_ms: float, maxlen: int = 200, explain: bool = True,
+                 explain_timeout: float = 2.0, max_plans: int = 256):
+        self.threshold = max(0.0, threshold_ms) / 1000.0
+        self.explain = explain
+        self.explain_timeout = explain_timeout
+        self.max_plans = max(1, max_plans)
+
+        self._entries: Deque[Dict[str, Any]] = collections.deque(maxlen=max(1, maxlen))
+        self._plans: "collections.OrderedDict[str, List[Dict[str, Any]]]" = collections.OrderedDict()
+        self._explaining: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def is_slow(self, duration: float) -> bool:
+        return duration >= self.threshold
+
+    def record(self, pool_name: str, fingerprint: str, verb: str, query: str, params: Any,
+               duration: float, rows: Optional[int] = None, pool=None, explain: bool = True) -> Dict[str, Any]:
+        """
+        Add a slow statement to the log and schedule an EXPLAIN if needed.
+
+        Args:
+            pool_name: Name of the pool that ran the statement
+            fingerprint: Normalized statement text
+            verb: Statement verb, used to decide whether it can be explained
+            query: SQL text as executed
+            params: Parameters the statement ran with (only used for EXPLAIN)
+            duration: Execution time in seconds
+            rows: Rows returned or affected
+            pool: Pool to run the EXPLAIN on
+            explain: Set to False when the statement cannot be explained as-is
+
+        Returns:
+            The log entry
+        """
+        entry = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "pool": pool_name,
+            "statement": fingerprint,
+            "query": query[:MAX_QUERY_LENGTH],
+            "duration_ms": round(duration * 1000, 3),
+            "rows": rows,
+            "explain": self._plans.get(fingerprint)
+        }
+        self._entries.append(entry)
+        logger.warning(f"Slow query on {pool_name} database ({entry['duration_ms']} ms): {fingerprint[:200]}")
+
+        if fingerprint in self._plans:
+            self._plans.move_to_end(fingerprint)
+        elif (self.explain and explain and pool is not None and verb in EXPLAINABLE_VERBS
+                and fingerprint not in self._explaining):
+            self._schedule_explain(pool, fingerprint, query, params)
+        return entry
+
+    def entries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Logged statements, newest first"""
+        items = list(reversed(self._entries))
+        return items[:limit] if limit else items
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._plans.clear()
+
+    def _schedule_explain(self, pool, fingerprint: str, query: str, params: Any) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._explaining.add(fingerprint)
+        task = loop.create_task(self._capture_explain(pool, fingerprint, query, params))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _capture_explain(self, pool, fingerprint: str, query: str, params: Any) -> None:
+        try:
+            conn = await asyncio.wait_for(pool.acquire(), self.explain_timeout)
+            try:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await asyncio.wait_for(cursor.execute(f"EXPLAIN {query}", params or ()), self.explain_timeout)
+                    plan = [dict(row) for row in await cursor.fetchall()]
+            except BaseException:
+                conn.close()
+                raise
+            finally:
+                pool.release(conn)
+        except Exception as e:
+            logger.debug(f"Could not EXPLAIN slow query: {e}")
+            plan = [{"error": str(e)}]
+        finally:
+            self._explaining.discard(fingerprint)
+
+        self._plans[fingerprint] = plan
+        while len(self._plans) > self.max_plans:
+            self._plans.popitem(last=False)
+        for entry in self._entries:
+            if entry["statement"] == fingerprint and entry["explain"] is None:
+                entry["explain"] = plan
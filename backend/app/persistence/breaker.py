@@ -0,0 +1,143 @@
+# backend/app/persistence/breaker.py
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# MySQL error codes that indicate a sick server or connection rather than a bad statement
+TRANSIENT_ERROR_CODES = frozenset({
+    1040,  # Too many connections
+    1053,  # Server shutdown in progress
+    1205,  # Lock wait timeout exceeded
+    1213,  # Deadlock found when trying to get lock
+    2003,  # Can't connect to MySQL server
+    2006,  # MySQL server has gone away
+    2013,  # Lost connection to MySQL server during query
+    2014,  # Commands out of sync
+    2055,  # Lost connection to MySQL server at '%s', system error
+})
+
+# SQLite primary result codes for a database another connection has locked
+# (SQLITE_BUSY, SQLITE_LOCKED); the statement did not run
+SQLITE_BUSY_CODES = frozenset({5, 6})
+
+# Errors after which the server has rolled the statement back, so even a
+# non-idempotent write can safely be sent again
+ROLLED_BACK_ERROR_CODES = frozenset({1205, 1213})
+
+
+def error_code(exc: BaseException) -> int:
+    """MySQL error code carried by a pymysql/aiomysql exception, or 0"""
+    args = getattr(exc, "args", ())
+    if args and isinstance(args[0], int):
+        return args[0]
+    return 0
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Whether an error is worth retrying: timeouts, dropped connections and
+    the MySQL codes listed in TRANSIENT_ERROR_CODES
+    """
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(exc).__name__ == "InterfaceError":
+        # pymysql raises InterfaceError(0, '') for operations on a closed connection
+        return True
+    if error_code(exc) in TRANSIENT_ERROR_CODES:
+        return True
+    if _sqlite_code(exc) in SQLITE_BUSY_CODES:
+        return True
+    return isinstance(exc, OSError)
+
+
+def _sqlite_code(exc: BaseException) -> int:
+    """Primary SQLite result code carried by a sqlite3 exception, or 0"""
+    return (getattr(exc, "sqlite_errorcode", None) or 0) & 0xFF
+
+
+def is_rolled_back(exc: BaseException) -> bool:
+    return error_code(exc) in ROLLED_BACK_ERROR_CODES or _sqlite_code(exc) in SQLITE_BUSY_CODES
+
+
+class CircuitBreaker:
+    """
+    Per-pool circuit breaker.
+
+    closed:    requests flow, consecutive transient failures are counted
+    open:      requests fail immediately until reset_timeout has passed
+    half_open: a limited number of probe requests are let through; one
+               success closes the breaker, one failure opens it again
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 10.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.half_open_in_flight = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent to the pool right now"""
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self.half_open_in_flight = 0
+            logger.info(f"Circuit for {self.name} database half-open, probing")
+
+        if self.state == self.HALF_OPEN:
+            if self.half_open_in_flight >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self.half_open_in_flight += 1
+        return True
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for {self.name} database closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.half_open_in_flight = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                logger.warning(f"Circuit for {self.name} database opened after {self.failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self.half_open_in_flight = 0
+
+    def abandon(self) -> None:
+        """Give back a half-open probe slot when a request is cancelled before it finishes"""
+        if self.state == self.HALF_OPEN and self.half_open_in_flight > 0:
+            self.half_open_in_flight -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = 0.0
+        if self.state == self.OPEN:
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(retry_in, 3)
+        }
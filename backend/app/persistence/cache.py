@@ -0,0 +1,172 @@
+# backend/app/persistence/cache.py
+
+import asyncio
+import collections
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _freeze(value: Any) -> Hashable:
+    """Hashable form of query parameters, for use in cache keys"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(v) for v in value))
+    return value
+
+
+class LoadAbandoned(Exception):
+    """
+    Result of a shared load whose caller was cancelled before it finished;
+    callers that were waiting for it load again themselves
+    """
+
+
+class QueryCache:
+    """
+    In-process read-through cache for SELECT results.
+
+    Entries are keyed by pool, statement and parameters and tagged with the
+    tables the statement reads. Every write through Database invalidates the
+    tags of the tables it touches; entries otherwise live for the TTL given by
+    the caller. Each tag carries a version so that a read which overlapped a
+    write is not stored with data from before the write. Concurrent misses for
+    the same key share one database round trip.
+
+    Writes made by other processes or directly in MySQL are not seen, so the
+    TTL is the upper bound on staleness for those. Other in-process caches can
+    follow the same invalidations through add_listener().
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max(1, max_entries)
+
+        # key -> (expires_at, tags, rows)
+        self._entries: "collections.OrderedDict[Tuple, Tuple[float, FrozenSet[str], List[Dict[str, Any]]]]" = collections.OrderedDict()
+        self._by_tag: Dict[str, set] = collections.defaultdict(set)
+        self._versions: Dict[str, int] = collections.defaultdict(int)
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._listeners: List[Callable[[FrozenSet[str]], None]] = []
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(pool_name: str, query: str, params: Any) -> Tuple:
+        return (pool_name, query, _freeze(params))
+
+    async def get_or_load(self, key: Tuple, tags: FrozenSet[str], ttl: float,
+                          loader: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """
+        Return the cached rows for key, or run loader() and cache its result for ttl seconds
+
+        Rows are copied on the way out so callers may modify them freely.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, _, rows = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(rows)
+            self._drop(key)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                rows = await asyncio.shield(pending)
+            except LoadAbandoned:
+                return await self.get_or_load(key, tags, ttl, loader)
+            self.hits += 1
+            return self._copy(rows)
+
+        self.misses += 1
+        versions = {tag: self._versions[tag] for tag in tags}
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            rows = await loader()
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be waiting on it; don't let asyncio log it as unretrieved
+            future.exception()
+            raise
+        except BaseException:
+            # Not cancel(): waiters would get a CancelledError that is not theirs
+            future.set_exception(LoadAbandoned())
+            future.exception()
+            raise
+        else:
+            future.set_result(rows)
+        finally:
+            self._inflight.pop(key, None)
+
+        if all(self._versions[tag] == version for tag, version in versions.items()):
+            self._store(key, tags, ttl, rows)
+        return self._copy(rows)
+
+    def add_listener(self, listener: Callable[[FrozenSet[str]], None]) -> None:
+        """Call listener(tables) on every invalidation, with the tables that were written"""
+        self._listeners.append(listener)
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        """Drop every cached result that reads any of the given tables"""
+        tables = frozenset(tables)
+        for listener in self._listeners:
+            try:
+                listener(tables)
+            except Exception as e:
+                logger.error(f"Cache invalidation listener failed: {e}")
+        for tag in tables:
+            self._versions[tag] += 1
+            keys = self._by_tag.pop(tag, None)
+            if not keys:
+                continue
+            self.invalidations += len(keys)
+            for key in list(keys):
+                self._drop(key)
+
+    def clear(self) -> None:
+        for tag in list(self._by_tag):
+            self._versions[tag] += 1
+        self._entries.clear()
+        self._by_tag.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "invalidations": self.invalidations
+        }
+
+    def _store(self, key: Tuple, tags: FrozenSet[str], ttl: float, rows: List[Dict[str, Any]]) -> None:
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + ttl, tags, self._copy(rows))
+        for tag in tags:
+            self._by_tag[tag].add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: Tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    @staticmethod
+    def _copy(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [dict(row) if isinstance(row, dict) else row for row in rows]
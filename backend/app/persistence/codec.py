@@ -0,0 +1,70 @@
+# backend/app/persistence/codec.py
+
+import logging
+import zlib
+from typing import Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # Optional; zlib is used when it is not installed
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# First byte of every stored blob says how the rest is encoded, so the
+# format can change without rewriting rows written by older versions
+FORMAT_RAW = 0    # UTF-8 text, stored as-is (compression did not pay off)
+FORMAT_ZLIB = 1   # zlib-compressed UTF-8 text
+FORMAT_ZSTD = 2   # zstd-compressed UTF-8 text
+
+# Below this size compression overhead outweighs the savings
+MIN_COMPRESS_SIZE = 256
+
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 6
+
+_zstd_compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if zstandard else None
+_zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+
+def compress_text(text: Optional[str]) -> Optional[bytes]:
+    """
+    Encode text for a BLOB column, with zstd when available and zlib otherwise
+
+    Args:
+        text: Text to store (None is stored as NULL)
+
+    Returns:
+        Format byte followed by the payload
+    """
+    if text is None:
+        return None
+    raw = text.encode("utf-8")
+    if len(raw) >= MIN_COMPRESS_SIZE:
+        if _zstd_compressor is not None:
+            fmt, packed = FORMAT_ZSTD, _zstd_compressor.compress(raw)
+        else:
+            fmt, packed = FORMAT_ZLIB, zlib.compress(raw, ZLIB_LEVEL)
+        if len(packed) < len(raw):
+            return bytes([fmt]) + packed
+    return bytes([FORMAT_RAW]) + raw
+
+
+def decompress_text(blob: Optional[Union[bytes, bytearray, memoryview]]) -> Optional[str]:
+    """Decode a value written by compress_text"""
+    if blob is None:
+        return None
+    blob = bytes(blob)
+    if not blob:
+        return ""
+    fmt, payload = blob[0], blob[1:]
+    if fmt == FORMAT_RAW:
+        return payload.decode("utf-8")
+    if fmt == FORMAT_ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    if fmt == FORMAT_ZSTD:
+        if _zstd_decompressor is None:
+            raise RuntimeError("Text was stored with zstd but the zstandard package is not installed")
+        # Frames written by ZstdCompressor.compress carry their content size
+        return _zstd_decompressor.decompress(payload).decode("utf-8")
+    raise ValueError(f"Unknown compressed text format {fmt}")
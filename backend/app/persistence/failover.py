@@ -0,0 +1,212 @@
+# backend/app/persistence/failover.py
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import aiomysql
+
+from .mirror import MirrorQueue
+
+logger = logging.getLogger(__name__)
+
+
+class FailoverMonitor:
+    """
+    Probes the external database on a dedicated connection and fails traffic
+    over to the local database while it is unreachable.
+
+    After failure_threshold consecutive failed probes the monitor becomes
+    active: Database routes every query that would have gone to the external
+    pool to the local pool instead, and writes made meanwhile are appended to
+    a replay log. Once recovery_threshold consecutive probes succeed, the
+    replay log is applied to the external database in order and traffic fails
+    back. Whether a write needs replaying is decided when it is sent, and fail
+    back first waits for local writes still in flight, so a write that
+    finishes after the switch is replayed too. A statement the external
+    database rejects stays at the head of the log and keeps traffic on the
+    local database until it is dealt with. Like the local mirror, every
+    write is appended to the replay log's spool file as it is recorded, so
+    the log survives a crash and never drops writes when it outgrows memory.
+
+    Replayed inserts get their ids from the external database, so rows
+    created during an outage can carry different ids locally and externally.
+    """
+
+    # Replay rounds fail back may take to catch up with writes that keep arriving
+    max_fail_back_rounds = 10
+
+    def __init__(self, database, probe_interval: float, probe_timeout: float,
+                 failure_threshold: int, recovery_threshold: int, replay: MirrorQueue):
+        self.database = database
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_threshold = max(1, recovery_threshold)
+        self.replay = replay
+
+        self.active = False
+        self.config: Dict[str, Any] = {}
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+        self.failovers = 0
+        self.changed_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+        self._conn = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # Writes sent to the local database during the outage that have not finished
+        self._writes_in_flight = 0
+        self._writes_idle = asyncio.Event()
+        self._writes_idle.set()
+
+    async def start(self, config: Dict[str, Any]) -> None:
+        """
+        Start probing the external database described by config.
+        Writes spooled by a previous shutdown are queued for replay first.
+        """
+        await self.stop()
+        self.config = config
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+        # Load the spool without attaching a pool; replay only runs on fail back
+        await self.replay.start(None)
+        if self.replay.stats()["pending"]:
+            # Spooled writes from an earlier outage; replay them before serving from external
+            self._activate("writes left over from a previous outage")
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        self._close_probe()
+        # Persist writes that have not reached the external database yet
+        self.replay.pool = None
+        await self.replay.close()
+
+    def wake(self) -> None:
+        """Probe right away instead of waiting for the next interval"""
+        if self._wakeup:
+            self._wakeup.set()
+
+    def write_started(self) -> None:
+        """A write is being sent to the local database during the outage; call write_finished() after recording it"""
+        self._writes_in_flight += 1
+        self._writes_idle.clear()
+
+    def write_finished(self) -> None:
+        self._writes_in_flight -= 1
+        if not self._writes_in_flight:
+            self._writes_idle.set()
+
+    def record_write(self, statements, many: bool = False) -> None:
+        """Remember a write served locally during an outage for replay against the external database"""
+        if not self.replay.enqueue(statements, many=many):
+            logger.error("Failover replay log full and not spooled; a write made during the outage will not reach the external database")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "failovers": self.failovers,
+            "seconds_in_state": round(time.monotonic() - self.changed_at, 3) if self.changed_at else None,
+            "last_error": self.last_error,
+            "replay": self.replay.stats()
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.probe_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if await self._probe():
+                self.consecutive_failures = 0
+                self.consecutive_successes += 1
+                if self.active and self.consecutive_successes >= self.recovery_threshold:
+                    await self._fail_back()
+            else:
+                self.consecutive_successes = 0
+                self.consecutive_failures += 1
+                if not self.active and self.consecutive_failures >= self.failure_threshold:
+                    self._activate(self.last_error)
+
+    async def _probe(self) -> bool:
+        try:
+            if self._conn is None:
+                self._conn = await asyncio.wait_for(aiomysql.connect(
+                    host=self.config.get('host'),
+                    user=self.config.get('user'),
+                    password=self.config.get('password'),
+                    db=self.config.get('database'),
+                    autocommit=True,
+                    connect_timeout=self.probe_timeout
+                ), self.probe_timeout)
+            async with self._conn.cursor() as cursor:
+                await asyncio.wait_for(cursor.execute("SELECT 1"), self.probe_timeout)
+                await cursor.fetchone()
+            return True
+        except Exception as e:
+            self.last_error = str(e) or type(e).__name__
+            self._close_probe()
+            return False
+
+    def _close_probe(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def _activate(self, reason: Optional[str]) -> None:
+        self.active = True
+        self.failovers += 1
+        self.changed_at = time.monotonic()
+        logger.critical(f"External database unavailable, failing over to local database: {reason}")
+
+    async def _fail_back(self) -> None:
+        pool = self.database.pool
+        if pool is None or pool is self.database.local_pool:
+            return
+
+        # Connections idle in the pool were opened before the outage and are likely dead
+        try:
+            await pool.clear()
+        except Exception as e:
+            logger.warning(f"Error clearing external database pool before fail back: {e}")
+
+        self.replay.pool = pool
+        try:
+            for _ in range(self.max_fail_back_rounds):
+                if self._writes_in_flight:
+                    # Writes already sent to the local database are recorded when they finish
+                    try:
+                        await asyncio.wait_for(self._writes_idle.wait(), self.probe_interval)
+                    except asyncio.TimeoutError:
+                        break
+                    continue
+                if not self.replay.stats()["pending"]:
+                    # Nothing is awaited between these checks and the switch, so no write can slip in between
+                    self.active = False
+                    self.changed_at = time.monotonic()
+                    self.consecutive_failures = 0
+                    logger.info("External database healthy again, outage writes replayed; failing back")
+                    return
+                if not await self.replay.flush():
+                    logger.warning("Could not replay outage writes to external database; staying on local database")
+                    self.consecutive_successes = 0
+                    return
+            logger.warning("Outage writes still arriving after replay; staying on local database for now")
+            self.consecutive_successes = 0
+        finally:
+            self.replay.pool = None
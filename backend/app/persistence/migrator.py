@@ -0,0 +1,251 @@
+# backend/app/persistence/migrator.py
+
+import hashlib
+import logging
+import os
+import re
+from typing import Dict, FrozenSet, List, Tuple
+
+from .breaker import error_code
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
+
+# Ordered migration manifest: (file name, scope). Scope "local" migrations are
+# only applied to the local database, "all" to the local and the external one.
+# Append new migrations at the end; never reorder or edit applied entries
+# (an edited entry needs its old checksum listed in SUPERSEDED_CHECKSUMS).
+# A migration may only be inserted before existing ones if it is safe to run
+# after them too, since databases that already have them apply it last.
+MIGRATIONS: List[Tuple[str, str]] = [
+    ("create_users_table.sql", "local"),
+    ("create_core_tables.sql", "all"),
+    ("create_service_tables.sql", "all"),
+    ("add_data_sync_jobs_table.sql", "all"),
+    ("create_service_connections_table.sql", "all"),
+    ("add_call_features_tables.sql", "all"),
+    ("add_calls_history_indexes.sql", "all"),
+    ("add_calls_archive_table.sql", "all"),
+    ("add_compressed_transcripts.sql", "all"),
+    ("add_log_retention.sql", "all"),
+    ("add_revoked_tokens_table.sql", "local"),
+    ("add_call_campaigns.sql", "all"),
+    ("add_call_metrics_daily.sql", "all"),
+    ("backfill_call_metrics_archive.sql", "all"),
+    ("repair_call_transcriptions_nullable.sql", "local"),
+    ("add_call_child_archive_tables.sql", "all"),
+    ("add_call_metrics_reconcile_claim.sql", "all"),
+    ("add_clients_table.sql", "all"),
+]
+
+# Earlier checksums of migrations that were since edited without changing
+# their effect; a ledger row with one of these is updated, not warned about
+SUPERSEDED_CHECKSUMS: Dict[str, FrozenSet[str]] = {
+    # Made portable to MySQL 8 and SQLite (no ADD COLUMN / CREATE INDEX IF NOT EXISTS)
+    "add_call_features_tables.sql": frozenset({
+        "aa08b7a6f4b0d34e7f22e653c756c1e3c6189a63a13838f4e1f30f05f4ffaa8f",
+    }),
+    # Rebuilds the day totals instead of adding to them, so a re-run after a crash counts nothing twice
+    "backfill_call_metrics_archive.sql": frozenset({
+        "615deaeb2fc57d92fe0edadfb2a102bc50437caa3996737d57647fce8336ea6e",
+    }),
+}
+
+# MySQL errors for creating a table, column, index or foreign key that exists
+ALREADY_EXISTS_ERROR_CODES = frozenset({
+    1050,  # Table already exists
+    1060,  # Duplicate column name
+    1061,  # Duplicate key name
+    1826,  # Duplicate foreign key constraint name
+})
+
+# The same for SQLite, which reports them only by message
+_SQLITE_ALREADY_EXISTS = re.compile(r"^(?:(?:table|index) \S+ already exists|duplicate column name)", re.I)
+
+LEDGER_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version VARCHAR(255) NOT NULL PRIMARY KEY,
+        checksum CHAR(64) NOT NULL,
+        applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def split_sql_statements(sql: str) -> List[str]:
+    """
+    Split a SQL script into statements on top-level semicolons, ignoring
+    semicolons inside quotes, backticks and comments. Comments are dropped.
+    """
+    statements = []
+    current = []
+    i = 0
+    length = len(sql)
+    quote = None
+
+    while i < length:
+        char = sql[i]
+        nxt = sql[i + 1] if i + 1 < length else ""
+
+        if quote:
+            current.append(char)
+            if char == "\\" and quote != "`" and nxt:
+                current.append(nxt)
+                i += 2
+                continue
+            if char == quote:
+                if nxt == quote:
+                    # Doubled quote is an escaped quote
+                    current.append(nxt)
+                    i += 2
+                    continue
+                quote = None
+            i += 1
+            continue
+
+        if char in ("'", '"', "`"):
+            quote = char
+            current.append(char)
+        elif char == "-" and nxt == "-" and (i + 2 >= length or sql[i + 2] in " \t\r\n"):
+            end = sql.find("\n", i)
+            i = length if end == -1 else end
+            continue
+        elif char == "#":
+            end = sql.find("\n", i)
+            i = length if end == -1 else end
+            continue
+        elif char == "/" and nxt == "*":
+            end = sql.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+            current.append(" ")
+            continue
+        elif char == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        else:
+            current.append(char)
+        i += 1
+
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def file_checksum(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def already_exists(exc: BaseException) -> bool:
+    """Whether a DDL statement failed only because what it creates is already there"""
+    if error_code(exc) in ALREADY_EXISTS_ERROR_CODES:
+        return True
+    return type(exc).__module__ == "sqlite3" and bool(_SQLITE_ALREADY_EXISTS.match(str(exc)))
+
+
+class MigrationRunner:
+    """
+    Applies the migration manifest exactly once per database, recording each
+    applied file and its checksum in the schema_migrations ledger.
+
+    Once a database is current, a run costs a single primary-key scan of the
+    ledger. Each migration is sent as one transaction together with its ledger
+    row; note that MySQL commits DDL implicitly, so a migration that fails
+    half-way is not recorded and will be retried on the next start.
+
+    Statements that create a table, column or index that already exists are
+    skipped. That makes retries safe, and it adopts schemas built outside the
+    runner (init_mysql.sql, deploy.sh): their migrations are recorded and only
+    what is missing gets created.
+    """
+
+    def __init__(self, database, migrations_dir: str = MIGRATIONS_DIR, manifest: List[Tuple[str, str]] = None):
+        self.database = database
+        self.migrations_dir = migrations_dir
+        self.manifest = manifest if manifest is not None else MIGRATIONS
+
+    async def applied_versions(self, use_local: bool) -> Dict[str, str]:
+        """Map of applied version -> checksum (empty if the ledger does not exist yet)"""
+        try:
+            rows = await self.database.execute(
+                "SELECT version, checksum FROM schema_migrations",
+                use_local=use_local
+            )
+        except Exception:
+            return {}
+        return {row['version']: row['checksum'] for row in rows or []}
+
+    async def run(self, use_local: bool = True) -> bool:
+        """
+        Apply pending migrations to the local (use_local=True) or the active
+        external database.
+
+        Returns:
+            True if the database is fully migrated
+        """
+        scope_filter = ("local", "all") if use_local else ("all",)
+        wanted = []
+        for filename, scope in self.manifest:
+            if scope not in scope_filter:
+                continue
+            path = os.path.join(self.migrations_dir, filename)
+            if not os.path.exists(path):
+                logger.error(f"Migration file not found: {path}")
+                continue
+            wanted.append((filename, path, file_checksum(path)))
+
+        applied = await self.applied_versions(use_local)
+        pending = []
+        for version, path, checksum in wanted:
+            if version not in applied:
+                pending.append((version, path, checksum))
+            elif applied[version] in SUPERSEDED_CHECKSUMS.get(version, ()):
+                await self.database.execute(
+                    "UPDATE schema_migrations SET checksum = %s WHERE version = %s",
+                    (checksum, version),
+                    use_local=use_local, mirror=False
+                )
+                logger.info(f"Migration {version} was updated after it was applied; recorded its new checksum")
+            elif applied[version] != checksum:
+                logger.warning(f"Migration {version} changed after it was applied; not re-applying it")
+
+        if not pending:
+            logger.info("Database schema is up to date")
+            return True
+
+        if not applied:
+            await self.database.execute(LEDGER_DDL, use_local=use_local, mirror=False)
+
+        success = True
+        for version, path, checksum in pending:
+            if not await self.apply(version, path, checksum, use_local):
+                success = False
+                # Later migrations may depend on this one
+                break
+        return success
+
+    async def apply(self, version: str, path: str, checksum: str, use_local: bool) -> bool:
+        with open(path, 'r') as f:
+            statements = split_sql_statements(f.read())
+
+        try:
+            async with self.database.transaction(use_local=use_local, mirror=False) as tx:
+                for statement in statements:
+                    try:
+                        await tx.execute(statement)
+                    except Exception as e:
+                        if not already_exists(e):
+                            raise
+                        logger.info(f"Migration {version}: skipping, already in place ({e})")
+                await tx.execute(
+                    "INSERT INTO schema_migrations (version, checksum) VALUES (%s, %s)",
+                    (version, checksum)
+                )
+        except Exception as e:
+            logger.error(f"Migration {version} failed: {e}")
+            return False
+        logger.info(f"Migration applied: {version}")
+        return True
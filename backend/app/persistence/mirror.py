@@ -0,0 +1,469 @@
+# backend/app/persistence/mirror.py
+
+import asyncio
+import base64
+import collections
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .breaker import is_transient
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every process uses the first spool file
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Spool files a process tries (spool_path, spool_path.1, ...) before giving up on one of its own
+SPOOL_SLOTS = 64
+# Applied bytes at the head of a spool that trigger compacting it, once they are also half of it
+SPOOL_COMPACT_BYTES = 1 << 20
+
+# A mirrored unit of work: one or more (query, params) pairs that must be
+# replayed together. Single statements are replayed with autocommit, groups of
+# statements (from execute_transaction) are replayed inside one transaction.
+# Bulk entries (from execute_many) carry one query and a list of parameter rows.
+MirrorStatements = List[Tuple[str, Any]]
+
+# A queued entry: (enqueued at, statements, many, byte offset of its line in the spool or None)
+MirrorEntry = Tuple[float, MirrorStatements, bool, Optional[int]]
+
+
+def _encode_value(value: Any) -> Any:
+    """Tag values that JSON cannot represent so they survive the spool file"""
+    if isinstance(value, datetime):
+        return {"__type__": "datetime", "value": value.isoformat()}
+    if isinstance(value, date):
+        return {"__type__": "date", "value": value.isoformat()}
+    if isinstance(value, dt_time):
+        return {"__type__": "time", "value": value.isoformat()}
+    if isinstance(value, timedelta):
+        return {"__type__": "timedelta", "value": value.total_seconds()}
+    if isinstance(value, Decimal):
+        return {"__type__": "decimal", "value": str(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {"__type__": "bytes", "value": base64.b64encode(bytes(value)).decode("ascii")}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _encode_value(v) for k, v in value.items()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """Reverse of _encode_value"""
+    if isinstance(value, list):
+        return tuple(_decode_value(v) for v in value)
+    if isinstance(value, dict):
+        kind = value.get("__type__")
+        if kind == "datetime":
+            return datetime.fromisoformat(value["value"])
+        if kind == "date":
+            return date.fromisoformat(value["value"])
+        if kind == "time":
+            return dt_time.fromisoformat(value["value"])
+        if kind == "timedelta":
+            return timedelta(seconds=value["value"])
+        if kind == "decimal":
+            return Decimal(value["value"])
+        if kind == "bytes":
+            return base64.b64decode(value["value"])
+        return {k: _decode_value(v) for k, v in value.items()}
+    return value
+
+
+class MirrorQueue:
+    """
+    Bounded write-behind queue that replays writes made against the external
+    database into the local backup database in the background.
+
+    Writes are acknowledged as soon as the external database has accepted them;
+    the local copy is brought up to date in batches by a single flusher task.
+
+    With a spool_path every entry is appended to the spool file before
+    enqueue() returns, so entries survive the process dying. At most maxsize
+    entries are held in memory; beyond that they wait only in the spool and
+    are read back as the queue drains, instead of being dropped. How far the
+    spool has been applied is recorded in <spool>.head after every flush; the
+    spool is truncated once everything in it is applied and compacted as it
+    grows, and on start whatever lies past the head is queued again. An entry
+    is replayed twice only if the process dies between applying it and
+    recording that, or when a dropped connection interrupts it. Each process
+    takes the first spool not locked by another (spool_path, spool_path.1,
+    ...), so app workers never share one, and the spool of a dead process is
+    picked up by the next process to start. Without a spool_path the queue
+    lives in memory only and drops (and counts) new entries when full.
+
+    With autoflush=False no flusher task is started and the owner decides when
+    to call flush(). With drop_rejected=False an entry the database rejects is
+    kept at the head of the queue too, and flush() reports no progress until
+    it goes through.
+    """
+
+    def __init__(self, maxsize: int, batch_size: int, flush_interval: float, spool_path: str,
+                 autoflush: bool = True, drop_rejected: bool = True):
+        self.maxsize = max(1, maxsize)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+        self.autoflush = autoflush
+        self.drop_rejected = drop_rejected
+        self.pool = None
+
+        self._pending: Deque[MirrorEntry] = collections.deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        # The spool this process holds, its .head file (which carries the lock)
+        # and the entries at its tail waiting on disk only
+        self._spool = None
+        self._spool_file: Optional[str] = None
+        self._spool_size = 0
+        self._head_file = None
+        self._overflow = 0
+        self._overflow_offset = 0
+
+        # Counters exposed through stats()
+        self.enqueued = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.spooled = 0
+
+    async def start(self, pool) -> None:
+        """
+        Attach the local pool and start the background flusher.
+        Entries left in the spool by a previous run are queued first.
+        """
+        self.pool = pool
+        self._closing = False
+        self._open_spool()
+        self._ensure_task()
+
+    def enqueue(self, statements: MirrorStatements, many: bool = False) -> bool:
+        """
+        Queue statements for replay against the local database.
+
+        Args:
+            statements: (query, params) pairs replayed as one unit
+            many: statements is a single (query, rows) pair replayed with executemany
+
+        Returns:
+            False if the entry was dropped because the queue is full and
+            could not be spooled
+        """
+        offset = self._append_to_spool(statements, many)
+        if self._overflow or len(self._pending) >= self.maxsize:
+            if offset is None:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 1000 == 0:
+                    logger.warning(f"Local mirror queue full ({self.maxsize}), dropped {self.dropped} writes so far")
+                return False
+            # Kept on disk only, read back in order as the queue drains
+            if not self._overflow:
+                self._overflow_offset = offset
+            self._overflow += 1
+            self.spooled += 1
+        else:
+            self._pending.append((time.monotonic(), statements, many, offset))
+
+        self.enqueued += 1
+        self._ensure_task()
+        if len(self._pending) >= self.batch_size and self._wakeup:
+            self._wakeup.set()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth (in memory and on disk only), replication lag and counters"""
+        lag = time.monotonic() - self._pending[0][0] if self._pending else 0.0
+        return {
+            "pending": len(self._pending) + self._overflow,
+            "on_disk": self._overflow,
+            "lag_seconds": round(lag, 3),
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "spooled": self.spooled
+        }
+
+    async def close(self) -> None:
+        """
+        Stop the flusher, drain what can still be written and release the
+        spool; what is left in it is replayed by the next start
+        """
+        self._closing = True
+        if self._task:
+            if self._wakeup:
+                self._wakeup.set()
+            try:
+                await self._task
+            except Exception as e:
+                logger.error(f"Local mirror flusher stopped with error: {e}")
+            self._task = None
+
+        # Final drain; stop as soon as a batch makes no progress
+        while self._pending and self.pool:
+            before = len(self._pending) + self._overflow
+            await self.flush()
+            if len(self._pending) + self._overflow >= before:
+                break
+
+        if self._spool:
+            left = len(self._pending) + self._overflow
+            if left:
+                logger.warning(f"{left} unmirrored writes left in {self._spool_file} for the next start")
+            self._close_spool()
+        elif self._pending:
+            logger.error(f"{len(self._pending)} unmirrored writes lost at shutdown; no spool file")
+
+    def _ensure_task(self) -> None:
+        if self._task or self._closing or not self.pool or not self.autoflush:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if not self._pending:
+                continue
+            try:
+                progressed = await self.flush()
+            except Exception as e:
+                logger.error(f"Unexpected error flushing local mirror queue: {e}")
+                progressed = False
+            if not progressed and not self._closing:
+                # Local database unavailable; back off instead of spinning
+                await asyncio.sleep(self.flush_interval * 4)
+
+    async def flush(self) -> bool:
+        """
+        Replay one batch against the local pool using a single connection.
+
+        If the connection cannot be had or fails part-way (any transient
+        error), the entries not applied yet stay queued, in order, for the
+        next flush. Entries the database rejects outright are counted as
+        failed and dropped (kept, with the rest, if drop_rejected is False).
+
+        Returns:
+            True if the whole batch was taken off the queue
+        """
+        if not self._pending or not self.pool:
+            return False
+
+        batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        applied = 0
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    for _, statements, many, _ in batch:
+                        try:
+                            await self._replay(conn, cursor, statements, many)
+                        except BaseException:
+                            # Connection state is unknown; never reuse it
+                            conn.close()
+                            raise
+                        applied += 1
+        except BaseException as e:
+            # Keep the unapplied rest of the batch, in order
+            self._pending.extendleft(reversed(batch[applied:]))
+            if applied:
+                self._trim_spool()
+            if not isinstance(e, Exception):
+                raise
+            logger.warning(f"Failed to flush {len(batch) - applied} writes to local database, will retry: {e}")
+            return False
+        self._trim_spool()
+        return True
+
+    async def _replay(self, conn, cursor, statements: MirrorStatements, many: bool) -> None:
+        """Apply one entry; raises on errors that leave it queued for flush() to retry"""
+        try:
+            if many:
+                query, rows = statements[0]
+                await cursor.executemany(query, rows)
+            elif len(statements) == 1:
+                query, params = statements[0]
+                await cursor.execute(query, params or ())
+            else:
+                await conn.begin()
+                for query, params in statements:
+                    await cursor.execute(query, params or ())
+                await conn.commit()
+            self.flushed += 1
+        except Exception as e:
+            if len(statements) > 1 and not many:
+                try:
+                    await conn.rollback()
+                except Exception:
+                    pass
+            if is_transient(e):
+                raise
+            self.failed += 1
+            if not self.drop_rejected:
+                logger.error(f"Write rejected by the database, keeping it queued: {e}")
+                raise
+            logger.warning(f"Failed to backup to local database: {e}")
+
+    def _open_spool(self) -> None:
+        """Lock the first free spool file and queue what it holds past its recorded head"""
+        if not self.spool_path or self._spool:
+            return
+        try:
+            for slot in range(SPOOL_SLOTS):
+                path = f"{self.spool_path}.{slot}" if slot else self.spool_path
+                head_file = os.fdopen(os.open(f"{path}.head", os.O_RDWR | os.O_CREAT), "r+")
+                try:
+                    if fcntl:
+                        fcntl.flock(head_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except OSError:
+                    # Held by another live process
+                    head_file.close()
+            else:
+                logger.error(f"No free local mirror spool at {self.spool_path}; mirroring from memory only")
+                return
+
+            head = head_file.read().strip()
+            spool = open(path, "ab")
+            size = os.path.getsize(path)
+            if size:
+                with open(path, "rb") as f:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        # Cut short by a crash mid-write; keep the next entry on its own line
+                        spool.write(b"\n")
+                        spool.flush()
+                        size += 1
+            offset = int(head) if head.isdigit() and int(head) <= size else 0
+            with open(path, "rb") as f:
+                f.seek(offset)
+                waiting = sum(1 for line in f if line.strip())
+        except Exception as e:
+            logger.error(f"Failed to open local mirror spool {self.spool_path}: {e}")
+            return
+
+        self._spool, self._spool_file, self._spool_size, self._head_file = spool, path, size, head_file
+        self._overflow, self._overflow_offset = waiting, offset
+        self._refill()
+        if waiting:
+            logger.info(f"Loaded {waiting} spooled writes for the local mirror from {path}")
+
+    def _append_to_spool(self, statements: MirrorStatements, many: bool) -> Optional[int]:
+        """Write an entry to the spool; returns its offset, or None if it is not on disk"""
+        if not self._spool:
+            return None
+        try:
+            line = (json.dumps({
+                "many": many,
+                "statements": [[q, _encode_value(p)] for q, p in statements]
+            }) + "\n").encode("utf-8")
+            self._spool.write(line)
+            self._spool.flush()
+        except Exception as e:
+            logger.error(f"Failed to spool a write for the local mirror: {e}")
+            return None
+        offset = self._spool_size
+        self._spool_size += len(line)
+        return offset
+
+    def _refill(self) -> None:
+        """Move entries waiting on disk only into memory, in order, up to maxsize"""
+        if not self._overflow or len(self._pending) >= self.maxsize:
+            return
+        now = time.monotonic()
+        with open(self._spool_file, "rb") as f:
+            f.seek(self._overflow_offset)
+            while self._overflow and len(self._pending) < self.maxsize:
+                offset = self._overflow_offset
+                line = f.readline()
+                if not line:
+                    self._overflow = 0
+                    break
+                self._overflow_offset += len(line)
+                if not line.strip():
+                    continue
+                self._overflow -= 1
+                try:
+                    entry = json.loads(line)
+                    self._pending.append((
+                        now,
+                        [(q, _decode_value(p)) for q, p in entry["statements"]],
+                        entry.get("many", False),
+                        offset
+                    ))
+                except Exception as e:
+                    self.failed += 1
+                    logger.error(f"Skipping unreadable entry in local mirror spool {self._spool_file}: {e}")
+
+    def _trim_spool(self) -> None:
+        """Record how far the spool is applied; truncate or compact it when that pays off"""
+        if not self._spool:
+            return
+        try:
+            self._refill()
+            head = next((entry[3] for entry in self._pending if entry[3] is not None),
+                        self._overflow_offset if self._overflow else self._spool_size)
+            if head >= self._spool_size:
+                self._write_head(0)
+                self._spool.truncate(0)
+                self._spool_size = self._overflow_offset = 0
+            elif head >= SPOOL_COMPACT_BYTES and head * 2 >= self._spool_size:
+                self._compact_spool(head)
+            else:
+                self._write_head(head)
+        except Exception as e:
+            logger.error(f"Failed to trim local mirror spool {self._spool_file}: {e}")
+
+    def _compact_spool(self, head: int) -> None:
+        # Head reset first: a crash before the swap replays applied entries
+        # again rather than reading the new file from a stale offset
+        self._write_head(0)
+        tmp = f"{self._spool_file}.tmp"
+        with open(self._spool_file, "rb") as src, open(tmp, "wb") as dst:
+            src.seek(head)
+            shutil.copyfileobj(src, dst)
+        self._spool.close()
+        os.replace(tmp, self._spool_file)
+        self._spool = open(self._spool_file, "ab")
+        self._spool_size -= head
+        self._overflow_offset = max(0, self._overflow_offset - head)
+        self._pending = collections.deque(
+            (queued_at, statements, many, offset - head if offset is not None else None)
+            for queued_at, statements, many, offset in self._pending
+        )
+
+    def _write_head(self, offset: int) -> None:
+        self._head_file.seek(0)
+        self._head_file.write(f"{offset:020d}")
+        self._head_file.flush()
+
+    def _close_spool(self) -> None:
+        """Record the head and release the spool; everything left in it stays on disk"""
+        self._trim_spool()
+        for f in (self._spool, self._head_file):
+            try:
+                f.close()
+            except Exception:
+                pass
+        self._spool = self._head_file = self._spool_file = None
+        self._spool_size = self._overflow = self._overflow_offset = 0
+        self._pending.clear()
@@ -0,0 +1,140 @@
+# backend/app/persistence/pool.py
+
+import asyncio
+import collections
+import logging
+import math
+from typing import Any, Deque, Dict, Optional
+
+from ..monitoring.metrics import metrics_collector
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSizer:
+    """
+    Keeps an aiomysql pool's warm size matched to its measured demand.
+
+    The pool itself is created with minsize connections (opened up front, so
+    the first request after startup does not pay connection setup) and a hard
+    maxsize. Every resize_interval the sizer looks at the acquire waits and the
+    peak number of connections in use since the last check:
+
+    - callers had to wait longer than target_wait, or are still waiting:
+      the target grows by half
+    - the peak stayed well below the target: the target shrinks towards the
+      peak
+
+    The target never leaves [minsize, maxsize] and is applied as the pool's
+    own minsize; the sizer never touches connections. The pool opens
+    connections up to it on its next acquire, ahead of the requests that
+    would otherwise each open one. Below the target the pool stops reopening
+    connections it closes (broken, or idle longer than pool_recycle).
+    """
+
+    def __init__(self, name: str, pool, minsize: int, maxsize: int,
+                 target_wait: float, resize_interval: float):
+        self.name = name
+        self.pool = pool
+        self.minsize = max(0, minsize)
+        self.maxsize = max(1, maxsize, self.minsize)
+        self.target_wait = target_wait
+        self.resize_interval = resize_interval
+
+        self.target = max(1, self.minsize)
+        self.waiting = 0
+        self.peak_in_use = 0
+        self._waits: Deque[float] = collections.deque(maxlen=1000)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def in_use(self) -> int:
+        return self.pool.size - self.pool.freesize
+
+    def start(self) -> None:
+        if self._task:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._run())
+        self._update_gauges()
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    def begin_wait(self) -> None:
+        """Called right before pool.acquire()"""
+        self.waiting += 1
+        metrics_collector.set_db_pool_waiters(self.name, self.waiting)
+
+    def end_wait(self, duration: Optional[float] = None) -> None:
+        """Called once pool.acquire() returned or failed; duration is None on failure"""
+        self.waiting = max(0, self.waiting - 1)
+        if duration is not None:
+            self._waits.append(duration)
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        self._update_gauges()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.pool.size,
+            "in_use": self.in_use,
+            "free": self.pool.freesize,
+            "waiters": self.waiting,
+            "target": self.target,
+            "minsize": self.minsize,
+            "maxsize": self.maxsize
+        }
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.resize_interval)
+            try:
+                await self.resize()
+            except Exception as e:
+                logger.warning(f"Error resizing {self.name} database pool: {e}")
+
+    async def resize(self) -> None:
+        """Adjust the target size from the last window's measurements and apply it"""
+        waits = sorted(self._waits)
+        self._waits.clear()
+        p90_wait = waits[int(len(waits) * 0.9)] if waits else 0.0
+        peak = max(self.peak_in_use, self.in_use)
+        self.peak_in_use = self.in_use
+
+        target = self.target
+        if self.waiting or p90_wait > self.target_wait:
+            target = target + max(1, math.ceil(target / 2))
+        elif peak + 1 < target:
+            # Shrink halfway towards the observed peak (plus one spare)
+            target = target - max(1, (target - peak - 1) // 2)
+        target = min(self.maxsize, max(self.minsize, 1, target))
+
+        if target != self.target:
+            logger.info(
+                f"Resizing {self.name} database pool target {self.target} -> {target} "
+                f"(peak in use {peak}, p90 acquire wait {p90_wait * 1000:.1f} ms)"
+            )
+            self.target = target
+
+        self._set_pool_minsize(self.target)
+        self._update_gauges()
+
+    def _set_pool_minsize(self, size: int) -> None:
+        # aiomysql exposes minsize read-only and reads _minsize on every
+        # acquire; the SQLite pool's minsize is a plain attribute
+        if hasattr(self.pool, "_minsize"):
+            self.pool._minsize = size
+        else:
+            self.pool.minsize = size
+
+    def _update_gauges(self) -> None:
+        metrics_collector.record_db_pool(self.name, self.pool.size, self.in_use, self.waiting, self.target)
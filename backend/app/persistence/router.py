@@ -0,0 +1,125 @@
+# backend/app/persistence/router.py
+
+import re
+from functools import lru_cache
+from typing import FrozenSet, NamedTuple
+
+# Tables that must always be served by the local database
+AUTH_TABLES = frozenset({"users", "password_resets", "revoked_tokens"})
+
+# Statements that never modify data
+READ_VERBS = frozenset({"select", "show", "describe", "desc", "explain"})
+
+_COMMENT_RE = re.compile(r"/\*.*?\*/|--[^\n]*|#[^\n]*", re.S)
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"", re.S)
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|%s")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_VALUES_LIST_RE = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_SPACE_RE = re.compile(r"\s+")
+_IDENT = r"`?[\w$]+`?(?:\.`?[\w$]+`?)?"
+# Matched against whitespace-normalised text; UPDATE in ON DUPLICATE KEY UPDATE
+# and FOR UPDATE [SKIP LOCKED | NOWAIT | OF ...] names no table
+_TABLE_RE = re.compile(
+    r"\b(?:from|join|into|(?<!key )(?<!for )update|table(?:\s+if\s+(?:not\s+)?exists)?)\s+"
+    r"(" + _IDENT + r"(?:\s+(?:as\s+)?\w+)?(?:\s*,\s*" + _IDENT + r"(?:\s+(?:as\s+)?\w+)?)*)"
+)
+# Functions whose arguments may contain a FROM that is not a table reference
+_FROM_FUNCTION_RE = re.compile(r"\b(?:extract|trim|substring|substr)\s*\(")
+_FROM_WORD_RE = re.compile(r"\bfrom\b")
+_ON_TABLE_RE = re.compile(r"\bindex\s+(?:if\s+not\s+exists\s+)?\w+\s+on\s+(" + _IDENT + r")")
+
+
+class StatementInfo(NamedTuple):
+    """Parsed routing facts about one distinct SQL text"""
+    verb: str
+    tables: FrozenSet[str]
+    intent: str  # 'auth', 'read' or 'write'
+    writes: bool
+    fingerprint: str
+
+
+def _strip(query: str) -> str:
+    """Remove comments and string literals so keywords inside them are ignored"""
+    return _STRING_RE.sub("?", _COMMENT_RE.sub(" ", query))
+
+
+def _hide_function_from(text: str) -> str:
+    """Blank out the FROM in EXTRACT(YEAR FROM col), TRIM(x FROM col) and the like"""
+    chars = None
+    for match in _FROM_FUNCTION_RE.finditer(text):
+        depth = 1
+        position = match.end()
+        while position < len(text) and depth:
+            char = text[position]
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif depth == 1 and char == "f" and _FROM_WORD_RE.match(text, position):
+                chars = chars or list(text)
+                chars[position:position + 4] = "    "
+            position += 1
+    return "".join(chars) if chars else text
+
+
+def _table_name(token: str) -> str:
+    return token.split()[0].replace("`", "").split(".")[-1].lower()
+
+
+def normalize_statement(query: str) -> str:
+    """
+    Reduce a statement to its fingerprint: literals and placeholders become '?',
+    IN/VALUES lists are collapsed and whitespace is normalised.
+    """
+    text = _strip(query)
+    text = _PLACEHOLDER_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _VALUES_LIST_RE.sub(r"\1", text)
+    text = _IN_LIST_RE.sub("(?+)", text)
+    return _SPACE_RE.sub(" ", text).strip().lower()
+
+
+@lru_cache(maxsize=4096)
+def parse_statement(query: str) -> StatementInfo:
+    """
+    Parse a statement once and cache the result by its exact text.
+
+    Args:
+        query: SQL text as passed to Database.execute
+
+    Returns:
+        StatementInfo with the verb, referenced tables and routing intent
+    """
+    fingerprint = normalize_statement(query)
+    stripped = _SPACE_RE.sub(" ", _strip(query)).lower()
+
+    verb = fingerprint.split(" ", 1)[0] if fingerprint else ""
+    if verb == "with":
+        # CTEs: the statement verb is the first one after the WITH clause
+        match = re.search(r"\)\s*(select|insert|update|delete|replace)\b", stripped)
+        verb = match.group(1) if match else "select"
+
+    tables = set()
+    for match in _TABLE_RE.finditer(_hide_function_from(stripped)):
+        for part in match.group(1).split(","):
+            if part.strip():
+                tables.add(_table_name(part.strip()))
+    for match in _ON_TABLE_RE.finditer(stripped):
+        tables.add(_table_name(match.group(1)))
+
+    writes = verb not in READ_VERBS or bool(re.search(r"\bfor\s+(update|share)\b|\block\s+in\s+share\s+mode\b", stripped))
+    if tables & AUTH_TABLES:
+        intent = "auth"
+    elif writes:
+        intent = "write"
+    else:
+        intent = "read"
+
+    return StatementInfo(
+        verb=verb,
+        tables=frozenset(tables),
+        intent=intent,
+        writes=writes,
+        fingerprint=fingerprint
+    )
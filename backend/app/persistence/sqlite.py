@@ -0,0 +1,564 @@
+# backend/app/persistence/sqlite.py
+
+import asyncio
+import collections
+import logging
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+# Values go in and come out as they do with aiomysql: datetimes for DATETIME
+# and TIMESTAMP columns, Decimal for DECIMAL columns
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(Decimal, str)
+
+
+def _convert_datetime(raw: bytes):
+    text = raw.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+def _convert_date(raw: bytes):
+    text = raw.decode()
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_converter("TIMESTAMP", _convert_datetime)
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("DECIMAL", lambda raw: Decimal(raw.decode()))
+
+
+# ---------------------------------------------------------------------------
+# Dialect shim: rewrites the MySQL the application speaks into SQLite
+# ---------------------------------------------------------------------------
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s|%s|%%")
+_NOW = re.compile(r"\bNOW\(\s*\)", re.I)
+_CURDATE = re.compile(r"\bCURDATE\(\s*\)", re.I)
+_DEFAULT_NOW = re.compile(r"\bDEFAULT\s+CURRENT_TIMESTAMP\b", re.I)
+_ON_UPDATE_NOW = re.compile(r"\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP\b", re.I)
+_GREATEST = re.compile(r"\bGREATEST\s*\(", re.I)
+_LEAST = re.compile(r"\bLEAST\s*\(", re.I)
+_JSON_UNQUOTE = re.compile(r"\bJSON_UNQUOTE\s*\(", re.I)  # SQLite's JSON_EXTRACT already unquotes
+_INSERT_IGNORE = re.compile(r"\bINSERT\s+IGNORE\b", re.I)
+_ON_DUPLICATE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.I)
+_VALUES_REF = re.compile(r"\bVALUES\s*\(\s*`?(\w+)`?\s*\)", re.I)
+_LOCKING_READ = re.compile(
+    r"\s+(?:FOR\s+UPDATE(?:\s+OF\s+\w+(?:\s*,\s*\w+)*)?(?:\s+(?:SKIP\s+LOCKED|NOWAIT))?"
+    r"|FOR\s+SHARE|LOCK\s+IN\s+SHARE\s+MODE)",
+    re.I
+)
+_LIMITED_DELETE = re.compile(
+    r"^\s*DELETE\s+FROM\s+(`?\w+`?)\s+(WHERE\s+.+?)?\s*(ORDER\s+BY\s+.+?)?\s*(LIMIT\s+\S+)\s*$",
+    re.I | re.S
+)
+_EXPLAIN = re.compile(r"^\s*EXPLAIN\s+(?!QUERY\s+PLAN\b)", re.I)
+
+_AUTO_INCREMENT_PK = re.compile(r"\bINT(?:EGER)?(?:\s+NOT\s+NULL)?\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.I)
+_AUTO_INCREMENT = re.compile(r"\s+AUTO_INCREMENT\b(?:\s*=\s*\d+)?", re.I)
+_COMMENT = re.compile(r"\s+COMMENT\s*=?\s*'(?:[^'\\]|\\.|'')*'", re.I)
+_ENUM = re.compile(r"\bENUM\s*\([^)]*\)", re.I)
+_TABLE_OPTIONS = re.compile(r"\s+(?:ENGINE|(?:DEFAULT\s+)?(?:CHARSET|CHARACTER\s+SET)|COLLATE)\s*=?\s*\w+", re.I)
+_CREATE_TABLE = re.compile(r"^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?", re.I)
+_INLINE_INDEX = re.compile(r"^(UNIQUE\s+|FULLTEXT\s+)?(?:KEY|INDEX)\s+`?(\w+)`?\s*\((.*)\)$", re.I | re.S)
+_ALTER_TABLE = re.compile(r"^\s*ALTER\s+TABLE\s+`?(\w+)`?\s+(.*)$", re.I | re.S)
+_ADD_COLUMN = re.compile(r"^ADD\s+(?:COLUMN\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(.*?)(?:\s+(?:AFTER\s+`?\w+`?|FIRST))?$", re.I | re.S)
+_ADD_INDEX = re.compile(r"^ADD\s+(UNIQUE\s+)?(?:KEY|INDEX)\s+`?(\w+)`?\s*\((.*)\)$", re.I | re.S)
+_MODIFY_COLUMN = re.compile(r"^MODIFY\s+(?:COLUMN\s+)?(.*?)(?:\s+(?:AFTER\s+`?\w+`?|FIRST))?$", re.I | re.S)
+_DROP_INDEX = re.compile(r"^\s*DROP\s+INDEX\s+`?(\w+)`?\s+ON\s+`?\w+`?\s*$", re.I)
+
+# What translate() turns MODIFY COLUMN into; not SQLite, run by _modify_column()
+_MODIFY_COLUMN_STATEMENT = re.compile(r"^ALTER TABLE (\w+) MODIFY COLUMN (.*)$", re.S)
+
+
+def _split_top_level(text: str, separator: str = ",") -> List[str]:
+    """Split on separator outside parentheses and quotes"""
+    parts = []
+    depth = 0
+    quote = None
+    start = 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"', "`"):
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i].strip())
+            start = i + 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+
+def _unwrap_compound_select(query: str) -> str:
+    """
+    (SELECT ...) UNION ALL (SELECT ...) ORDER BY ... LIMIT ...
+    becomes SELECT * FROM (SELECT ...) UNION ALL SELECT * FROM (SELECT ...) ...,
+    since SQLite does not accept parenthesised members of a compound select
+    """
+    out = []
+    depth = 0
+    quote = None
+    for i, char in enumerate(query):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("'", '"', "`"):
+            quote = char
+        elif char == "(":
+            if depth == 0 and re.match(r"\(\s*SELECT\b", query[i:], re.I):
+                out.append("SELECT * FROM ")
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        out.append(char)
+    return "".join(out)
+
+
+def _translate_create_table(statement: str) -> List[str]:
+    table = _CREATE_TABLE.match(statement).group(1)
+    open_at = statement.index("(")
+    close_at = statement.rindex(")")
+    columns = []
+    indexes = []
+    for definition in _split_top_level(statement[open_at + 1:close_at]):
+        index = _INLINE_INDEX.match(definition)
+        if not index:
+            columns.append(definition)
+        elif (index.group(1) or "").strip().upper() == "UNIQUE":
+            columns.append(f"UNIQUE ({index.group(3)})")
+        elif not index.group(1):
+            # Index names are per database in SQLite, not per table
+            indexes.append(f"CREATE INDEX IF NOT EXISTS {table}_{index.group(2)} ON {table} ({index.group(3)})")
+    body = ",\n    ".join(columns)
+    return [f"{statement[:open_at]}(\n    {body}\n)"] + indexes
+
+
+def _translate_alter_table(statement: str) -> List[str]:
+    match = _ALTER_TABLE.match(statement)
+    table, clauses = match.group(1), match.group(2)
+    statements = []
+    for clause in _split_top_level(clauses):
+        index = _ADD_INDEX.match(clause)
+        if index:
+            unique = "UNIQUE " if index.group(1) else ""
+            statements.append(f"CREATE {unique}INDEX IF NOT EXISTS {index.group(2)} ON {table} ({index.group(3)})")
+            continue
+        column = _ADD_COLUMN.match(clause)
+        if column and not re.match(r"ADD\s+(?:CONSTRAINT|FOREIGN|PRIMARY)\b", clause, re.I):
+            statements.append(f"ALTER TABLE {table} ADD COLUMN {column.group(1)}")
+        elif re.match(r"DROP\s+(?:COLUMN\s+)?`?\w+`?$", clause, re.I):
+            statements.append(f"ALTER TABLE {table} {clause}")
+        elif re.match(r"RENAME\b", clause, re.I):
+            statements.append(f"ALTER TABLE {table} {clause}")
+        elif _MODIFY_COLUMN.match(clause):
+            # Can change NOT NULL and defaults, which SQLite only allows by rebuilding the table
+            statements.append(f"ALTER TABLE {table} MODIFY COLUMN {_MODIFY_COLUMN.match(clause).group(1)}")
+        else:
+            # CHANGE renames and retypes; the migrations do not use it
+            logger.debug(f"Skipping ALTER TABLE clause not supported by SQLite: {clause}")
+    return statements
+
+
+def _definition_name(definition: str) -> str:
+    return definition.split(None, 1)[0].strip('`"')
+
+
+async def _modify_column(raw: aiosqlite.Connection, table: str, definition: str) -> aiosqlite.Cursor:
+    """
+    ALTER TABLE ... MODIFY COLUMN for SQLite, which cannot alter a column:
+    the table is rebuilt with the new column definition and its indexes are
+    recreated. Foreign keys are not enforced (see SQLitePool._open), so
+    dropping the old table leaves referencing tables alone. Atomic when run
+    in a transaction, as the migrations are.
+    """
+    cursor = await raw.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    row = await cursor.fetchone()
+    if row is None:
+        raise sqlite3.OperationalError(f"no such table: {table}")
+    create = row[0]
+    definitions = _split_top_level(create[create.index("(") + 1:create.rindex(")")])
+    names = [_definition_name(existing) for existing in definitions]
+    column = _definition_name(definition)
+    if column not in names:
+        raise sqlite3.OperationalError(f"no such column: {column}")
+    position = names.index(column)
+    if " ".join(definitions[position].split()).lower() == " ".join(definition.split()).lower():
+        return cursor
+    definitions[position] = definition
+
+    cursor = await raw.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,)
+    )
+    indexes = [index for index, in await cursor.fetchall()]
+    body = ",\n    ".join(definitions)
+    await raw.execute(f"CREATE TABLE {table}__rebuild (\n    {body}\n)")
+    await raw.execute(f"INSERT INTO {table}__rebuild SELECT * FROM {table}")
+    await raw.execute(f"DROP TABLE {table}")
+    cursor = await raw.execute(f"ALTER TABLE {table}__rebuild RENAME TO {table}")
+    for index in indexes:
+        cursor = await raw.execute(index)
+    logger.info(f"Rebuilt SQLite table {table} to modify column {column}")
+    return cursor
+
+
+@lru_cache(maxsize=2048)
+def translate(query: str) -> Tuple[str, ...]:
+    """
+    Rewrite a MySQL statement (with %s placeholders) for SQLite
+
+    Covers the MySQL the application uses: NOW(), GREATEST/LEAST,
+    JSON_UNQUOTE(JSON_EXTRACT(...)), INSERT IGNORE, ON DUPLICATE KEY UPDATE,
+    locking reads, DELETE ... ORDER BY ... LIMIT, parenthesised UNION members
+    and the DDL in the migrations (MODIFY COLUMN is left for the cursor,
+    which rebuilds the table). JSON_EXTRACT and DATE() exist in SQLite
+    as they are.
+
+    Returns:
+        One or more statements; DDL may expand to several
+    """
+    statement = _PLACEHOLDER.sub(lambda m: f":{m.group(1)}" if m.group(1) else ("?" if m.group(0) == "%s" else "%"), query)
+    statement = statement.strip().rstrip(";")
+
+    if _CREATE_TABLE.match(statement) or _ALTER_TABLE.match(statement):
+        statement = _COMMENT.sub("", statement)
+        statement = _ON_UPDATE_NOW.sub("", statement)
+        statement = _DEFAULT_NOW.sub("DEFAULT (datetime('now', 'localtime'))", statement)
+        statement = _AUTO_INCREMENT_PK.sub("INTEGER PRIMARY KEY AUTOINCREMENT", statement)
+        statement = _AUTO_INCREMENT.sub("", statement)
+        statement = _ENUM.sub("TEXT", statement)
+        statement = _TABLE_OPTIONS.sub("", statement)
+        if _CREATE_TABLE.match(statement):
+            return tuple(_translate_create_table(statement))
+        return tuple(_translate_alter_table(statement))
+
+    drop_index = _DROP_INDEX.match(statement)
+    if drop_index:
+        return (f"DROP INDEX IF EXISTS {drop_index.group(1)}",)
+
+    statement = _NOW.sub("datetime('now', 'localtime')", statement)
+    statement = _CURDATE.sub("date('now', 'localtime')", statement)
+    statement = _GREATEST.sub("MAX(", statement)
+    statement = _LEAST.sub("MIN(", statement)
+    statement = _JSON_UNQUOTE.sub("(", statement)
+    statement = _INSERT_IGNORE.sub("INSERT OR IGNORE", statement)
+    statement = _LOCKING_READ.sub("", statement)
+    statement = _EXPLAIN.sub("EXPLAIN QUERY PLAN ", statement)
+
+    duplicate = _ON_DUPLICATE.search(statement)
+    if duplicate:
+        # Assignments refer to the proposed row as excluded.col instead of VALUES(col)
+        assignments = _VALUES_REF.sub(r"excluded.\1", statement[duplicate.end():])
+        statement = f"{statement[:duplicate.start()]}ON CONFLICT DO UPDATE SET{assignments}"
+
+    limited = _LIMITED_DELETE.match(statement)
+    if limited:
+        table, where, order, limit = limited.groups()
+        statement = (
+            f"DELETE FROM {table} WHERE rowid IN "
+            f"(SELECT rowid FROM {table} {where or ''} {order or ''} {limit})"
+        )
+
+    if statement.startswith("("):
+        statement = _unwrap_compound_select(statement)
+    return (statement,)
+
+
+def _as_params(args: Any) -> Any:
+    if args is None:
+        return ()
+    if isinstance(args, dict):
+        return args
+    if isinstance(args, (list, tuple)):
+        return tuple(args)
+    return (args,)
+
+
+# ---------------------------------------------------------------------------
+# aiomysql-compatible pool, connection and cursor
+# ---------------------------------------------------------------------------
+
+class _AsyncContext:
+    """What acquire() and cursor() return: awaitable, or usable with async with, as in aiomysql"""
+
+    def __init__(self, coro: Awaitable[Any], on_exit: Callable[[Any], Awaitable[None]]):
+        self._coro = coro
+        self._on_exit = on_exit
+        self._obj = None
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self):
+        self._obj = await self._coro
+        return self._obj
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._on_exit(self._obj)
+
+
+class SQLiteCursor:
+    """
+    Cursor with the aiomysql interface. Rows are dicts when the cursor was
+    opened with a cursor class (DictCursor, SSDictCursor), tuples otherwise.
+    """
+
+    def __init__(self, connection: "SQLiteConnection", as_dict: bool):
+        self.connection = connection
+        self.as_dict = as_dict
+        self.rowcount = -1
+        self.lastrowid = None
+        self.description = None
+        self._cursor: Optional[aiosqlite.Cursor] = None
+
+    async def execute(self, query: str, args: Any = None) -> int:
+        statements = translate(query)
+        params = _as_params(args)
+        for statement in statements:
+            modify = _MODIFY_COLUMN_STATEMENT.match(statement)
+            if modify:
+                self._cursor = await _modify_column(self.connection.raw, *modify.groups())
+                continue
+            # Only single statements carry parameters; expanded DDL never does
+            self._cursor = await self.connection.raw.execute(statement, params if len(statements) == 1 else ())
+        self._remember()
+        return self.rowcount
+
+    async def executemany(self, query: str, args: Any) -> int:
+        statement, = translate(query)
+        self._cursor = await self.connection.raw.executemany(statement, [_as_params(a) for a in args])
+        self._remember()
+        return self.rowcount
+
+    async def fetchone(self):
+        row = await self._cursor.fetchone() if self._cursor else None
+        return self._shape(row) if row is not None else None
+
+    async def fetchmany(self, size: int = None):
+        if not self._cursor:
+            return []
+        rows = await self._cursor.fetchmany(size or self._cursor.arraysize)
+        return [self._shape(row) for row in rows]
+
+    async def fetchall(self):
+        if not self._cursor:
+            return []
+        return [self._shape(row) for row in await self._cursor.fetchall()]
+
+    async def close(self) -> None:
+        if self._cursor:
+            await self._cursor.close()
+            self._cursor = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _remember(self) -> None:
+        self.rowcount = self._cursor.rowcount
+        self.lastrowid = self._cursor.lastrowid
+        self.description = self._cursor.description
+
+    def _shape(self, row):
+        if not self.as_dict:
+            return tuple(row)
+        return {column[0]: value for column, value in zip(self.description, row)}
+
+
+class SQLiteConnection:
+    """Connection with the aiomysql interface, in autocommit mode unless begin() was called"""
+
+    def __init__(self, raw: aiosqlite.Connection, pool: "SQLitePool"):
+        self.raw = raw
+        self.pool = pool
+        self.closed = False
+
+    def cursor(self, *cursor_classes) -> _AsyncContext:
+        async def open_cursor():
+            return SQLiteCursor(self, as_dict=bool(cursor_classes))
+
+        async def close_cursor(cursor):
+            if cursor is not None:
+                await cursor.close()
+
+        return _AsyncContext(open_cursor(), close_cursor)
+
+    async def begin(self) -> None:
+        # Take the write lock up front: a deferred transaction that later
+        # needs to write can fail with SQLITE_BUSY without waiting
+        await self.raw.execute("BEGIN IMMEDIATE")
+
+    async def commit(self) -> None:
+        await self.raw.commit()
+
+    async def rollback(self) -> None:
+        await self.raw.rollback()
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.pool._close_later(self.raw)
+
+
+class SQLitePool:
+    """
+    Connection pool with the parts of the aiomysql pool interface the
+    application uses (acquire, release, size, freesize, clear, close).
+
+    SQLite allows one writer at a time; with WAL journaling readers do not
+    block it, and busy_timeout makes a second writer wait instead of failing.
+    """
+
+    def __init__(self, path: str, minsize: int = 1, maxsize: int = 10, busy_timeout: float = 5.0):
+        self.path = path
+        self.minsize = max(1, minsize)
+        self._maxsize = max(self.minsize, maxsize)
+        self.busy_timeout = busy_timeout
+        self._free: "collections.deque[SQLiteConnection]" = collections.deque()
+        self._used = set()
+        self._opening = 0
+        self._cond = asyncio.Condition()
+        self._closing = False
+        self._closers = set()
+
+        self._memory = path == ":memory:"
+        # Every connection to :memory: would get a database of its own; share one instead
+        self._database = f"file:sqlite_pool_{id(self)}?mode=memory&cache=shared" if self._memory else path
+
+    @property
+    def size(self) -> int:
+        return len(self._free) + len(self._used) + self._opening
+
+    @property
+    def freesize(self) -> int:
+        return len(self._free)
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def acquire(self) -> _AsyncContext:
+        async def release(conn):
+            if conn is not None:
+                self.release(conn)
+
+        return _AsyncContext(self._acquire(), release)
+
+    def release(self, conn: SQLiteConnection) -> None:
+        self._used.discard(conn)
+        if self._closing and not conn.closed:
+            conn.close()
+        if not conn.closed:
+            if conn.raw.in_transaction:
+                # Never hand out a connection with a transaction left open
+                conn.close()
+            else:
+                self._free.append(conn)
+        asyncio.ensure_future(self._wakeup())
+
+    async def clear(self) -> None:
+        """Close all idle connections"""
+        while self._free:
+            self._free.popleft().close()
+        await self._wakeup()
+
+    def close(self) -> None:
+        self._closing = True
+        while self._free:
+            self._free.popleft().close()
+
+    async def wait_closed(self) -> None:
+        async with self._cond:
+            while self._used:
+                await self._cond.wait()
+        if self._closers:
+            await asyncio.gather(*self._closers, return_exceptions=True)
+
+    async def fill(self) -> None:
+        """Open minsize connections"""
+        async with self._cond:
+            while self.size < self.minsize:
+                self._free.append(await self._open())
+
+    async def _acquire(self) -> SQLiteConnection:
+        async with self._cond:
+            while True:
+                if self._closing:
+                    raise RuntimeError("Cannot acquire connection after closing pool")
+                while self._free:
+                    conn = self._free.popleft()
+                    if not conn.closed:
+                        self._used.add(conn)
+                        return conn
+                if self.size < self._maxsize:
+                    conn = await self._open()
+                    self._used.add(conn)
+                    return conn
+                await self._cond.wait()
+
+    async def _open(self) -> SQLiteConnection:
+        self._opening += 1
+        try:
+            raw = await aiosqlite.connect(
+                self._database,
+                uri=self._memory,
+                isolation_level=None,  # autocommit, like the MySQL pools; begin() opens transactions
+                detect_types=sqlite3.PARSE_DECLTYPES
+            )
+            try:
+                await raw.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}")
+                # Foreign keys stay unenforced (SQLite's default): the schema references
+                # calls(call_sid), which MySQL allows with a plain index and SQLite does not
+                if not self._memory:
+                    await raw.execute("PRAGMA journal_mode = WAL")
+                    await raw.execute("PRAGMA synchronous = NORMAL")
+            except BaseException:
+                await raw.close()
+                raise
+            return SQLiteConnection(raw, self)
+        finally:
+            self._opening -= 1
+
+    async def _wakeup(self) -> None:
+        async with self._cond:
+            self._cond.notify_all()
+
+    def _close_later(self, raw: aiosqlite.Connection) -> None:
+        task = asyncio.ensure_future(raw.close())
+        self._closers.add(task)
+        task.add_done_callback(self._closers.discard)
+
+
+async def create_pool(path: str, minsize: int = 1, maxsize: int = 10, busy_timeout: float = 5.0) -> SQLitePool:
+    """
+    Open a pool on the SQLite database file at path (":memory:" for a
+    throwaway in-memory database shared by the pool's connections)
+    """
+    if path != ":memory:":
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+    pool = SQLitePool(path, minsize=minsize, maxsize=maxsize, busy_timeout=busy_timeout)
+    await pool.fill()
+    return pool
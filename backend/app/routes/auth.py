@@ -9,6 +9,7 @@ from jose import JWTError, jwt
 from ..config import settings
 from ..database import db
 from ..security.password import verify_password, get_password_hash
+from ..security.token_cache import token_cache
 
 # Create router
 router = APIRouter()
@@ -41,7 +42,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+        payload = token_cache.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
         username: str = payload.get("sub")
         user_id: int = payload.get("user_id", 0)
         if username is None:
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Body, Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
+from ..config import settings
 from ..database import db
 from ..middleware.auth import get_current_user
 import logging
@@ -163,7 +164,7 @@ async def get_action_metrics(
         ORDER BY count DESC
     """
     
-    action_type_results = await db.fetch_all(action_type_query, params)
+    action_type_results = await db.fetch_all(action_type_query, params, prefer_replica=True, cache_ttl=settings.dashboard_cache_ttl)
     
     # Get action counts by day
     action_trend_query = f"""
@@ -176,7 +177,7 @@ async def get_action_metrics(
         ORDER BY date
     """
     
-    action_trend_results = await db.fetch_all(action_trend_query, params)
+    action_trend_results = await db.fetch_all(action_trend_query, params, prefer_replica=True, cache_ttl=settings.dashboard_cache_ttl)
     
     # Get most common search queries (if applicable)
     search_query = f"""
@@ -190,7 +191,7 @@ async def get_action_metrics(
         LIMIT 5
     """
     
-    search_results = await db.fetch_all(search_query, params)
+    search_results = await db.fetch_all(search_query, params, prefer_replica=True, cache_ttl=settings.dashboard_cache_ttl)
     
     # Format results
     action_types = {}
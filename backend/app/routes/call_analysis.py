@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Body, Path
 from typing import Dict, List, Optional
+from ..config import settings
 from ..database import db
 from ..services.call_analyzer_service import call_analyzer_service
 from ..middleware.auth import get_current_user
@@ -131,7 +132,7 @@ async def get_call_analytics(
         GROUP BY sentiment
     """
     
-    sentiment_results = await db.fetch_all(sentiment_query, params)
+    sentiment_results = await db.fetch_all(sentiment_query, params, prefer_replica=True, cache_ttl=settings.dashboard_cache_ttl)
     
     # Get intent distribution
     intent_query = f"""
@@ -145,7 +146,7 @@ async def get_call_analytics(
         LIMIT 5
     """
     
-    intent_results = await db.fetch_all(intent_query, params)
+    intent_results = await db.fetch_all(intent_query, params, prefer_replica=True, cache_ttl=settings.dashboard_cache_ttl)
     
     # Get average sentiment score
     score_query = f"""
@@ -155,7 +156,7 @@ async def get_call_analytics(
         WHERE 1=1 {date_clause}
     """
     
-    score_result = await db.fetch_one(score_query, params)
+    score_result = await db.fetch_one(score_query, params, prefer_replica=True, cache_ttl=settings.dashboard_cache_ttl)
     
     # Format results
     sentiments = {}
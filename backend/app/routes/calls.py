@@ -1,16 +1,21 @@
 from fastapi import APIRouter, HTTPException, Request, Depends, Query
 from pydantic import BaseModel, Field
-from typing import List, Optional
-from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from datetime import date, datetime
+from decimal import Decimal
+import base64
+import json
 from ..database import db  # Import the database connection
-from fastapi.responses import Response
-from twilio.twiml.voice_response import VoiceResponse, Connect, Stream
+from fastapi.responses import Response, StreamingResponse
 from ..middleware.auth import verify_token
 import logging
 from ..services.twilio_service import twilio_service
+from ..services.bulk_dialer import bulk_dialer
+from ..services.campaign_queue import campaign_queue
 from ..services.ultravox_service import ultravox_service
-from ..services.prompt_service import prompt_service
+from ..services.twiml_templates import twiml_templates
 from ..config import settings
+from ..services.transcript_store import decode_transcription, transcript_store
 
 router = APIRouter()
 
@@ -34,10 +39,40 @@ class CallLog(BaseModel):
     ultravox_cost: Optional[float] = None
     created_at: datetime
 
+# Columns the call history can return; transcription is only sent when asked for
+CALL_HISTORY_FIELDS = tuple(CallLog.model_fields)
+DEFAULT_CALL_HISTORY_FIELDS = tuple(f for f in CALL_HISTORY_FIELDS if f != "transcription")
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def encode_history_cursor(start_time: datetime, call_id: int) -> str:
+    """Opaque cursor pointing just after the given (start_time, id)"""
+    raw = f"{start_time.isoformat()}|{call_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        start_time, call_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(start_time), int(call_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 class BulkCallRequest(BaseModel):
     phone_numbers: List[str]
     message_template: Optional[str] = None
 
+class CampaignRequest(BaseModel):
+    phone_numbers: List[str] = Field(..., min_length=1)
+    name: Optional[str] = None
+    from_number: str = "+1234567890"
+    prompt_id: Optional[str] = None
+
 class Client(BaseModel):
     id: Optional[int] = None
     name: str
@@ -66,64 +101,159 @@ async def initiate_call(
 async def bulk_call_campaign(request: BulkCallRequest, user=Depends(verify_token)):
     """
     Initiate bulk calls to multiple phone numbers
+
+    Numbers are dialed concurrently, paced by the available call capacity.
+    The response is NDJSON: one line per number as its call is placed (not
+    in request order; "index" is its position in phone_numbers), then a
+    summary line with total_numbers, succeeded and failed.
     """
-    results = []
-    for number in request.phone_numbers:
-        try:
-            # Simulate or actually initiate call for each number
-            result = await initiate_call(number, "+1234567890")
-            results.append(result)
-        except Exception as e:
-            results.append({
-                "number": number, 
-                "status": "failed", 
-                "error": str(e)
-            })
-    
-    return {
-        "total_numbers": len(request.phone_numbers),
-        "results": results
-    }
+    async def stream_results():
+        succeeded = failed = 0
+        async for result in bulk_dialer.dial(request.phone_numbers, "+1234567890"):
+            if result["status"] == "success":
+                succeeded += 1
+            else:
+                failed += 1
+            yield json.dumps(result, default=_json_default) + "\n"
+        yield json.dumps({
+            "total_numbers": len(request.phone_numbers),
+            "succeeded": succeeded,
+            "failed": failed
+        }) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@router.post("/campaigns")
+async def create_campaign(request: CampaignRequest, user=Depends(verify_token)):
+    """
+    Queue a persistent bulk call campaign
 
-@router.get("/history", response_model=List[CallLog])
+    Unlike /bulk, the campaign survives restarts and dropped requests: its
+    targets are stored and drained by every running campaign worker, each
+    number dialed at most once. Poll GET /campaigns/{campaign_id} for progress.
+    """
+    try:
+        campaign = await campaign_queue.create(
+            request.phone_numbers, request.from_number, name=request.name,
+            prompt_id=request.prompt_id, created_by=user.get("sub")
+        )
+    except Exception as e:
+        logger.error(f"Campaign creation failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to create campaign")
+    return campaign
+
+@router.get("/campaigns/{campaign_id}")
+async def get_campaign_progress(campaign_id: str, user=Depends(verify_token)):
+    """
+    Progress of a campaign: targets by status, recent dial rate and ETA
+    """
+    progress = await campaign_queue.progress(campaign_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return progress
+
+@router.post("/campaigns/{campaign_id}/cancel")
+async def cancel_campaign(campaign_id: str, user=Depends(verify_token)):
+    """
+    Stop dialing the remaining targets of a campaign
+    """
+    if not await campaign_queue.cancel(campaign_id):
+        raise HTTPException(status_code=404, detail="No active campaign with this id")
+    return {"campaign_id": campaign_id, "status": "cancelled"}
+
+@router.get("/history", responses={200: {"model": List[CallLog]}})
 async def get_call_history(
-    page: int = 1,
-    limit: int = 10,
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
     status: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns; transcription is omitted by default"),
+    include_archived: bool = Query(False, description="Also return calls moved to calls_archive"),
     user=Depends(verify_token)
 ):
     """
-    Retrieve paginated call history from the database.
+    Retrieve call history from the database, newest first.
+
+    Pages are addressed by cursor: the response carries an X-Next-Cursor
+    header to pass back for the next page (absent on the last page). The
+    page parameter is still honoured when no cursor is given, but deep
+    offsets get slower the further they go. With include_archived, archived
+    calls are merged into the same ordering.
     """
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in CALL_HISTORY_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    else:
+        selected = list(DEFAULT_CALL_HISTORY_FIELDS)
+    # The cursor is built from these
+    for key in ("start_time", "id"):
+        if key not in selected:
+            selected.append(key)
+
     try:
-        query = """
-            SELECT id, call_sid, from_number, to_number, direction, status, start_time, end_time, duration, recording_url, transcription, cost, segments, ultravox_cost, created_at
-            FROM calls
-        """
         conditions = []
-        values = []
+        where_values = []
 
         if status:
             conditions.append("status = %s")
-            values.append(status)
-
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
+            where_values.append(status)
 
-        query += " ORDER BY start_time DESC LIMIT %s OFFSET %s"
-        values.extend([limit, (page - 1) * limit])
+        if cursor:
+            after_time, after_id = decode_history_cursor(cursor)
+            conditions.append("(start_time < %s OR (start_time = %s AND id < %s))")
+            where_values.extend([after_time, after_time, after_id])
 
-        # Execute the query
-        rows = await db.execute(query, values)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        offset = (page - 1) * limit if not cursor and page > 1 else 0
+        order = " ORDER BY start_time DESC, id DESC LIMIT %s"
+        # Fetch one extra row to know whether there is a next page
+        window = limit + 1
 
-        # Convert rows to CallLog objects
-        call_logs = [CallLog(**row) for row in rows]
+        # Transcripts are read compressed and only decoded for the rows returned
+        hot_columns = ", ".join(
+            "transcription, transcription_z" if f == "transcription" else f for f in selected
+        )
+        if include_archived:
+            # Each branch is cut to the page window on its own index before merging
+            archive_columns = ", ".join(
+                "NULL AS transcription, transcription_z" if f == "transcription" else f for f in selected
+            )
+            query = (
+                f"(SELECT {hot_columns} FROM calls{where}{order}) UNION ALL "
+                f"(SELECT {archive_columns} FROM calls_archive{where}{order}){order}"
+            )
+            values = where_values + [offset + window] + where_values + [offset + window] + [window]
+        else:
+            query = f"SELECT {hot_columns} FROM calls{where}{order}"
+            values = where_values + [window]
+        if offset:
+            query += " OFFSET %s"
+            values.append(offset)
 
-        return call_logs
+        rows = await db.execute(query, values, prefer_replica=True)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Database error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_history_cursor(rows[-1]["start_time"], rows[-1]["id"])
+    if "transcription" in selected:
+        for row in rows:
+            row["transcription"] = decode_transcription(row)
+
+    # Rows go out as they come from the database, without building a model per row
+    return Response(
+        content=json.dumps(rows, default=_json_default),
+        media_type="application/json",
+        headers=headers
+    )
+
 @router.post("/clients")
 async def create_client(client: Client, user=Depends(verify_token)):
     """
@@ -175,14 +305,23 @@ async def delete_client(client_id: int, user=Depends(verify_token)):
 @router.post("/clients/import")
 async def import_clients(clients: List[Client], user=Depends(verify_token)):
     """
-    Import clients from Google Sheet (simulated)
+    Import clients from Google Sheet in a single batched write
     """
-    # In a real application, you would store this data in the database
-    # For this example, we just return the data
-    return {
-        "message": "Clients imported successfully (simulated)",
-        "clients": clients
-    }
+    try:
+        query = """
+            INSERT INTO clients (name, phone_number, email, address)
+            VALUES (%s, %s, %s, %s)
+        """
+        rows = [(c.name, c.phone_number, c.email, c.address) for c in clients]
+        imported = await db.execute_many(query, rows)
+        return {
+            "message": "Clients imported successfully",
+            "imported": imported,
+            "clients": clients
+        }
+    except Exception as e:
+        logger.error(f"Database error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{call_sid}")
 async def get_call_details(call_sid: str, user=Depends(verify_token)):
@@ -195,7 +334,7 @@ async def get_call_details(call_sid: str, user=Depends(verify_token)):
         
         # Get additional details from database
         query = """
-            SELECT transcription, ultravox_cost, segments
+            SELECT ultravox_cost, segments
             FROM calls
             WHERE call_sid = %s
         """
@@ -205,7 +344,7 @@ async def get_call_details(call_sid: str, user=Depends(verify_token)):
         if rows and len(rows) > 0:
             db_data = rows[0]
             call_details.update({
-                "transcription": db_data.get("transcription"),
+                "transcription": await transcript_store.get_call_transcription(call_sid),
                 "ultravox_cost": db_data.get("ultravox_cost"),
                 "segments": db_data.get("segments")
             })
@@ -215,6 +354,26 @@ async def get_call_details(call_sid: str, user=Depends(verify_token)):
         logger.error(f"Error fetching call details: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/status")
+async def call_status_callback(request: Request):
+    """
+    Twilio status callback (initiated, ringing, answered, completed).
+    Acknowledged immediately; the update is written in the next batch.
+    Requests without a valid X-Twilio-Signature are refused.
+    """
+    form_data = dict(await request.form())
+
+    # Twilio signs the URL it was given, not the one seen behind the proxy
+    url = twilio_service.status_callback
+    if request.url.query:
+        url = f"{url}?{request.url.query}"
+    if not twilio_service.validate_request(url, form_data, request.headers.get("X-Twilio-Signature", "")):
+        logger.warning(f"Rejected status callback with an invalid signature for {form_data.get('CallSid')}")
+        raise HTTPException(status_code=403, detail="Invalid Twilio signature")
+
+    await twilio_service.handle_status_callback(form_data)
+    return Response(status_code=204)
+
 @router.post("/incoming-call")
 async def incoming_call(request: Request):
     """
@@ -230,42 +389,30 @@ async def incoming_call(request: Request):
     call_sid = twilio_params.get('CallSid')
     prompt_id = twilio_params.get('PromptId')  # Optional parameter to specify custom prompt
 
-    # Get the correct system prompt for inbound calls
-    system_prompt = prompt_service.get_system_prompt('inbound', prompt_id)
-
     # Use the configured server domain from settings
     server_domain = settings.server_domain
     stream_url = f"wss://{server_domain}/ws/media-stream"  # Note the /ws prefix for WebSocket endpoints
 
-    # Create TwiML response
-    twiml = VoiceResponse()
-    connect = Connect()
-    stream = Stream(url=stream_url)
-    
-    # Pass parameters to the stream
-    stream.parameter(name="callSid", value=call_sid)
-    stream.parameter(name="callerNumber", value=caller_number) 
-    stream.parameter(name="direction", value="inbound")
-    stream.parameter(name="systemPrompt", value=system_prompt)
-    
-    connect.append(stream)
-    twiml.append(connect)
+    # TwiML response with the inbound system prompt; only the call values are filled in per call
+    twiml = twiml_templates.render('inbound', stream_url, prompt_id, call_sid=call_sid, caller_number=caller_number)
 
     # Log call for monitoring
     await save_call_to_db(call_sid, caller_number, "inbound", "in-progress")
 
-    return Response(content=str(twiml), media_type="application/xml")
+    return Response(content=twiml, media_type="application/xml")
 
 async def save_call_to_db(call_sid, caller_number, direction, status, to_number=None):
     """
     Save initial call information to database
     """
     try:
+        # UTC like outbound calls, so the daily call metrics bucket both the same way
         query = """
             INSERT INTO calls (call_sid, from_number, to_number, direction, status, start_time)
-            VALUES (%s, %s, %s, %s, %s, NOW())
+            VALUES (%s, %s, %s, %s, %s, %s)
         """
-        values = (call_sid, caller_number, to_number or settings.server_domain, direction, status)
+        values = (call_sid, caller_number, to_number or settings.server_domain, direction, status,
+                  datetime.utcnow())
         await db.execute(query, values)
         logger.info(f"Call {call_sid} saved to database")
     except Exception as e:
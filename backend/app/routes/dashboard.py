@@ -4,6 +4,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict, List, Optional
 import logging
 from datetime import datetime, timedelta
+from ..config import settings
 from ..database import db
 from ..middleware.auth import verify_token
 from ..services.system_monitor import system_monitor
@@ -15,23 +16,23 @@ logger = logging.getLogger(__name__)
 @router.get("/api/dashboard/stats")
 async def get_dashboard_stats(user=Depends(verify_token)):
     """
-    Retrieve dashboard statistics
+    Retrieve dashboard statistics (cached for DASHBOARD_CACHE_TTL seconds)
     """
     try:
         # Total calls
-        total_calls_query = "SELECT COUNT(*) FROM calls"
-        total_calls_result = await db.execute(total_calls_query)
-        total_calls = total_calls_result[0][0] if total_calls_result else 0
+        total_calls_query = "SELECT COUNT(*) AS count FROM calls"
+        total_calls_result = await db.execute(total_calls_query, prefer_replica=True, cache_ttl=settings.dashboard_cache_ttl)
+        total_calls = total_calls_result[0]['count'] if total_calls_result else 0
 
         # Active services
-        active_services_query = "SELECT COUNT(*) FROM service_connections WHERE is_connected = TRUE"
-        active_services_result = await db.execute(active_services_query)
-        active_services = active_services_result[0][0] if active_services_result else 0
+        active_services_query = "SELECT COUNT(*) AS count FROM service_connections WHERE is_connected = TRUE"
+        active_services_result = await db.execute(active_services_query, prefer_replica=True, cache_ttl=settings.dashboard_cache_ttl)
+        active_services = active_services_result[0]['count'] if active_services_result else 0
 
         # Knowledge base documents
-        knowledge_base_query = "SELECT COUNT(*) FROM knowledge_base_documents"
-        knowledge_base_result = await db.execute(knowledge_base_query)
-        knowledge_base_documents = knowledge_base_result[0][0] if knowledge_base_result else 0
+        knowledge_base_query = "SELECT COUNT(*) AS count FROM knowledge_base_documents"
+        knowledge_base_result = await db.execute(knowledge_base_query, prefer_replica=True, cache_ttl=settings.dashboard_cache_ttl)
+        knowledge_base_documents = knowledge_base_result[0]['count'] if knowledge_base_result else 0
 
         # AI Accuracy (This is a placeholder, you'll need to implement actual logic)
         ai_response_accuracy = "85%"
@@ -91,7 +92,7 @@ async def get_recent_activities(user=Depends(verify_token)):
             ORDER BY start_time DESC 
             LIMIT 5
         """
-        recent_calls = await db.execute(recent_calls_query)
+        recent_calls = await db.execute(recent_calls_query, prefer_replica=True, cache_ttl=settings.dashboard_cache_ttl)
         
         # Get recent document uploads (last 7 days)
         recent_docs_query = """
@@ -100,7 +101,7 @@ async def get_recent_activities(user=Depends(verify_token)):
             ORDER BY created_at DESC 
             LIMIT 5
         """
-        recent_docs = await db.execute(recent_docs_query)
+        recent_docs = await db.execute(recent_docs_query, prefer_replica=True, cache_ttl=settings.dashboard_cache_ttl)
         
         # Format the activities
         activities = []
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 from ..database import db
-from ..middleware.auth import get_current_user
+from ..middleware.auth import admin_required, get_current_user
 
 router = APIRouter(
     prefix="/database",
@@ -108,5 +108,29 @@ async def get_database_status(_: Dict = Depends(get_current_user)):
             "host": db.ext_db_config.get("host", ""),
             "user": db.ext_db_config.get("user", ""),
             "database": db.ext_db_config.get("database", "")
-        } if db.use_external_db else None
+        } if db.use_external_db else None,
+        "read_replica": db.replica_pool is not None,
+        "local_mirror": db.mirror.stats(),
+        "pools": db.pool_stats(),
+        "query_cache": db.query_cache.stats(),
+        "failover": db.failover.stats() if db.use_external_db else None
+    }
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000),
+    _: Dict = Depends(admin_required)
+):
+    """
+    Get the most recent slow queries with their EXPLAIN plans
+    
+    Args:
+        limit: Maximum number of entries to return
+        
+    Returns:
+        Slow-query threshold and log entries, newest first
+    """
+    return {
+        "threshold_ms": db.slow_queries.threshold * 1000,
+        "entries": db.slow_queries.entries(limit)
     }
@@ -7,7 +7,9 @@ from ..services.google_service import GoogleService
 from ..services.supabase_service import SupabaseService
 from ..services.airtable_service import AirtableService
 from ..services.transcript_analyzer import TranscriptAnalyzer
+from ..services.transcript_store import decode_transcription
 from datetime import datetime
+from contextlib import aclosing
 import asyncio
 import json
 
@@ -20,6 +22,9 @@ supabase_service = SupabaseService()
 airtable_service = AirtableService()
 transcript_analyzer = TranscriptAnalyzer()
 
+# Rows pulled from the database and pushed to the destination per batch
+EXPORT_BATCH_SIZE = 1000
+
 # Default field mappings for automatic setup
 DEFAULT_FIELD_MAPPINGS = {
     "call_sid": "Call SID",
@@ -72,20 +77,6 @@ async def export_calls(
         )
     
     try:
-        # Fetch all call data if not provided in request
-        if not export_options.call_data:
-            query = """
-                SELECT 
-                    call_sid, from_number, to_number, direction, 
-                    status, start_time, end_time, duration, 
-                    recording_url, transcription, cost, ultravox_cost,
-                    hang_up_by, created_at
-                FROM calls
-                ORDER BY created_at DESC
-                LIMIT 1000
-            """
-            export_options.call_data = await db.execute(query)
-        
         # Get user credentials
         user_id = current_user.get("user_id")
         credentials = await get_service_credentials(user_id, export_options.service)
@@ -96,24 +87,26 @@ async def export_calls(
                 detail=f"{export_options.service} credentials not found"
             )
         
-        # Process call data to extract client information from transcriptions
-        processed_call_data = transcript_analyzer.process_call_data(export_options.call_data)
-        
-        # Format data for export based on field mapping
-        formatted_data = format_data_for_export(processed_call_data, export_options.field_mapping)
-        
-        # Export to the selected service
-        if export_options.service == "google_sheets":
-            result = await export_to_google_sheets(credentials, export_options, formatted_data)
-        elif export_options.service == "supabase":
-            result = await export_to_supabase(credentials, export_options, formatted_data)
-        elif export_options.service == "airtable":
-            result = await export_to_airtable(credentials, export_options, formatted_data)
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid service selected"
-            )
+        # Export batch by batch so the full call history never sits in memory
+        exported_count = 0
+        result = None
+        async with aclosing(iter_call_batches(export_options)) as batches:
+            async for batch in batches:
+                # Process call data to extract client information from transcriptions
+                processed_call_data = transcript_analyzer.process_call_data(batch)
+                
+                # Format data for export based on field mapping
+                formatted_data = format_data_for_export(processed_call_data, export_options.field_mapping)
+                
+                batch_result = await export_batch(credentials, export_options, formatted_data)
+                exported_count += len(batch)
+                if result is None:
+                    result = batch_result
+                else:
+                    result["rows_exported"] = result.get("rows_exported", 0) + batch_result.get("rows_exported", 0)
+        if result is None:
+            # Nothing to export, but still create the destination if requested
+            result = await export_batch(credentials, export_options, [])
             
         # Set up real-time sync if enabled
         if export_options.sync_enabled:
@@ -121,7 +114,7 @@ async def export_calls(
             
         return {
             "success": True,
-            "message": f"Successfully exported {len(export_options.call_data)} records to {export_options.service}",
+            "message": f"Successfully exported {exported_count} records to {export_options.service}",
             "destination": export_options.destination,
             "service": export_options.service,
             "details": result
@@ -328,6 +321,61 @@ async def get_airtable_table_fields(
         )
 
 # Helper functions
+async def iter_call_batches(options):
+    """
+    Yield call rows in batches of EXPORT_BATCH_SIZE, either from the request
+    payload or streamed from the database with a server-side cursor
+    """
+    if options.call_data:
+        yield options.call_data
+        return
+    
+    query = """
+        SELECT 
+            call_sid, from_number, to_number, direction, 
+            status, start_time, end_time, duration, 
+            recording_url, transcription, transcription_z, cost, ultravox_cost,
+            hang_up_by, created_at
+        FROM calls
+        ORDER BY created_at DESC
+    """
+    batch = []
+    async with aclosing(db.stream(query, batch_size=EXPORT_BATCH_SIZE, prefer_replica=True)) as rows:
+        async for row in rows:
+            row["transcription"] = decode_transcription(row)
+            batch.append(row)
+            if len(batch) >= EXPORT_BATCH_SIZE:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+async def export_batch(credentials, options, formatted_data):
+    """
+    Export one batch to the selected service.
+    After the first batch has created the destination, later batches append to it.
+    """
+    if options.service == "google_sheets":
+        result = await export_to_google_sheets(credentials, options, formatted_data)
+        destination = result.get("sheet_id")
+    elif options.service == "supabase":
+        result = await export_to_supabase(credentials, options, formatted_data)
+        destination = result.get("table_name")
+    elif options.service == "airtable":
+        result = await export_to_airtable(credentials, options, formatted_data)
+        destination = result.get("table_id")
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid service selected"
+        )
+    
+    if options.create_new:
+        options.create_new = False
+        options.destination = destination or options.destination
+    
+    return result
+
 async def get_service_credentials(user_id: int, service_name: str):
     """
     Get credentials for a specific service and user
@@ -31,9 +31,12 @@ async def health_check() -> Dict:
         health_status["status"] = "unhealthy"
         logger.error(f"Database health check failed: {str(e)}")
 
+    # Report circuit breaker state so callers can back off instead of piling on
+    health_status["database_breakers"] = db.breaker_states()
+
     # Add more service checks as needed
 
     if health_status["status"] != "healthy":
         raise HTTPException(status_code=503, detail=health_status)
 
-    return health_status
+    return health_status
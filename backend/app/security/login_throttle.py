@@ -0,0 +1,76 @@
+# backend/app/security/login_throttle.py
+
+import collections
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from ..config import settings
+from ..monitoring.metrics import metrics_collector
+
+
+class LoginThrottle:
+    """
+    Token-bucket limit on login attempts, kept separately per username and
+    per client IP.
+
+    Every attempt takes a token from both buckets; buckets refill at
+    attempts_per_minute and hold at most burst tokens. Once either bucket is
+    empty the attempt is rejected with 429 before any password is hashed, so
+    a burst of logins costs almost nothing and cannot crowd out call traffic.
+    """
+
+    def __init__(self, attempts_per_minute: float = 10.0, burst: int = 5, max_keys: int = 100000):
+        self.rate = attempts_per_minute / 60.0
+        self.burst = max(1, burst)
+        self.max_keys = max(1, max_keys)
+        # key -> (tokens, updated_at)
+        self._buckets: "collections.OrderedDict[str, Tuple[float, float]]" = collections.OrderedDict()
+
+    def check(self, username: str, client_ip: Optional[str] = None) -> None:
+        """
+        Take one attempt for username and client_ip
+
+        Raises:
+            HTTPException: 429 with Retry-After when either is over its limit
+        """
+        now = time.monotonic()
+        keys = [f"user:{username.lower()}"]
+        if client_ip:
+            keys.append(f"ip:{client_ip}")
+
+        levels = {key: self._level(key, now) for key in keys}
+        empty = [key for key, tokens in levels.items() if tokens < 1]
+        if empty:
+            metrics_collector.record_login_throttled(empty[0].split(":", 1)[0])
+            wait = max((1 - levels[key]) / self.rate for key in empty) if self.rate > 0 else 60
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, try again later",
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+
+        for key, tokens in levels.items():
+            self._buckets[key] = (tokens - 1, now)
+            self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def reset(self, username: str) -> None:
+        """Give a username its full burst back, e.g. after a successful login"""
+        self._buckets.pop(f"user:{username.lower()}", None)
+
+    def _level(self, key: str, now: float) -> float:
+        entry = self._buckets.get(key)
+        if entry is None:
+            return float(self.burst)
+        tokens, updated_at = entry
+        return min(float(self.burst), tokens + (now - updated_at) * self.rate)
+
+
+login_throttle = LoginThrottle(
+    attempts_per_minute=settings.login_attempts_per_minute,
+    burst=settings.login_attempt_burst
+)
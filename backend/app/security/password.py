@@ -1,9 +1,53 @@
+import asyncio
 import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 from passlib.context import CryptContext
+from ..config import settings
+from ..monitoring.metrics import metrics_collector
 
 # Setup password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt takes ~250 ms of CPU per call; it runs on a few dedicated threads so
+# logins never block the event loop (and with it call webhooks)
+_hash_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.password_hash_workers),
+    thread_name_prefix="password-hash"
+)
+_pending = 0
+
+class PasswordHashBusy(Exception):
+    """Raised when PASSWORD_HASH_MAX_QUEUE hash jobs are already waiting"""
+    pass
+
+async def run_password_job(operation: str, func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a password hashing function on the hashing threads
+    
+    Args:
+        operation: Label for metrics (verify, hash)
+        func: Blocking function to run
+    
+    Raises:
+        PasswordHashBusy: Too many jobs are queued already
+    """
+    global _pending
+    if _pending >= settings.password_hash_max_queue:
+        metrics_collector.record_password_hash_rejected(operation)
+        raise PasswordHashBusy("Too many password checks in progress, try again shortly")
+    
+    _pending += 1
+    metrics_collector.set_password_hash_queue_depth(_pending)
+    started = time.monotonic()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_hash_executor, func, *args)
+    finally:
+        _pending -= 1
+        metrics_collector.set_password_hash_queue_depth(_pending)
+        metrics_collector.record_password_hash(operation, time.monotonic() - started)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
     try:
@@ -18,6 +62,14 @@ def get_password_hash(password: str) -> str:
     """Create a password hash."""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the hashing threads; use this from async code."""
+    return await run_password_job("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the hashing threads; use this from async code."""
+    return await run_password_job("hash", get_password_hash, password)
+
 def generate_token() -> str:
     """Generate a secure random token."""
     return secrets.token_urlsafe(32)
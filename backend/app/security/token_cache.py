@@ -0,0 +1,265 @@
+# backend/app/security/token_cache.py
+
+import asyncio
+import collections
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from jose import jwt, JWTError
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def token_digest(token: str) -> bytes:
+    """Fixed-size fingerprint of a token; tokens themselves are never kept"""
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
+class BloomFilter:
+    """Bit array with k hash positions per item, derived from a 16-byte digest"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, digest: bytes) -> Iterable[int]:
+        # Double hashing: position i is h1 + i * h2
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, digest: bytes) -> None:
+        for position in self._positions(digest):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class RevocationSet:
+    """
+    Revoked token digests with the time each token would have expired anyway.
+
+    The bloom filter answers the common case (token not revoked) without
+    touching the exact set; only its rare positives are checked against it.
+    Entries are dropped once their token has expired, and the filter is then
+    rebuilt from what is left.
+    """
+
+    def __init__(self, capacity: int = 100000):
+        self.capacity = max(1, capacity)
+        self._exact: Dict[bytes, float] = {}
+        self._bloom = BloomFilter(self.capacity)
+        self._next_prune = 0.0
+
+    def add(self, digest: bytes, expires_at: float) -> None:
+        self._exact[digest] = max(expires_at, self._exact.get(digest, 0.0))
+        self._bloom.add(digest)
+        if len(self._exact) > self.capacity or time.time() >= self._next_prune:
+            self.prune()
+
+    def __contains__(self, digest: bytes) -> bool:
+        return digest in self._bloom and digest in self._exact
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def prune(self) -> None:
+        now = time.time()
+        self._exact = {digest: expires_at for digest, expires_at in self._exact.items() if expires_at > now}
+        if len(self._exact) > self.capacity:
+            # Grow rather than let the false positive rate climb
+            self.capacity = len(self._exact) * 2
+        self._bloom = BloomFilter(self.capacity)
+        for digest in self._exact:
+            self._bloom.add(digest)
+        self._next_prune = now + 60
+
+
+class TokenCache:
+    """
+    Memoizes JWT verification.
+
+    Validated claims are kept in a bounded LRU keyed by the token digest and
+    the verifying secret, until the token's exp; a replayed token then costs
+    a hash and a dict lookup instead of an HMAC check and JSON decode.
+    Revoked tokens (logout) are rejected from memory; revocations are also
+    written to the revoked_tokens table and reloaded by load_revocations(),
+    which Database.connect() starts in the background, so they survive
+    restarts and reach other workers within TOKEN_REVOCATION_REFRESH_INTERVAL
+    seconds.
+    """
+
+    def __init__(self, max_entries: int = 10000, revocation_capacity: int = 100000, database=None):
+        self.max_entries = max(1, max_entries)
+        self.database = database
+        self.revoked = RevocationSet(revocation_capacity)
+
+        # (secret tag, token digest) -> (expires_at, claims)
+        self._entries: "collections.OrderedDict[Tuple[bytes, bytes], Tuple[float, Dict[str, Any]]]" = collections.OrderedDict()
+        self._secret_tags: Dict[str, bytes] = {}
+        self._last_sync: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+
+    def attach(self, database) -> None:
+        """Persist and reload revocations through database"""
+        self.database = database
+
+    def decode(self, token: str, secret: str, algorithms: List[str]) -> Dict[str, Any]:
+        """
+        Drop-in replacement for jwt.decode(token, secret, algorithms=algorithms)
+
+        Raises:
+            JWTError: The token is invalid, expired or revoked
+        """
+        digest = token_digest(token)
+        if digest in self.revoked:
+            raise JWTError("Token has been revoked")
+
+        key = (self._secret_tag(secret, algorithms), digest)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, claims = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(claims)
+            del self._entries[key]
+            raise JWTError("Signature has expired.")
+
+        self.misses += 1
+        claims = jwt.decode(token, secret, algorithms=algorithms)
+        expires_at = claims.get("exp")
+        if isinstance(expires_at, (int, float)):
+            self._entries[key] = (float(expires_at), dict(claims))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return claims
+
+    async def revoke(self, token: str, secret: str, algorithms: List[str]) -> bool:
+        """
+        Revoke a valid token until it expires
+
+        Returns:
+            False if the token was not valid to begin with
+        """
+        try:
+            claims = self.decode(token, secret, algorithms)
+        except JWTError:
+            return False
+        digest = token_digest(token)
+        expires_at = float(claims.get("exp") or time.time() + settings.access_token_expire_minutes * 60)
+        self.revoked.add(digest, expires_at)
+        self.forget(token)
+
+        if self.database is not None:
+            try:
+                # revoked_at from this clock, the one load_revocations() compares it with;
+                # the column default would use the database's
+                await self.database.execute(
+                    "INSERT IGNORE INTO revoked_tokens (token_digest, expires_at, revoked_at) VALUES (%s, %s, %s)",
+                    (digest.hex(), datetime.fromtimestamp(expires_at), datetime.now())
+                )
+            except Exception as e:
+                # Still revoked in this process; other workers miss it until it expires
+                logger.error(f"Could not persist token revocation: {e}")
+        return True
+
+    def forget(self, token: str) -> None:
+        """Drop cached claims for a token under every secret"""
+        digest = token_digest(token)
+        for key in [key for key in self._entries if key[1] == digest]:
+            del self._entries[key]
+
+    async def load_revocations(self) -> int:
+        """
+        Load revocations recorded since the last load (all unexpired ones the
+        first time) and drop expired rows
+
+        Returns:
+            Number of revocations loaded
+        """
+        if self.database is None:
+            return 0
+        since = self._last_sync
+        self._last_sync = datetime.now()
+        if since is None:
+            rows = await self.database.execute(
+                "SELECT token_digest, expires_at FROM revoked_tokens WHERE expires_at > %s",
+                (self._last_sync,)
+            )
+        else:
+            # Overlap the previous load a little in case the clocks of the workers differ
+            rows = await self.database.execute(
+                "SELECT token_digest, expires_at FROM revoked_tokens WHERE revoked_at >= %s",
+                (since - timedelta(minutes=1),)
+            )
+        for row in rows:
+            digest = bytes.fromhex(row["token_digest"])
+            self.revoked.add(digest, row["expires_at"].timestamp())
+            for key in [key for key in self._entries if key[1] == digest]:
+                del self._entries[key]
+
+        await self.database.execute("DELETE FROM revoked_tokens WHERE expires_at < %s", (self._last_sync,))
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "revoked": len(self.revoked)
+        }
+
+    def start(self, interval: float = None) -> None:
+        """Reload revocations in the background every interval seconds (TOKEN_REVOCATION_REFRESH_INTERVAL)"""
+        if self._task:
+            return
+        self._task = asyncio.get_running_loop().create_task(
+            self._run_periodically(interval if interval is not None else settings.token_revocation_refresh_interval)
+        )
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def _run_periodically(self, interval: float) -> None:
+        while True:
+            try:
+                await self.load_revocations()
+            except Exception as e:
+                logger.error(f"Loading token revocations failed: {e}")
+            await asyncio.sleep(interval)
+
+    def _secret_tag(self, secret: str, algorithms: List[str]) -> bytes:
+        # Claims verified with one secret must never be served for another
+        cache_key = f"{','.join(algorithms)}:{secret}"
+        tag = self._secret_tags.get(cache_key)
+        if tag is None:
+            tag = hashlib.blake2b(cache_key.encode("utf-8"), digest_size=8).digest()
+            self._secret_tags[cache_key] = tag
+        return tag
+
+
+token_cache = TokenCache(
+    max_entries=settings.token_cache_max_entries,
+    revocation_capacity=settings.token_revocation_capacity
+)
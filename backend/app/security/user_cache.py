@@ -0,0 +1,120 @@
+# backend/app/security/user_cache.py
+
+import asyncio
+import collections
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from ..config import settings
+from ..monitoring.metrics import metrics_collector
+from ..persistence.cache import LoadAbandoned
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    In-process cache of the users rows that token verification looks up.
+
+    Known users are kept for ttl seconds, unknown usernames for negative_ttl
+    seconds so that tokens for deleted users do not hit the database on every
+    request either. Any write to the users table made through Database clears
+    the cache (see attach()); writes made by other processes are seen after
+    at most ttl seconds. Concurrent misses for the same username share one
+    database round trip.
+    """
+
+    def __init__(self, ttl: float = 30.0, negative_ttl: float = 5.0, max_entries: int = 10000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max(1, max_entries)
+
+        # username -> (expires_at, row or None for an unknown user)
+        self._entries: "collections.OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = collections.OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Bumped on every invalidation so a lookup that overlapped one is not stored
+        self._version = 0
+
+    def attach(self, query_cache) -> None:
+        """Clear the cache whenever the database reports a write to the users table"""
+        query_cache.add_listener(self._on_tables_written)
+
+    async def get_or_load(self, username: str,
+                          loader: Callable[[str], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """
+        Return the user row for username (None if there is no such user),
+        calling loader(username) on a miss
+        """
+        entry = self._entries.get(username)
+        if entry is not None:
+            expires_at, row = entry
+            if expires_at > time.monotonic():
+                metrics_collector.record_user_cache("hit" if row is not None else "negative_hit")
+                return dict(row) if row is not None else None
+            del self._entries[username]
+
+        pending = self._inflight.get(username)
+        if pending is not None:
+            try:
+                row = await asyncio.shield(pending)
+            except LoadAbandoned:
+                return await self.get_or_load(username, loader)
+            metrics_collector.record_user_cache("hit")
+            return dict(row) if row is not None else None
+
+        metrics_collector.record_user_cache("miss")
+        version = self._version
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[username] = future
+        try:
+            row = await loader(username)
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be waiting on it; don't let asyncio log it as unretrieved
+            future.exception()
+            raise
+        except BaseException:
+            # Not cancel(): waiters would get a CancelledError that is not theirs
+            future.set_exception(LoadAbandoned())
+            future.exception()
+            raise
+        else:
+            future.set_result(row)
+        finally:
+            self._inflight.pop(username, None)
+
+        if version == self._version:
+            self._store(username, row)
+        return dict(row) if row is not None else None
+
+    def invalidate(self, username: Optional[str] = None) -> None:
+        """Forget one user, or every user when username is None"""
+        self._version += 1
+        if username is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(username, None)
+        metrics_collector.set_user_cache_entries(len(self._entries))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "ttl": self.ttl, "negative_ttl": self.negative_ttl}
+
+    def _store(self, username: str, row: Optional[Dict[str, Any]]) -> None:
+        ttl = self.ttl if row is not None else self.negative_ttl
+        self._entries[username] = (time.monotonic() + ttl, dict(row) if row is not None else None)
+        self._entries.move_to_end(username)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        metrics_collector.set_user_cache_entries(len(self._entries))
+
+    def _on_tables_written(self, tables: Iterable[str]) -> None:
+        if "users" in tables:
+            self.invalidate()
+
+
+user_cache = UserCache(
+    ttl=settings.user_cache_ttl,
+    negative_ttl=settings.user_cache_negative_ttl,
+    max_entries=settings.user_cache_max_entries
+)
@@ -4,6 +4,8 @@ from typing import Dict, Optional
 from passlib.context import CryptContext
 import logging
 
+from .password import run_password_job
+
 logger = logging.getLogger(__name__)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -35,6 +37,10 @@ class InMemoryUserStore:
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         return pwd_context.verify(plain_password, hashed_password)
+    
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        # bcrypt is slow; keep it off the event loop
+        return await run_password_job("verify", pwd_context.verify, plain_password, hashed_password)
 
 # Create a singleton instance
 user_store = InMemoryUserStore()
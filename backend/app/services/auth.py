@@ -4,7 +4,7 @@ from jose import JWTError, jwt
 from fastapi import HTTPException, status
 from ..config import settings
 from ..database import db
-from ..security.password import verify_password
+from ..security.password import PasswordHashBusy, verify_password_async
 
 class AuthService:
     @staticmethod
@@ -19,7 +19,15 @@ class AuthService:
             )
             
         user = result[0]
-        if not verify_password(password, user['password_hash']):
+        try:
+            valid = await verify_password_async(password, user['password_hash'])
+        except PasswordHashBusy as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+                headers={"Retry-After": "1"}
+            )
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password"
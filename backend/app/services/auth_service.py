@@ -1,6 +1,7 @@
 import logging
 from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from ..security.password import PasswordHashBusy
 from ..security.user_store import user_store
 from ..utils.error_handler import AuthenticationError
 
@@ -18,7 +19,7 @@ async def authenticate_user(username: str, password: str):
                 details={"headers": {"WWW-Authenticate": "Bearer"}}
             )
         
-        if not user_store.verify_password(password, user['password_hash']):
+        if not await user_store.verify_password_async(password, user['password_hash']):
             raise AuthenticationError(
                 message="Invalid credentials",
                 details={"headers": {"WWW-Authenticate": "Bearer"}}
@@ -28,6 +29,12 @@ async def authenticate_user(username: str, password: str):
     except AuthenticationError:
         # Re-raise authentication errors
         raise
+    except PasswordHashBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         logger.error(f"Authentication error: {e}")
         raise HTTPException(
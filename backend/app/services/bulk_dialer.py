@@ -0,0 +1,180 @@
+# backend/app/services/bulk_dialer.py
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from ..config import settings
+from ..monitoring.metrics import metrics_collector
+from .system_monitor import system_monitor
+
+logger = logging.getLogger(__name__)
+
+
+class BulkDialer:
+    """
+    Dials a list of numbers through TwilioService on a bounded pool of
+    workers.
+
+    How fast new calls start follows SystemMonitor.calculate_call_capacity(),
+    re-read every BULK_DIAL_CAPACITY_REFRESH seconds, capped by Twilio's
+    TWILIO_CALLS_PER_SECOND. The dialer cannot see when a call ends (that
+    arrives later as a status callback), so recommended_outbound_concurrent
+    is used only as a pace: at most that many calls start per refresh
+    window, and the next reading of resource use already includes them.
+    BULK_DIAL_MAX_CONCURRENCY bounds create-call requests waiting on Twilio
+    at once, not live calls. Results are yielded per number as their
+    create-call request returns, not in input order.
+    """
+
+    def __init__(self, twilio=None, monitor=None):
+        self.twilio = twilio
+        self.monitor = monitor or system_monitor
+
+    async def dial(self, numbers: Iterable[str], from_number: str, ultravox_url: str = None,
+                   prompt_id: str = None,
+                   before_dial: Optional[Callable[[int], Awaitable[bool]]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Dial every number, yielding one result dict per number
+
+        Args:
+            numbers: Target phone numbers
+            from_number: Source phone number
+            ultravox_url: Optional WebSocket URL for Ultravox
+            prompt_id: Optional ID for custom system prompt
+            before_dial: Awaited with a number's index right before it is
+                dialed; if it returns False (or fails) no further calls are
+                started, while calls already started still finish
+
+        Yields:
+            {"index", "number", "status": "success", "call_sid"},
+            {"index", "number", "status": "failed", "error"},
+            {"index", "number", "status": "unknown", "error"} when Twilio
+            timed out, so the call may or may not have been placed, or
+            {"index", "number", "status": "skipped"} for numbers not dialed
+            after before_dial said stop
+        """
+        twilio = self.twilio
+        if twilio is None:
+            # Imported here to avoid a circular import with TwilioService.bulk_calls
+            from .twilio_service import twilio_service as twilio
+
+        pending = list(enumerate(numbers))
+        if not pending:
+            return
+        pending.reverse()
+        total = len(pending)
+
+        results: asyncio.Queue = asyncio.Queue()
+        pacing = _Pacing(self.monitor)
+        await pacing.refresh()
+
+        async def allowed(index: int) -> bool:
+            if before_dial is None:
+                return True
+            try:
+                return await before_dial(index)
+            except Exception as e:
+                logger.error(f"Bulk dial stopped, checking number {index} before dialing failed: {e}")
+                return False
+
+        async def worker() -> None:
+            while pending:
+                index, number = pending.pop()
+                await pacing.acquire()
+                try:
+                    if not await allowed(index):
+                        stopped = [(index, number)] + pending[::-1]
+                        pending.clear()
+                        for index, number in stopped:
+                            await results.put({"index": index, "number": number, "status": "skipped"})
+                        return
+                    call = await twilio.make_call(number, from_number, ultravox_url, prompt_id)
+                    result = {"index": index, "number": number, "status": "success", "call_sid": call["call_sid"]}
+                except Exception as e:
+                    # A timed out request may still have created the call
+                    timed_out = isinstance(e, asyncio.TimeoutError) or isinstance(e.__cause__, asyncio.TimeoutError)
+                    result = {"index": index, "number": number, "status": "unknown" if timed_out else "failed",
+                              "error": str(e)}
+                finally:
+                    await pacing.release()
+                metrics_collector.record_bulk_dial(result["status"])
+                await results.put(result)
+
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(total, max(1, settings.bulk_dial_max_concurrency)))
+        ]
+        refresher = asyncio.create_task(pacing.run())
+        try:
+            for _ in range(total):
+                yield await results.get()
+        finally:
+            # Also reached when the consumer stops early (e.g. the client went away)
+            refresher.cancel()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(refresher, *workers, return_exceptions=True)
+
+
+class _Pacing:
+    """Request concurrency limit and start-rate gate shared by the workers of one dial run"""
+
+    def __init__(self, monitor):
+        self.monitor = monitor
+        self.limit = 1
+        self.interval = 1.0
+        self.active = 0
+        self._next_start = 0.0
+        self._changed = asyncio.Condition()
+
+    def capacity(self) -> Tuple[int, float]:
+        """Concurrent request limit and calls per second allowed right now"""
+        capacity = self.monitor.calculate_call_capacity()
+        # Outbound headroom is live calls, measured from current resource use:
+        # spend it over one refresh window, by which time it is measured again
+        rate = min(
+            settings.twilio_calls_per_second,
+            capacity.get("recommended_calls_per_minute", 0) / 60.0,
+            capacity.get("recommended_outbound_concurrent", 0) / settings.bulk_dial_capacity_refresh
+        )
+        # With no headroom left keep trickling rather than stall the campaign
+        return max(1, settings.bulk_dial_max_concurrency), max(rate, 1 / 60.0)
+
+    async def refresh(self) -> None:
+        try:
+            # calculate_call_capacity samples CPU for half a second
+            limit, rate = await asyncio.to_thread(self.capacity)
+        except Exception as e:
+            logger.error(f"Could not read call capacity, keeping current pacing: {e}")
+            return
+        async with self._changed:
+            self.limit, self.interval = limit, 1.0 / rate
+            metrics_collector.set_bulk_dial_pacing(limit, rate)
+            self._changed.notify_all()
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.bulk_dial_capacity_refresh)
+            await self.refresh()
+
+    async def acquire(self) -> None:
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+            metrics_collector.set_bulk_dial_in_flight(self.active)
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def release(self) -> None:
+        async with self._changed:
+            self.active -= 1
+            metrics_collector.set_bulk_dial_in_flight(self.active)
+            self._changed.notify()
+
+
+bulk_dialer = BulkDialer()
@@ -6,6 +6,7 @@ from datetime import datetime
 import re
 from ..database import db
 from ..config import settings
+from .transcript_store import transcript_store
 from .ultravox_service import ultravox_service
 
 logger = logging.getLogger(__name__)
@@ -35,14 +36,22 @@ class CallAnalyzerService:
         
         logger.info(f"Analyzing call {call_sid}")
         
-        # Get call transcript from Ultravox service
-        transcript = await ultravox_service.get_transcript(call_sid)
+        # Use the stored transcript; fetch it from Ultravox (again, when refreshing) otherwise
+        transcript = None if force_refresh else await transcript_store.get_transcript_messages(call_sid)
+        fetched = not transcript
+        if fetched:
+            transcript = await ultravox_service.get_transcript(call_sid)
         if not transcript:
             logger.error(f"No transcript found for call {call_sid}")
             return {"success": False, "error": "No transcript found for this call"}
             
         # Extract conversation text for analysis
         conversation_text = "\n".join([f"{msg['role']}: {msg['text']}" for msg in transcript])
+
+        if fetched:
+            # Kept compressed: the messages for the next analysis, the text for call history and exports
+            await transcript_store.save_transcript_messages(call_sid, transcript)
+            await transcript_store.save_call_transcription(call_sid, conversation_text)
             
         # Extract key entities
         entities = await self._extract_entities(conversation_text)
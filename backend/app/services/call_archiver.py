@@ -0,0 +1,172 @@
+# backend/app/services/call_archiver.py
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from ..database import db
+from ..persistence.codec import compress_text
+
+logger = logging.getLogger(__name__)
+
+# Columns copied verbatim from calls to calls_archive; transcripts end up
+# compressed in transcription_z
+ARCHIVE_COLUMNS = (
+    "id", "call_sid", "from_number", "to_number", "direction", "status",
+    "start_time", "end_time", "duration", "recording_url", "cost", "segments",
+    "ultravox_cost", "system_prompt", "language_hint", "voice", "temperature",
+    "model", "knowledge_base_access", "rollup_counted", "created_at", "updated_at"
+)
+
+# Tables whose rows reference calls(call_sid) with ON DELETE CASCADE, and the
+# columns moved with their call to <table>_archive
+CHILD_TABLES = {
+    "call_actions": ("id", "call_sid", "action_type", "action_data", "created_at", "updated_at"),
+    "call_analysis": ("id", "call_sid", "analysis", "created_at", "updated_at"),
+    "call_transcriptions": ("id", "call_sid", "transcription", "transcription_z", "created_at", "updated_at"),
+    "knowledge_base_access_logs": ("id", "call_sid", "document_id", "relevance_score", "accessed_at"),
+}
+
+
+class CallArchiver:
+    """
+    Moves calls older than a cutoff from the hot calls table to calls_archive.
+
+    Each batch runs in one transaction: the oldest eligible calls are locked
+    (skipping rows other transactions hold), copied to calls_archive with the
+    transcript compressed, their child rows (actions, analysis, transcripts,
+    knowledge base accesses) are moved to the matching *_archive tables, and
+    the calls are deleted. A failed batch leaves every table untouched, so
+    the job can simply be run again. Database.connect() starts the periodic
+    run.
+    """
+
+    def __init__(self, database=db, archive_after_days: int = None, batch_size: int = None):
+        self.database = database
+        self.archive_after_days = archive_after_days if archive_after_days is not None else settings.call_archive_after_days
+        self.batch_size = max(1, batch_size if batch_size is not None else settings.call_archive_batch_size)
+        self._task: Optional[asyncio.Task] = None
+
+    def cutoff(self) -> datetime:
+        return datetime.now() - timedelta(days=self.archive_after_days)
+
+    async def archive_batch(self, cutoff: datetime) -> int:
+        """
+        Archive up to batch_size calls that started before cutoff
+
+        Returns:
+            Number of calls moved
+        """
+        select_query = f"""
+            SELECT {', '.join('c.' + col for col in ARCHIVE_COLUMNS)}, c.transcription, c.transcription_z
+            FROM calls c
+            WHERE c.start_time < %s
+            ORDER BY c.start_time, c.id
+            LIMIT %s
+            FOR UPDATE OF c SKIP LOCKED
+        """
+
+        async with self.database.transaction() as tx:
+            rows = await tx.execute(select_query, (cutoff, self.batch_size))
+            if not rows:
+                return 0
+
+            values: List[Any] = []
+            for row in rows:
+                values.extend(row[col] for col in ARCHIVE_COLUMNS)
+                # Already compressed rows are copied as they are
+                blob = row["transcription_z"]
+                values.append(blob if blob is not None else compress_text(row["transcription"]))
+            row_placeholders = "(" + ", ".join(["%s"] * (len(ARCHIVE_COLUMNS) + 1)) + ")"
+            await tx.execute(
+                f"INSERT INTO calls_archive ({', '.join(ARCHIVE_COLUMNS)}, transcription_z) "
+                f"VALUES {', '.join([row_placeholders] * len(rows))}",
+                values
+            )
+
+            # call_sid rather than id: ids can differ between the external database and its local mirror
+            call_sids = [row["call_sid"] for row in rows]
+            in_calls = f"call_sid IN ({', '.join(['%s'] * len(call_sids))})"
+            # New child rows wait on the locked calls, so none can slip in between the copy and the delete
+            for table, columns in CHILD_TABLES.items():
+                await tx.execute(
+                    f"INSERT INTO {table}_archive ({', '.join(columns)}) "
+                    f"SELECT {', '.join(columns)} FROM {table} WHERE {in_calls}",
+                    call_sids
+                )
+                await tx.execute(f"DELETE FROM {table} WHERE {in_calls}", call_sids)
+            await tx.execute(
+                f"DELETE FROM calls WHERE call_sid IN ({', '.join(['%s'] * len(call_sids))})",
+                call_sids
+            )
+            return len(rows)
+
+    async def run(self, cutoff: datetime = None, max_batches: int = None) -> Dict[str, Any]:
+        """
+        Archive every eligible call, batch by batch
+
+        Args:
+            cutoff: Archive calls that started before this (defaults to now - CALL_ARCHIVE_AFTER_DAYS)
+            max_batches: Stop after this many batches
+
+        Returns:
+            Summary with the number of calls moved
+        """
+        cutoff = cutoff or self.cutoff()
+        moved = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            count = await self.archive_batch(cutoff)
+            if not count:
+                break
+            moved += count
+            batches += 1
+            # Give live traffic a turn between batches
+            await asyncio.sleep(0)
+
+        if moved:
+            logger.info(f"Archived {moved} calls that started before {cutoff.isoformat()}")
+        return {"archived": moved, "batches": batches, "cutoff": cutoff.isoformat()}
+
+    def start(self, interval: float = None) -> None:
+        """Run the archiver in the background every interval seconds (CALL_ARCHIVE_INTERVAL)"""
+        if self._task:
+            return
+        self._task = asyncio.get_running_loop().create_task(
+            self._run_periodically(interval if interval is not None else settings.call_archive_interval)
+        )
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def _run_periodically(self, interval: float) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Call archival failed: {e}")
+            await asyncio.sleep(interval)
+
+
+call_archiver = CallArchiver()
+
+
+async def _main() -> None:
+    await db.connect(start_jobs=False)
+    try:
+        print(await call_archiver.run())
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    # One-off run, e.g. from cron: python -m app.services.call_archiver
+    asyncio.run(_main())
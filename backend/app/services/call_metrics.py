@@ -0,0 +1,296 @@
+# backend/app/services/call_metrics.py
+
+import asyncio
+import logging
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..config import settings
+from ..database import db
+
+logger = logging.getLogger(__name__)
+
+# Calls are added to the rollup once they reach one of these
+TERMINAL_STATUSES = ("completed", "busy", "failed", "no-answer", "canceled")
+
+_ADD_TO_ROLLUP = """
+    INSERT INTO call_metrics_daily (day, total_calls, total_duration, total_cost, total_ultravox_cost)
+    VALUES {rows}
+    ON DUPLICATE KEY UPDATE
+        total_calls = total_calls + VALUES(total_calls),
+        total_duration = total_duration + VALUES(total_duration),
+        total_cost = total_cost + VALUES(total_cost),
+        total_ultravox_cost = total_ultravox_cost + VALUES(total_ultravox_cost)
+"""
+
+_RESET_ROLLUP = """
+    INSERT INTO call_metrics_daily (day, total_calls, total_duration, total_cost, total_ultravox_cost, reconciled_at)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        total_calls = VALUES(total_calls),
+        total_duration = VALUES(total_duration),
+        total_cost = VALUES(total_cost),
+        total_ultravox_cost = VALUES(total_ultravox_cost),
+        reconciled_at = VALUES(reconciled_at)
+"""
+
+
+def _as_datetime(value: Any) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+class CallMetricsRollup:
+    """
+    Per-day call totals in call_metrics_daily.
+
+    Calls are added to their start day when they reach a terminal status:
+    the status callback path calls count_calls() for the calls it just
+    finished, and sweep() picks up any it missed. calls.rollup_counted is
+    set in the same transaction, so a call is never added twice. Days are
+    UTC days: calls store start_time in UTC, inbound and outbound alike.
+    Twilio prices arrive after the call ends, so reconcile() periodically
+    (off-peak, at CALL_METRICS_RECONCILE_HOUR UTC) resets recent days from
+    Twilio's own call log. Every worker runs the schedule, but each day is
+    claimed in the database first, so only one of them reconciles it.
+    Database.connect() starts the periodic sweep.
+    """
+
+    def __init__(self, database=db, batch_size: int = None):
+        self.database = database
+        self.batch_size = max(1, batch_size if batch_size is not None else settings.call_metrics_batch_size)
+        self._reconciled_on: Optional[date] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def count_calls(self, call_sids: Iterable[str] = None) -> int:
+        """
+        Add finished calls not counted yet to the rollup
+
+        Args:
+            call_sids: Only consider these calls (default: up to batch_size of any)
+
+        Returns:
+            Number of calls added
+        """
+        statuses = ", ".join(["%s"] * len(TERMINAL_STATUSES))
+        params: List[Any] = list(TERMINAL_STATUSES)
+        if call_sids is not None:
+            call_sids = list(call_sids)
+            if not call_sids:
+                return 0
+            sid_filter = f"AND call_sid IN ({', '.join(['%s'] * len(call_sids))})"
+            params.extend(call_sids)
+        else:
+            sid_filter = ""
+        params.append(self.batch_size if call_sids is None else len(call_sids))
+
+        async with self.database.transaction() as tx:
+            rows = await tx.execute(
+                f"""
+                SELECT call_sid, start_time, duration, cost, ultravox_cost
+                FROM calls
+                WHERE rollup_counted = FALSE AND status IN ({statuses}) {sid_filter}
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+                """,
+                params
+            )
+            if not rows:
+                return 0
+
+            # Keyed on call_sid rather than id, which can differ in the local mirror
+            counted = [row["call_sid"] for row in rows]
+            await tx.execute(
+                f"UPDATE calls SET rollup_counted = TRUE WHERE call_sid IN ({', '.join(['%s'] * len(counted))})",
+                counted
+            )
+
+            days: Dict[date, List[Any]] = defaultdict(lambda: [0, 0, Decimal(0), Decimal(0)])
+            for row in rows:
+                totals = days[_as_datetime(row["start_time"]).date()]
+                totals[0] += 1
+                totals[1] += int(row["duration"] or 0)
+                totals[2] += Decimal(str(row["cost"] or 0))
+                totals[3] += Decimal(str(row["ultravox_cost"] or 0))
+            values: List[Any] = []
+            for day, totals in days.items():
+                values.append(day)
+                values.extend(totals)
+            await tx.execute(
+                _ADD_TO_ROLLUP.format(rows=", ".join(["(%s, %s, %s, %s, %s)"] * len(days))),
+                values
+            )
+            return len(rows)
+
+    async def sweep(self) -> int:
+        """
+        Count every finished call not counted yet, batch by batch
+
+        Returns:
+            Number of calls added
+        """
+        added = 0
+        while True:
+            count = await self.count_calls()
+            if not count:
+                break
+            added += count
+            # Give live traffic a turn between batches
+            await asyncio.sleep(0)
+        if added:
+            logger.info(f"Added {added} calls to the daily call metrics")
+        return added
+
+    async def metrics(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """
+        Call totals and averages for the days from start_date to end_date, inclusive
+        """
+        row = await self.database.fetch_one(
+            """
+            SELECT COALESCE(SUM(total_calls), 0) AS total_calls,
+                   COALESCE(SUM(total_duration), 0) AS total_duration,
+                   COALESCE(SUM(total_cost), 0) AS total_cost,
+                   COALESCE(SUM(total_ultravox_cost), 0) AS total_ultravox_cost
+            FROM call_metrics_daily
+            WHERE day >= %s AND day <= %s
+            """,
+            (start_date.date(), end_date.date())
+        ) or {}
+        total_calls = int(row.get("total_calls") or 0)
+        total_duration = int(row.get("total_duration") or 0)
+        total_cost = float(row.get("total_cost") or 0)
+
+        return {
+            "total_calls": total_calls,
+            "total_duration": total_duration,
+            "total_cost": total_cost,
+            "total_ultravox_cost": float(row.get("total_ultravox_cost") or 0),
+            "average_duration": (total_duration / total_calls) if total_calls > 0 else 0.0,
+            "average_cost": (total_cost / total_calls) if total_calls > 0 else 0.0
+        }
+
+    async def reconcile(self, day: date) -> Dict[str, Any]:
+        """
+        Reset one day's totals from Twilio's call log
+
+        Count, duration and cost come from Twilio; Ultravox cost is summed
+        from the local calls and calls_archive tables. Every call of the day
+        is marked counted, since Twilio's figures already include it.
+
+        Returns:
+            The day's new totals
+        """
+        # Import twilio_service here to avoid circular imports
+        from .twilio_service import twilio_service
+
+        start = datetime.combine(day, datetime.min.time())
+        end = start + timedelta(days=1)
+        totals = await twilio_service.get_twilio_call_totals(start, end)
+
+        async with self.database.transaction() as tx:
+            ultravox = await tx.execute(
+                """
+                SELECT COALESCE(SUM(ultravox_cost), 0) AS total FROM (
+                    SELECT ultravox_cost FROM calls WHERE start_time >= %s AND start_time < %s
+                    UNION ALL
+                    SELECT ultravox_cost FROM calls_archive WHERE start_time >= %s AND start_time < %s
+                ) AS day_calls
+                """,
+                (start, end, start, end)
+            )
+            ultravox_cost = Decimal(str(ultravox[0]["total"] if ultravox else 0))
+            await tx.execute(
+                "UPDATE calls SET rollup_counted = TRUE "
+                "WHERE start_time >= %s AND start_time < %s AND rollup_counted = FALSE",
+                (start, end)
+            )
+            await tx.execute(_RESET_ROLLUP, (
+                day, totals["total_calls"], totals["total_duration"],
+                Decimal(str(totals["total_cost"])), ultravox_cost, datetime.utcnow()
+            ))
+
+        logger.info(f"Reconciled call metrics for {day.isoformat()} with Twilio: {totals['total_calls']} calls")
+        return {"day": day.isoformat(), **totals, "total_ultravox_cost": float(ultravox_cost)}
+
+    async def reconcile_recent(self, days: int = None) -> List[Dict[str, Any]]:
+        """
+        Reconcile the last days full UTC days (CALL_METRICS_RECONCILE_DAYS);
+        today is left alone since its calls are still coming in. Days another
+        worker already took today are skipped.
+        """
+        days = days if days is not None else settings.call_metrics_reconcile_days
+        today = datetime.utcnow().date()
+        results = []
+        for offset in range(1, days + 1):
+            day = today - timedelta(days=offset)
+            try:
+                if not await self._claim(day):
+                    continue
+                results.append(await self.reconcile(day))
+            except Exception as e:
+                logger.error(f"Reconciling call metrics for {day.isoformat()} failed: {e}")
+        return results
+
+    def start(self, interval: float = None) -> None:
+        """Sweep in the background every interval seconds (CALL_METRICS_SWEEP_INTERVAL) and reconcile once a day"""
+        if self._task:
+            return
+        self._task = asyncio.get_running_loop().create_task(
+            self._run_periodically(interval if interval is not None else settings.call_metrics_sweep_interval)
+        )
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def _run_periodically(self, interval: float) -> None:
+        while True:
+            try:
+                await self.sweep()
+                now = datetime.utcnow()
+                if now.hour == settings.call_metrics_reconcile_hour and self._reconciled_on != now.date():
+                    self._reconciled_on = now.date()
+                    await self.reconcile_recent()
+            except Exception as e:
+                logger.error(f"Call metrics rollup failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def _claim(self, day: date) -> bool:
+        # The first worker to move the day's claim into today reconciles it;
+        # one that dies doing so leaves the day to tomorrow's run
+        now = datetime.utcnow()
+        async with self.database.transaction() as tx:
+            await tx.execute("INSERT IGNORE INTO call_metrics_daily (day) VALUES (%s)", (day,))
+            await tx.execute(
+                """
+                UPDATE call_metrics_daily
+                SET reconcile_claimed_at = %s
+                WHERE day = %s AND (reconcile_claimed_at IS NULL OR reconcile_claimed_at < %s)
+                """,
+                (now, day, datetime.combine(now.date(), datetime.min.time()))
+            )
+            return tx.rowcount > 0
+
+
+call_metrics_rollup = CallMetricsRollup()
+
+
+async def _main(days: int = None) -> None:
+    await db.connect(start_jobs=False)
+    try:
+        print({"counted": await call_metrics_rollup.sweep()})
+        print(await call_metrics_rollup.reconcile_recent(days))
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    # Off-peak run, e.g. from cron: python -m app.services.call_metrics [days to reconcile]
+    asyncio.run(_main(int(sys.argv[1]) if len(sys.argv) > 1 else None))
@@ -0,0 +1,375 @@
+# backend/app/services/campaign_queue.py
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from ..database import db
+from .bulk_dialer import bulk_dialer
+
+logger = logging.getLogger(__name__)
+
+# Completions within this window set the dial rate the ETA is based on
+ETA_WINDOW = timedelta(minutes=5)
+
+TARGET_STATUSES = ("pending", "dialing", "dialed", "failed", "unknown")
+
+
+class CampaignQueue:
+    """
+    Bulk call campaigns persisted in call_campaigns / campaign_targets.
+
+    Workers (any number, in any process) lease batches of pending targets
+    with SELECT ... FOR UPDATE SKIP LOCKED, so no two workers ever take the
+    same target. Leased targets stay pending; each is marked dialing only
+    right before its own call is placed, and only while the campaign is
+    still active, so cancelling a campaign stops its leased targets too and
+    they are released. Every outcome is written back as the call completes.
+    A target is attempted at most once: if its worker dies mid-dial the
+    lease runs out and the one target in flight is marked unknown rather
+    than dialed again, since the call may already have been placed, while
+    the batch's undialed targets become leasable again. A Twilio timeout is
+    recorded as unknown for the same reason. While a batch is dialing its
+    lease is extended every lease_seconds / 3, so slow pacing never
+    outlasts it.
+
+    Database.connect() starts a worker in every app process, so active
+    campaigns resume after a restart; python -m app.services.campaign_queue
+    runs a dedicated one.
+    """
+
+    def __init__(self, database=db, dialer=None, batch_size: int = None, lease_seconds: float = None):
+        self.database = database
+        self.dialer = dialer or bulk_dialer
+        self.batch_size = max(1, batch_size if batch_size is not None else settings.campaign_batch_size)
+        self.lease_seconds = lease_seconds if lease_seconds is not None else settings.campaign_lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"[-64:]
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    async def create(self, phone_numbers: List[str], from_number: str, name: str = None,
+                     ultravox_url: str = None, prompt_id: str = None, created_by: str = None) -> Dict[str, Any]:
+        """
+        Store a campaign and its targets; workers start dialing it right away
+
+        Returns:
+            The campaign id and number of targets
+        """
+        campaign_id = uuid.uuid4().hex
+        async with self.database.transaction() as tx:
+            await tx.execute(
+                """
+                INSERT INTO call_campaigns (
+                    campaign_id, name, from_number, ultravox_url, prompt_id,
+                    status, total_targets, created_by, created_at
+                )
+                VALUES (%s, %s, %s, %s, %s, 'active', %s, %s, %s)
+                """,
+                (campaign_id, name, from_number, ultravox_url, prompt_id,
+                 len(phone_numbers), created_by, datetime.now())
+            )
+            chunk_size = 1000
+            for offset in range(0, len(phone_numbers), chunk_size):
+                chunk = phone_numbers[offset:offset + chunk_size]
+                values: List[Any] = []
+                for position, number in enumerate(chunk, start=offset):
+                    values.extend((campaign_id, position, number))
+                await tx.execute(
+                    "INSERT INTO campaign_targets (campaign_id, position, phone_number) VALUES "
+                    + ", ".join(["(%s, %s, %s)"] * len(chunk)),
+                    values
+                )
+
+        self._wakeup.set()
+        logger.info(f"Campaign {campaign_id} created with {len(phone_numbers)} targets")
+        return {"campaign_id": campaign_id, "total_targets": len(phone_numbers)}
+
+    async def lease(self, campaign: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Take up to batch_size pending, unleased targets of a campaign for this worker"""
+        now = datetime.now()
+        async with self.database.transaction() as tx:
+            rows = await tx.execute(
+                """
+                SELECT position, phone_number
+                FROM campaign_targets
+                WHERE campaign_id = %s AND status = 'pending'
+                  AND (lease_expires_at IS NULL OR lease_expires_at < %s)
+                ORDER BY position
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+                """,
+                (campaign["campaign_id"], now, self.batch_size)
+            )
+            if not rows:
+                return []
+            positions = [row["position"] for row in rows]
+            await tx.execute(
+                f"""
+                UPDATE campaign_targets
+                SET lease_owner = %s, lease_expires_at = %s
+                WHERE campaign_id = %s AND position IN ({', '.join(['%s'] * len(positions))})
+                """,
+                [self.worker_id, now + timedelta(seconds=self.lease_seconds), campaign["campaign_id"]] + positions
+            )
+            return rows
+
+    async def run_batch(self) -> int:
+        """
+        Lease and dial one batch from the oldest active campaign that has
+        pending targets
+
+        Returns:
+            Number of targets dialed or attempted
+        """
+        campaigns = await self.database.execute(
+            """
+            SELECT campaign_id, from_number, ultravox_url, prompt_id
+            FROM call_campaigns
+            WHERE status = 'active'
+            ORDER BY created_at
+            """
+        )
+        for campaign in campaigns:
+            targets = await self.lease(campaign)
+            if not targets:
+                await self._complete_if_done(campaign["campaign_id"])
+                continue
+
+            campaign_id = campaign["campaign_id"]
+
+            async def claim(index: int) -> bool:
+                return await self._claim(campaign_id, targets[index]["position"])
+
+            attempted = 0
+            renewer = asyncio.create_task(self._keep_leased(campaign_id))
+            try:
+                async for result in self.dialer.dial(
+                    [target["phone_number"] for target in targets],
+                    campaign["from_number"], campaign["ultravox_url"], campaign["prompt_id"],
+                    before_dial=claim
+                ):
+                    if result["status"] == "skipped":
+                        continue
+                    attempted += 1
+                    await self._record(campaign_id, targets[result["index"]]["position"], result)
+            finally:
+                renewer.cancel()
+                await asyncio.gather(renewer, return_exceptions=True)
+                await self._release(campaign_id)
+            await self._complete_if_done(campaign_id)
+            return attempted
+        return 0
+
+    async def expire_leases(self) -> int:
+        """
+        Mark targets whose lease ran out mid-dial as unknown
+
+        Returns:
+            Number of targets marked
+        """
+        now = datetime.now()
+        async with self.database.transaction() as tx:
+            await tx.execute(
+                """
+                UPDATE campaign_targets
+                SET status = 'unknown', completed_at = %s,
+                    error = 'Worker lost while dialing; the call may or may not have been placed'
+                WHERE status = 'dialing' AND lease_expires_at < %s
+                """,
+                (now, now)
+            )
+            return tx.rowcount
+
+    async def cancel(self, campaign_id: str) -> bool:
+        """
+        Stop dialing a campaign; calls already placed still finish, while
+        leased targets not yet dialed are skipped and released
+        """
+        async with self.database.transaction() as tx:
+            await tx.execute(
+                "UPDATE call_campaigns SET status = 'cancelled', completed_at = %s "
+                "WHERE campaign_id = %s AND status = 'active'",
+                (datetime.now(), campaign_id)
+            )
+            return tx.rowcount > 0
+
+    async def progress(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Target counts by status, recent dial rate and estimated time to finish
+
+        Returns:
+            None if there is no such campaign
+        """
+        campaign = await self.database.fetch_one(
+            """
+            SELECT campaign_id, name, from_number, status, total_targets, created_by, created_at, completed_at
+            FROM call_campaigns
+            WHERE campaign_id = %s
+            """,
+            (campaign_id,)
+        )
+        if not campaign:
+            return None
+
+        counts = {status: 0 for status in TARGET_STATUSES}
+        for row in await self.database.execute(
+            "SELECT status, COUNT(*) AS count FROM campaign_targets WHERE campaign_id = %s GROUP BY status",
+            (campaign_id,)
+        ):
+            counts[row["status"]] = int(row["count"])
+
+        recent = await self.database.fetch_one(
+            "SELECT COUNT(*) AS count FROM campaign_targets WHERE campaign_id = %s AND completed_at >= %s",
+            (campaign_id, datetime.now() - ETA_WINDOW)
+        )
+        calls_per_minute = int(recent["count"] if recent else 0) / (ETA_WINDOW.total_seconds() / 60)
+        remaining = counts["pending"] + counts["dialing"]
+        eta_seconds = None
+        if campaign["status"] == "active" and remaining and calls_per_minute:
+            eta_seconds = round(remaining / calls_per_minute * 60)
+
+        total = campaign["total_targets"] or sum(counts.values())
+        return {
+            **campaign,
+            "targets": counts,
+            "completed": total - remaining,
+            "percent_complete": round((total - remaining) * 100 / total, 1) if total else 100.0,
+            "calls_per_minute": round(calls_per_minute, 2),
+            "eta_seconds": eta_seconds,
+            "estimated_completion": (datetime.now() + timedelta(seconds=eta_seconds)).isoformat()
+            if eta_seconds is not None else None
+        }
+
+    def start(self, interval: float = None) -> None:
+        """Drain campaigns in the background, polling every interval seconds (CAMPAIGN_POLL_INTERVAL) when idle"""
+        if self._task:
+            return
+        self._task = asyncio.get_running_loop().create_task(
+            self._run_periodically(interval if interval is not None else settings.campaign_poll_interval)
+        )
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def _run_periodically(self, interval: float) -> None:
+        while True:
+            try:
+                if await self.run_batch():
+                    continue
+                await self.expire_leases()
+            except Exception as e:
+                logger.error(f"Campaign worker failed: {e}")
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _record(self, campaign_id: str, position: int, result: Dict[str, Any]) -> None:
+        # lease_owner guard: a target whose lease expired and was marked unknown
+        # still gets its real outcome from the worker that dialed it
+        await self.database.execute(
+            """
+            UPDATE campaign_targets
+            SET status = %s, call_sid = %s, error = %s, completed_at = %s
+            WHERE campaign_id = %s AND position = %s AND lease_owner = %s
+            """,
+            ({"success": "dialed", "unknown": "unknown"}.get(result["status"], "failed"), result.get("call_sid"),
+             result.get("error"), datetime.now(), campaign_id, position, self.worker_id)
+        )
+
+    async def _claim(self, campaign_id: str, position: int) -> bool:
+        # Mark one leased target dialing right before its call is placed, and
+        # only while the campaign is still active (cancel stops leased targets)
+        now = datetime.now()
+        async with self.database.transaction() as tx:
+            await tx.execute(
+                """
+                UPDATE campaign_targets
+                SET status = 'dialing', attempted_at = %s, lease_expires_at = %s
+                WHERE campaign_id = %s AND position = %s AND status = 'pending' AND lease_owner = %s
+                  AND EXISTS (
+                      SELECT 1 FROM call_campaigns
+                      WHERE campaign_id = %s AND status = 'active'
+                  )
+                """,
+                (now, now + timedelta(seconds=self.lease_seconds), campaign_id, position,
+                 self.worker_id, campaign_id)
+            )
+            return tx.rowcount > 0
+
+    async def _release(self, campaign_id: str) -> None:
+        # Hand back leased targets this worker never dialed (campaign cancelled,
+        # lease claim failed or worker stopping) so they can be leased again
+        try:
+            await self.database.execute(
+                """
+                UPDATE campaign_targets
+                SET lease_owner = NULL, lease_expires_at = NULL
+                WHERE campaign_id = %s AND status = 'pending' AND lease_owner = %s
+                """,
+                (campaign_id, self.worker_id)
+            )
+        except Exception as e:
+            logger.error(f"Releasing campaign {campaign_id} leases failed: {e}")
+
+    async def _keep_leased(self, campaign_id: str) -> None:
+        # Extend the lease on this worker's targets, waiting for or in their
+        # dial, well before it runs out, for as long as the batch is dialing
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self.database.execute(
+                    """
+                    UPDATE campaign_targets
+                    SET lease_expires_at = %s
+                    WHERE campaign_id = %s AND status IN ('pending', 'dialing') AND lease_owner = %s
+                    """,
+                    (datetime.now() + timedelta(seconds=self.lease_seconds), campaign_id, self.worker_id)
+                )
+            except Exception as e:
+                logger.error(f"Extending campaign {campaign_id} lease failed: {e}")
+
+    async def _complete_if_done(self, campaign_id: str) -> None:
+        await self.database.execute(
+            """
+            UPDATE call_campaigns
+            SET status = 'completed', completed_at = %s
+            WHERE campaign_id = %s AND status = 'active'
+              AND NOT EXISTS (
+                  SELECT 1 FROM campaign_targets
+                  WHERE campaign_id = %s AND status IN ('pending', 'dialing')
+              )
+            """,
+            (datetime.now(), campaign_id, campaign_id)
+        )
+
+
+campaign_queue = CampaignQueue()
+
+
+async def _main() -> None:
+    await db.connect(start_jobs=False)
+    campaign_queue.start()
+    try:
+        # Runs until interrupted
+        await asyncio.Event().wait()
+    finally:
+        await campaign_queue.stop()
+        await db.close()
+
+
+if __name__ == "__main__":
+    # Dedicated campaign worker: python -m app.services.campaign_queue
+    asyncio.run(_main())
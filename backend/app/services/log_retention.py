@@ -0,0 +1,202 @@
+# backend/app/services/log_retention.py
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from ..database import db
+
+logger = logging.getLogger(__name__)
+
+# Column each table's retention is measured on
+RETENTION_COLUMNS = {
+    "error_logs": "timestamp",
+    "system_monitor_logs": "timestamp",
+    "system_monitor_hourly": "hour",
+}
+
+# Aggregates written to system_monitor_hourly for one hour of raw samples.
+# Averages are merged weighted by sample count, so an hour may be folded in
+# more than once (e.g. samples that arrived late) without skewing it.
+_HOURLY_ROLLUP = """
+    INSERT INTO system_monitor_hourly (
+        hour, samples,
+        avg_cpu_usage, max_cpu_usage, avg_memory_usage, max_memory_usage,
+        avg_disk_usage, max_disk_usage, avg_network_usage, max_network_usage,
+        avg_active_calls, max_active_calls, min_call_capacity
+    )
+    SELECT %s, COUNT(*),
+        AVG(cpu_usage), MAX(cpu_usage), AVG(memory_usage), MAX(memory_usage),
+        AVG(disk_usage), MAX(disk_usage), AVG(network_usage), MAX(network_usage),
+        AVG(active_calls), MAX(active_calls), MIN(call_capacity)
+    FROM system_monitor_logs
+    WHERE timestamp >= %s AND timestamp < %s
+    HAVING COUNT(*) > 0
+    ON DUPLICATE KEY UPDATE
+        avg_cpu_usage = (avg_cpu_usage * samples + VALUES(avg_cpu_usage) * VALUES(samples)) / (samples + VALUES(samples)),
+        max_cpu_usage = GREATEST(max_cpu_usage, VALUES(max_cpu_usage)),
+        avg_memory_usage = (avg_memory_usage * samples + VALUES(avg_memory_usage) * VALUES(samples)) / (samples + VALUES(samples)),
+        max_memory_usage = GREATEST(max_memory_usage, VALUES(max_memory_usage)),
+        avg_disk_usage = (avg_disk_usage * samples + VALUES(avg_disk_usage) * VALUES(samples)) / (samples + VALUES(samples)),
+        max_disk_usage = GREATEST(max_disk_usage, VALUES(max_disk_usage)),
+        avg_network_usage = (avg_network_usage * samples + VALUES(avg_network_usage) * VALUES(samples)) / (samples + VALUES(samples)),
+        max_network_usage = GREATEST(max_network_usage, VALUES(max_network_usage)),
+        avg_active_calls = (avg_active_calls * samples + VALUES(avg_active_calls) * VALUES(samples)) / (samples + VALUES(samples)),
+        max_active_calls = GREATEST(max_active_calls, VALUES(max_active_calls)),
+        min_call_capacity = LEAST(min_call_capacity, VALUES(min_call_capacity)),
+        -- Assignments run left to right, so the count is updated last
+        samples = samples + VALUES(samples)
+"""
+
+
+class LogRetention:
+    """
+    Enforces retention on the append-only log tables.
+
+    Expired rows are deleted oldest first in batches of batch_size, each in
+    its own short transaction, walking the timestamp index so no batch scans
+    or locks more than it deletes. System monitor samples past their raw
+    retention are first folded into system_monitor_hourly, one hour per
+    transaction, and the hourly rows have a retention of their own.
+
+    Deletes select rows by timestamp rather than by id, so they apply the same
+    way to the local mirror, whose ids can differ.
+
+    Database.connect() starts it every RETENTION_INTERVAL seconds;
+    python -m app.services.log_retention runs it once.
+    """
+
+    def __init__(self, database=db, retention_days: Dict[str, int] = None,
+                 monitor_raw_days: int = None, batch_size: int = None):
+        self.database = database
+        # table -> days to keep (0 keeps rows forever)
+        self.retention_days: Dict[str, int] = {
+            "error_logs": settings.error_log_retention_days,
+            "system_monitor_hourly": settings.system_monitor_hourly_retention_days,
+        }
+        self.retention_days.update(retention_days or {})
+        self.monitor_raw_days = monitor_raw_days if monitor_raw_days is not None else settings.system_monitor_raw_retention_days
+        self.batch_size = max(1, batch_size if batch_size is not None else settings.retention_batch_size)
+        self._task: Optional[asyncio.Task] = None
+
+    async def purge(self, table: str, column: str, cutoff: datetime, max_batches: int = None) -> int:
+        """
+        Delete rows of table whose column is older than cutoff, batch by batch
+
+        Returns:
+            Number of rows deleted
+        """
+        deleted = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            async with self.database.transaction() as tx:
+                await tx.execute(
+                    f"DELETE FROM {table} WHERE {column} < %s ORDER BY {column} LIMIT %s",
+                    (cutoff, self.batch_size)
+                )
+                count = tx.rowcount
+            deleted += count
+            batches += 1
+            if count < self.batch_size:
+                break
+            # Give live traffic a turn between batches
+            await asyncio.sleep(0)
+        return deleted
+
+    async def downsample_monitor_logs(self, cutoff: datetime) -> Dict[str, int]:
+        """
+        Fold system monitor samples taken before cutoff into hourly aggregates
+
+        Only whole hours are folded; samples from the hour cutoff falls in
+        stay raw until the next run.
+
+        Returns:
+            Number of hours written and raw samples removed
+        """
+        cutoff = cutoff.replace(minute=0, second=0, microsecond=0)
+        hours = 0
+        removed = 0
+        while True:
+            row = await self.database.fetch_one(
+                "SELECT timestamp FROM system_monitor_logs WHERE timestamp < %s ORDER BY timestamp LIMIT 1",
+                (cutoff,)
+            )
+            if not row:
+                break
+            hour = row["timestamp"].replace(minute=0, second=0, microsecond=0)
+            next_hour = hour + timedelta(hours=1)
+
+            async with self.database.transaction() as tx:
+                await tx.execute(_HOURLY_ROLLUP, (hour, hour, next_hour))
+                await tx.execute(
+                    "DELETE FROM system_monitor_logs WHERE timestamp >= %s AND timestamp < %s",
+                    (hour, next_hour)
+                )
+                removed += tx.rowcount
+            hours += 1
+            await asyncio.sleep(0)
+        return {"hours": hours, "samples": removed}
+
+    async def run(self, now: datetime = None) -> Dict[str, Any]:
+        """
+        Apply every retention policy once
+
+        Returns:
+            Rows removed per table
+        """
+        now = now or datetime.now()
+        summary: Dict[str, Any] = {}
+
+        if self.monitor_raw_days > 0:
+            summary["system_monitor_logs"] = await self.downsample_monitor_logs(
+                now - timedelta(days=self.monitor_raw_days)
+            )
+        for table, keep_days in self.retention_days.items():
+            if keep_days > 0:
+                summary[table] = await self.purge(table, RETENTION_COLUMNS[table], now - timedelta(days=keep_days))
+
+        logger.info(f"Log retention finished: {summary}")
+        return summary
+
+    def start(self, interval: float = None) -> None:
+        """Run retention in the background every interval seconds (RETENTION_INTERVAL)"""
+        if self._task:
+            return
+        self._task = asyncio.get_running_loop().create_task(
+            self._run_periodically(interval if interval is not None else settings.retention_interval)
+        )
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    async def _run_periodically(self, interval: float) -> None:
+        while True:
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Log retention failed: {e}")
+            await asyncio.sleep(interval)
+
+
+log_retention = LogRetention()
+
+
+async def _main() -> None:
+    await db.connect(start_jobs=False)
+    try:
+        print(await log_retention.run())
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    # One-off run, e.g. from cron: python -m app.services.log_retention
+    asyncio.run(_main())
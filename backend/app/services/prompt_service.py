@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +32,22 @@ class PromptService:
         # Custom system prompts can be stored and retrieved from the database
         self.custom_prompts = {}
         
+        # Called whenever the prompts change (e.g. to drop rendered TwiML)
+        self._listeners: List[Callable[[], None]] = []
+        
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Register a callback to run whenever prompts are loaded or saved
+        """
+        self._listeners.append(listener)
+        
+    def _notify_changed(self) -> None:
+        for listener in self._listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Prompt change listener failed: {e}")
+        
     def get_system_prompt(self, call_type: str, custom_id: Optional[str] = None) -> str:
         """
         Get the appropriate system prompt for the call type
@@ -59,6 +75,7 @@ class PromptService:
             
             for row in results:
                 self.custom_prompts[row['id']] = row['content']
+            self._notify_changed()
                 
             logger.info(f"Loaded {len(results)} custom prompts from database")
         except Exception as e:
@@ -82,6 +99,7 @@ class PromptService:
             
             # Add to memory cache
             self.custom_prompts[str(prompt_id)] = content
+            self._notify_changed()
             
             return prompt_id
         except Exception as e:
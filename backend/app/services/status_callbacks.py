@@ -0,0 +1,205 @@
+# backend/app/services/status_callbacks.py
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..config import settings
+from ..database import db
+from ..monitoring.metrics import metrics_collector
+from .call_metrics import TERMINAL_STATUSES, call_metrics_rollup
+
+logger = logging.getLogger(__name__)
+
+# Progress of a call through Twilio's call statuses. A status never replaces
+# one ranked higher, so late or reordered callbacks cannot move a call back;
+# terminal statuses share the top rank. Unknown statuses rank 0.
+STATUS_RANKS = {
+    "queued": 1,
+    "initiated": 2,
+    "ringing": 3,
+    "in-progress": 4,
+    "answered": 4,
+    "completed": 5,
+    "busy": 5,
+    "failed": 5,
+    "no-answer": 5,
+    "canceled": 5,
+}
+
+# Rank of the status currently stored in calls, for the regression guard
+_STORED_RANK = "CASE status " + " ".join(
+    f"WHEN '{status}' THEN {rank}" for status, rank in STATUS_RANKS.items()
+) + " ELSE 0 END"
+
+
+class StatusCallbackBuffer:
+    """
+    Coalesces Twilio status callbacks and writes them in batches.
+
+    Callbacks are acknowledged as soon as they are queued. Events for the
+    same CallSid collapse into the furthest one seen (by status rank, then
+    Twilio's SequenceNumber), and every flush_interval seconds, or sooner
+    once batch_size calls are waiting, all of them are applied with a single
+    UPDATE per batch. The UPDATE also refuses to move a stored status back,
+    so ordering across flushes and workers is safe too. Events still
+    waiting when the process dies are lost; a failed flush is retried.
+    """
+
+    def __init__(self, database=db, flush_interval: float = None, batch_size: int = None):
+        self.database = database
+        self.flush_interval = flush_interval if flush_interval is not None else settings.status_callback_flush_interval
+        self.batch_size = max(1, batch_size if batch_size is not None else settings.status_callback_batch_size)
+
+        # call_sid -> latest event
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, data: Dict[str, Any]) -> bool:
+        """
+        Queue one status callback (Twilio's form fields)
+
+        Returns:
+            False if the callback was not usable (no CallSid or CallStatus)
+        """
+        call_sid = data.get("CallSid")
+        status = data.get("CallStatus")
+        if not call_sid or not status:
+            logger.warning(f"Ignoring status callback without CallSid or CallStatus: {data}")
+            return False
+
+        duration = data.get("CallDuration")
+        event = {
+            "status": status,
+            "rank": STATUS_RANKS.get(status, 0),
+            "sequence": int(data.get("SequenceNumber") or 0),
+            "duration": int(duration) if duration not in (None, "") else None,
+            # As before: end_time is only set when the call completes
+            "end_time": datetime.utcnow() if status == "completed" else None,
+        }
+        coalesced = self._merge(call_sid, event)
+        metrics_collector.record_status_callback("coalesced" if coalesced else "queued")
+        metrics_collector.set_status_callbacks_pending(len(self._pending))
+
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+        self.start()
+        return True
+
+    async def flush(self) -> int:
+        """
+        Write every queued event
+
+        Returns:
+            Number of calls written
+        """
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        items = list(batch.items())
+        try:
+            for offset in range(0, len(items), self.batch_size):
+                chunk = items[offset:offset + self.batch_size]
+                await self._apply(chunk)
+                await self._count_finished(chunk)
+        except Exception:
+            # Put them back under anything that arrived meanwhile and retry on the next flush
+            for call_sid, event in items:
+                self._merge(call_sid, event)
+            raise
+        finally:
+            metrics_collector.set_status_callbacks_pending(len(self._pending))
+        return len(items)
+
+    def start(self) -> None:
+        """Start the background flusher (done automatically by submit())"""
+        if self._task:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run_periodically())
+
+    async def stop(self) -> None:
+        """Stop the flusher, writing whatever is still queued"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run_periodically(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Writing status callbacks failed, will retry: {e}")
+                await asyncio.sleep(self.flush_interval)
+
+    def _merge(self, call_sid: str, event: Dict[str, Any]) -> bool:
+        current = self._pending.get(call_sid)
+        if current is None:
+            self._pending[call_sid] = event
+            return False
+        if (event["rank"], event["sequence"]) >= (current["rank"], current["sequence"]):
+            newer, older = event, current
+        else:
+            newer, older = current, event
+        self._pending[call_sid] = {
+            **newer,
+            "duration": newer["duration"] if newer["duration"] is not None else older["duration"],
+            "end_time": newer["end_time"] if newer["end_time"] is not None else older["end_time"],
+        }
+        return True
+
+    async def _count_finished(self, items: List) -> None:
+        finished = [call_sid for call_sid, event in items if event["status"] in TERMINAL_STATUSES]
+        if not finished:
+            return
+        try:
+            await call_metrics_rollup.count_calls(finished)
+        except Exception as e:
+            # Not retried here: the rollup sweep counts them later
+            logger.error(f"Adding finished calls to the daily call metrics failed: {e}")
+
+    async def _apply(self, items: List) -> None:
+        assignments = []
+        params: List[Any] = []
+
+        # MySQL assigns left to right, so status (whose guard reads the stored
+        # status) goes last; NULL keeps the stored duration / end_time
+        for column in ("duration", "end_time"):
+            known = [(call_sid, event[column]) for call_sid, event in items if event[column] is not None]
+            if known:
+                assignments.append(
+                    f"{column} = COALESCE(CASE call_sid {' '.join(['WHEN %s THEN %s'] * len(known))} END, {column})"
+                )
+                for call_sid, value in known:
+                    params.extend((call_sid, value))
+
+        assignments.append(
+            f"status = CASE {' '.join([f'WHEN call_sid = %s AND {_STORED_RANK} <= %s THEN %s'] * len(items))} "
+            "ELSE status END"
+        )
+        for call_sid, event in items:
+            params.extend((call_sid, event["rank"], event["status"]))
+
+        params.extend(call_sid for call_sid, _ in items)
+        # Keyed on call_sid rather than id, which can differ in the local mirror
+        await self.database.execute(
+            f"UPDATE calls SET {', '.join(assignments)} "
+            f"WHERE call_sid IN ({', '.join(['%s'] * len(items))})",
+            params
+        )
+        metrics_collector.record_status_callback_flush(len(items))
+        logger.debug(f"Applied status callbacks for {len(items)} calls")
+
+
+status_callbacks = StatusCallbackBuffer()
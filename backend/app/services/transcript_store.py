@@ -0,0 +1,144 @@
+# backend/app/services/transcript_store.py
+
+import asyncio
+import json
+import logging
+import sys
+from typing import Any, Dict, List, Optional
+
+from ..database import db
+from ..persistence.codec import compress_text, decompress_text
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 200
+
+
+def decode_transcription(row: Dict[str, Any], column: str = "transcription") -> Optional[str]:
+    """
+    Transcript text for a row that was selected with both the plain and the
+    compressed column (<column>_z); the compressed one wins when present.
+    Removes the compressed column from the row.
+    """
+    blob = row.pop(f"{column}_z", None)
+    if blob is not None:
+        return decompress_text(blob)
+    return row.get(column)
+
+
+class TranscriptStore:
+    """
+    Reads and writes call transcripts in their compressed columns.
+
+    Transcripts are compressed once on write and kept compressed in MySQL;
+    they are only decompressed by the endpoint that returns or analyses them.
+    """
+
+    def __init__(self, database=db):
+        self.database = database
+
+    async def save_call_transcription(self, call_sid: str, text: Optional[str]) -> None:
+        """Store the plain-text transcription of a call"""
+        await self.database.execute(
+            "UPDATE calls SET transcription_z = %s, transcription = NULL WHERE call_sid = %s",
+            (compress_text(text), call_sid)
+        )
+
+    async def get_call_transcription(self, call_sid: str) -> Optional[str]:
+        row = await self.database.fetch_one(
+            "SELECT transcription, transcription_z FROM calls WHERE call_sid = %s",
+            (call_sid,)
+        )
+        return decode_transcription(row) if row else None
+
+    async def save_transcript_messages(self, call_sid: str, messages: List[Dict[str, Any]]) -> None:
+        """Store the message-by-message transcript of a call in call_transcriptions"""
+        blob = compress_text(json.dumps(messages))
+        await self.database.execute(
+            """
+            INSERT INTO call_transcriptions (call_sid, transcription, transcription_z)
+            VALUES (%s, NULL, %s)
+            ON DUPLICATE KEY UPDATE transcription = NULL, transcription_z = VALUES(transcription_z)
+            """,
+            (call_sid, blob)
+        )
+
+    async def get_transcript_messages(self, call_sid: str) -> Optional[List[Dict[str, Any]]]:
+        row = await self.database.fetch_one(
+            "SELECT transcription, transcription_z FROM call_transcriptions WHERE call_sid = %s",
+            (call_sid,)
+        )
+        if not row:
+            return None
+        text = decode_transcription(row)
+        return json.loads(text) if text else None
+
+    async def backfill(self, batch_size: int = BACKFILL_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Compress transcripts still stored in the plain columns, batch by batch
+
+        Safe to run while the application is live and to interrupt: rows that
+        were given a compressed transcript in the meantime are left alone.
+
+        Returns:
+            Number of rows converted per table
+        """
+        return {
+            "calls": await self._backfill_table("calls", batch_size),
+            "call_transcriptions": await self._backfill_table("call_transcriptions", batch_size)
+        }
+
+    async def _backfill_table(self, table: str, batch_size: int) -> int:
+        converted = 0
+        last_id = 0
+        while True:
+            rows = await self.database.execute(
+                f"""
+                SELECT id, call_sid, transcription FROM {table}
+                WHERE id > %s AND transcription IS NOT NULL AND transcription_z IS NULL
+                ORDER BY id
+                LIMIT %s
+                """,
+                (last_id, batch_size)
+            )
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+
+            # Keyed by call_sid, which (unlike id) is the same in the external database and its local mirror
+            updates = []
+            for row in rows:
+                text = row["transcription"]
+                if isinstance(text, bytes):
+                    text = text.decode("utf-8")
+                updates.append((compress_text(text), row["call_sid"]))
+            converted += await self.database.execute_many(
+                f"""
+                UPDATE {table} SET transcription_z = %s, transcription = NULL
+                WHERE call_sid = %s AND transcription_z IS NULL
+                """,
+                updates,
+                chunk_size=batch_size
+            )
+            logger.info(f"Compressed {converted} transcripts in {table} so far")
+            await asyncio.sleep(0)
+        return converted
+
+
+transcript_store = TranscriptStore()
+
+
+async def _main(args: List[str]) -> None:
+    if args[:1] != ["backfill"]:
+        print("usage: python -m app.services.transcript_store backfill [batch_size]")
+        return
+    batch_size = int(args[1]) if len(args) > 1 else BACKFILL_BATCH_SIZE
+    await db.connect(start_jobs=False)
+    try:
+        print(await transcript_store.backfill(batch_size))
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1:]))
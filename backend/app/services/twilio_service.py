@@ -2,15 +2,28 @@
 
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException
+from twilio.http.http_client import TwilioHttpClient
+from twilio.request_validator import RequestValidator
 from twilio.twiml.voice_response import VoiceResponse, Connect, Stream
-from typing import Optional, Dict, List
+from requests.adapters import HTTPAdapter
+from typing import Any, Callable, Optional, Dict, List
+import asyncio
+import functools
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from ..config import settings
 from ..database import db
+from ..monitoring.metrics import metrics_collector
+from .call_metrics import TERMINAL_STATUSES
+from .twiml_templates import twiml_templates
 
 logger = logging.getLogger(__name__)
 
+# Calls per request when paging through Twilio's call log (Twilio's maximum)
+CALL_LOG_PAGE_SIZE = 1000
+
 class TwilioService:
     def __init__(self):
         self.account_sid = settings.twilio_account_sid  # or settings.TWILIO_ACCOUNT_SID
@@ -23,12 +36,57 @@ class TwilioService:
             self.credentials_valid = False
         else:
             self.credentials_valid = True
-            self.client = Client(self.account_sid, self.auth_token)
+            # One pooled session shared by all Twilio threads keeps HTTPS
+            # connections alive between requests
+            self.http_client = TwilioHttpClient(pool_connections=True, timeout=settings.twilio_request_timeout)
+            self.http_client.session.mount(
+                "https://", HTTPAdapter(pool_connections=1, pool_maxsize=max(1, settings.twilio_workers))
+            )
+            self.client = Client(self.account_sid, self.auth_token, http_client=self.http_client)
+            self.validator = RequestValidator(self.auth_token)
+
+        # The Twilio client is blocking; its requests run on these threads so
+        # a slow dial never holds up the event loop (and with it webhooks)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.twilio_workers),
+            thread_name_prefix="twilio"
+        )
+        self._in_flight = 0
 
         # Build callback URLs
         self.webhook_url = f"https://{settings.server_domain}/api/calls/incoming-call"
         self.status_callback = f"https://{settings.server_domain}/api/calls/status"
 
+    async def _run(self, operation: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking Twilio client call on the Twilio threads
+        
+        Args:
+            operation: Label for metrics (create_call, fetch_call, ...)
+            func: Twilio client method to call
+            
+        Raises:
+            asyncio.TimeoutError: No result within TWILIO_CALL_TIMEOUT seconds
+        """
+        self._in_flight += 1
+        metrics_collector.set_twilio_in_flight(self._in_flight)
+        started = time.monotonic()
+        outcome = "error"
+        try:
+            result = await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(func, *args, **kwargs)),
+                timeout=settings.twilio_call_timeout
+            )
+            outcome = "success"
+            return result
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise asyncio.TimeoutError(f"Twilio {operation} timed out after {settings.twilio_call_timeout}s") from None
+        finally:
+            self._in_flight -= 1
+            metrics_collector.set_twilio_in_flight(self._in_flight)
+            metrics_collector.record_twilio_request(operation, outcome, time.monotonic() - started)
+
     async def make_call(self, to_number: str, from_number: str, ultravox_url: str = None, prompt_id: str = None) -> Dict:
         """
         Initiate a call using Twilio with optional Ultravox integration.
@@ -54,12 +112,6 @@ class TwilioService:
             logger.error(error_msg)
             raise Exception(error_msg)
         
-        # Import prompt_service here to avoid circular imports
-        from ..services.prompt_service import prompt_service
-        
-        # Get the appropriate system prompt for outbound calls
-        system_prompt = prompt_service.get_system_prompt('outbound', prompt_id)
-        
         try:
             # If no Ultravox URL is provided, use the default WebSocket URL
             if not ultravox_url and settings.server_domain:
@@ -67,23 +119,15 @@ class TwilioService:
                 logger.info(f"Using default Ultravox URL: {ultravox_url}")
             
             if ultravox_url:
-                # TwiML with <Connect><Stream> for Ultravox
-                twiml = VoiceResponse()
-                connect = Connect()
-                stream = Stream(url=ultravox_url)
-                
-                # Pass parameters to the stream
-                stream.parameter(name="callSid", value="{{CallSid}}")
-                stream.parameter(name="direction", value="outbound")
-                stream.parameter(name="systemPrompt", value=system_prompt)
-                
-                connect.append(stream)
-                twiml.append(connect)
-
-                call = self.client.calls.create(
+                # TwiML with <Connect><Stream> for Ultravox, rendered once per prompt and URL
+                twiml = twiml_templates.render('outbound', ultravox_url, prompt_id)
+
+                call = await self._run(
+                    "create_call",
+                    self.client.calls.create,
                     to=to_number,
                     from_=from_number,
-                    twiml=str(twiml),
+                    twiml=twiml,
                     status_callback=self.status_callback,
                     status_callback_event=['initiated', 'ringing', 'answered', 'completed'],
                     record=True
@@ -92,7 +136,9 @@ class TwilioService:
 
             else:
                 # Standard Twilio call (hits your incoming-call endpoint)
-                call = self.client.calls.create(
+                call = await self._run(
+                    "create_call",
+                    self.client.calls.create,
                     to=to_number,
                     from_=from_number,
                     url=self.webhook_url,
@@ -126,9 +172,10 @@ class TwilioService:
                 "call_status": call.status
             }
 
-        except TwilioRestException as e:
+        except (TwilioRestException, asyncio.TimeoutError) as e:
             logger.error(f"Twilio error: {str(e)}")
-            raise Exception(f"Failed to initiate call: {str(e)}")
+            # Chained so callers can tell a timeout (the call may exist) from a refusal
+            raise Exception(f"Failed to initiate call: {str(e)}") from e
 
     async def bulk_calls(self, numbers: List[str], from_number: str) -> List[Dict]:
         """
@@ -144,21 +191,12 @@ class TwilioService:
                 "error": error_msg
             } for number in numbers]
             
-        results = []
-        for number in numbers:
-            try:
-                result = await self.make_call(number, from_number)
-                results.append({
-                    "number": number,
-                    "status": "success",
-                    "call_sid": result["call_sid"]
-                })
-            except Exception as e:
-                results.append({
-                    "number": number,
-                    "status": "failed",
-                    "error": str(e)
-                })
+        # Import bulk_dialer here to avoid circular imports
+        from ..services.bulk_dialer import BulkDialer
+
+        # Dialed concurrently, paced by the available call capacity
+        results = [result async for result in BulkDialer(twilio=self).dial(numbers, from_number)]
+        results.sort(key=lambda result: result.pop("index"))
         return results
 
     async def get_call_details(self, call_sid: str) -> Dict:
@@ -177,8 +215,10 @@ class TwilioService:
             raise Exception(error_msg)
             
         try:
-            call = self.client.calls(call_sid).fetch()
-            recordings = self.client.recordings.list(call_sid=call_sid)
+            call, recordings = await asyncio.gather(
+                self._run("fetch_call", self.client.calls(call_sid).fetch),
+                self._run("list_recordings", self.client.recordings.list, call_sid=call_sid)
+            )
 
             cost = 0.0
             if call.price:
@@ -205,7 +245,7 @@ class TwilioService:
             }
             return details
 
-        except TwilioRestException as e:
+        except (TwilioRestException, asyncio.TimeoutError) as e:
             logger.error(f"Error fetching call details: {str(e)}")
             raise Exception(f"Failed to fetch call details: {str(e)}")
 
@@ -220,71 +260,103 @@ class TwilioService:
         response.append(connect)
         return str(response)
 
-    async def handle_status_callback(self, data: Dict) -> None:
+    def validate_request(self, url: str, params: Dict, signature: str) -> bool:
         """
-        Handle Twilio status callback events (e.g. initiated, ringing, answered, completed).
-        """
-        try:
-            call_sid = data.get('CallSid')
-            status = data.get('CallStatus')
-            duration = data.get('CallDuration')
+        Check that a webhook request really comes from Twilio
 
-            query = """
-                UPDATE calls
-                SET status = %s,
-                    duration = %s,
-                    end_time = %s
-                WHERE call_sid = %s
-            """
-            # If status is 'completed', set end_time to now
-            end_time = datetime.utcnow() if status == 'completed' else None
+        Args:
+            url: Full URL Twilio requested, including the query string
+            params: POSTed form fields
+            signature: The X-Twilio-Signature header
 
-            values = (status, duration, end_time, call_sid)
-            await db.execute(query, values)
+        Returns:
+            False for a missing or wrong signature, or without valid credentials
+        """
+        if not self.credentials_valid or not signature:
+            return False
+        return self.validator.validate(url, params, signature)
 
-            logger.info(f"Updated call status for {call_sid} => {status}")
+    async def handle_status_callback(self, data: Dict) -> None:
+        """
+        Handle Twilio status callback events (e.g. initiated, ringing, answered, completed).
 
-        except Exception as e:
-            logger.error(f"Error handling status callback: {str(e)}")
-            raise Exception(f"Failed to handle status callback: {str(e)}")
+        Events are queued and written in coalesced batches (see
+        services/status_callbacks.py), so this returns without touching the
+        database.
+        """
+        from ..services.status_callbacks import status_callbacks
+
+        if status_callbacks.submit(data):
+            logger.debug(f"Queued status callback for {data.get('CallSid')} => {data.get('CallStatus')}")
 
     async def get_call_recording(self, call_sid: str) -> Optional[str]:
         """
         Return the first recording URL for a call, if any.
         """
         try:
-            recordings = self.client.recordings.list(call_sid=call_sid)
+            recordings = await self._run("list_recordings", self.client.recordings.list, call_sid=call_sid)
             if recordings:
                 return recordings[0].url
             return None
-        except TwilioRestException as e:
+        except (TwilioRestException, asyncio.TimeoutError) as e:
             logger.error(f"Error fetching recording: {str(e)}")
             return None
 
     async def get_call_metrics(self, start_date: datetime, end_date: datetime) -> Dict:
         """
         Return aggregated call metrics (count, duration, cost, etc.) over a date range.
+
+        Served from the daily rollups in call_metrics_daily (see
+        services/call_metrics.py), so the range is rounded out to whole days.
+        """
+        # Import call_metrics here to avoid circular imports
+        from ..services.call_metrics import call_metrics_rollup
+
+        try:
+            return await call_metrics_rollup.metrics(start_date, end_date)
+        except Exception as e:
+            logger.error(f"Error fetching call metrics: {str(e)}")
+            raise Exception(f"Failed to fetch call metrics: {str(e)}")
+
+    async def get_twilio_call_totals(self, start_date: datetime, end_date: datetime) -> Dict:
+        """
+        Count, duration and cost of the calls Twilio has on record for a range.
+
+        Pages through Twilio's whole call log for the range, one request
+        (and one TWILIO_CALL_TIMEOUT) per page of CALL_LOG_PAGE_SIZE calls;
+        the call metrics reconciliation uses this off-peak, everything else
+        should use get_call_metrics(). Like the local rollup, only parent
+        calls that reached a terminal status are counted: child legs (dialed
+        or forwarded from a call) and calls still in progress are not.
         """
+
+        if not self.credentials_valid:
+            error_msg = "Cannot list calls: Twilio credentials are missing or invalid"
+            logger.error(error_msg)
+            raise Exception(error_msg)
+
+        totals = {"total_calls": 0, "total_duration": 0, "total_cost": 0.0}
         try:
-            calls = self.client.calls.list(
+            page = await self._run(
+                "list_calls",
+                self.client.calls.page,
                 start_time_after=start_date,
-                start_time_before=end_date
+                start_time_before=end_date,
+                page_size=CALL_LOG_PAGE_SIZE
             )
-            total_calls = len(calls)
-            total_duration = sum(int(call.duration or 0) for call in calls)
-            total_cost = sum(float(call.price or 0) for call in calls)
-
-            return {
-                "total_calls": total_calls,
-                "total_duration": total_duration,
-                "total_cost": total_cost,
-                "average_duration": (total_duration / total_calls) if total_calls > 0 else 0.0,
-                "average_cost": (total_cost / total_calls) if total_calls > 0 else 0.0
-            }
+            while page is not None:
+                for call in page:
+                    if call.parent_call_sid or call.status not in TERMINAL_STATUSES:
+                        continue
+                    totals["total_calls"] += 1
+                    totals["total_duration"] += int(call.duration or 0)
+                    totals["total_cost"] += float(call.price or 0)
+                page = await self._run("list_calls", page.next_page)
+            return totals
 
-        except TwilioRestException as e:
-            logger.error(f"Error fetching call metrics: {str(e)}")
-            raise Exception(f"Failed to fetch call metrics: {str(e)}")
+        except (TwilioRestException, asyncio.TimeoutError) as e:
+            logger.error(f"Error listing Twilio calls: {str(e)}")
+            raise Exception(f"Failed to list Twilio calls: {str(e)}")
 
 
 # Singleton instance
@@ -0,0 +1,101 @@
+# backend/app/services/twiml_templates.py
+
+import collections
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from twilio.twiml.voice_response import VoiceResponse, Connect, Stream
+
+from .prompt_service import prompt_service
+
+# Placeholder rendered into a template where a per-call value goes
+_SLOT = "__twiml_slot_{}__"
+_SLOT_PATTERN = re.compile(r"__twiml_slot_(\w+?)__")
+
+# Same escaping ElementTree applies to attribute values
+_ATTRIBUTE_ESCAPES = str.maketrans({
+    "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;",
+    "\n": "&#10;", "\r": "&#13;", "\t": "&#09;",
+})
+
+
+class TwimlTemplates:
+    """
+    Pre-rendered <Connect><Stream> TwiML for inbound and outbound calls.
+
+    The XML for a (direction, prompt id, stream URL) is rendered once with
+    the twilio library and split around its per-call values; answering a
+    call then only joins the pieces with the escaped CallSid and caller
+    number. Templates embed the system prompt, so they are dropped whenever
+    PromptService reports a prompt change.
+    """
+
+    def __init__(self, prompts=None, max_entries: int = 256):
+        self.prompts = prompts or prompt_service
+        self.max_entries = max(1, max_entries)
+        # (direction, prompt_id, stream_url) -> XML pieces alternating with slot names
+        self._templates: "collections.OrderedDict[Tuple[str, Optional[str], str], Tuple[str, ...]]" = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.prompts.add_listener(self.invalidate)
+
+    def render(self, direction: str, stream_url: str, prompt_id: Optional[str] = None, **values: Any) -> str:
+        """
+        TwiML connecting the call to stream_url with the system prompt for direction
+
+        Args:
+            direction: 'inbound' or 'outbound'
+            stream_url: WebSocket URL of the media stream
+            prompt_id: Optional ID for custom system prompt
+            values: Per-call stream parameters (inbound: call_sid, caller_number)
+        """
+        key = (direction, prompt_id, stream_url)
+        pieces = self._templates.get(key)
+        if pieces is None:
+            self.misses += 1
+            pieces = self._build(direction, prompt_id, stream_url)
+            self._templates[key] = pieces
+            while len(self._templates) > self.max_entries:
+                self._templates.popitem(last=False)
+        else:
+            self.hits += 1
+            self._templates.move_to_end(key)
+
+        if len(pieces) == 1:
+            return pieces[0]
+        out = [pieces[0]]
+        for index in range(1, len(pieces), 2):
+            value = values.get(pieces[index])
+            out.append("" if value is None else str(value).translate(_ATTRIBUTE_ESCAPES))
+            out.append(pieces[index + 1])
+        return "".join(out)
+
+    def invalidate(self) -> None:
+        """Drop every rendered template"""
+        self._templates.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"templates": len(self._templates), "hits": self.hits, "misses": self.misses}
+
+    def _build(self, direction: str, prompt_id: Optional[str], stream_url: str) -> Tuple[str, ...]:
+        system_prompt = self.prompts.get_system_prompt(direction, prompt_id)
+
+        twiml = VoiceResponse()
+        connect = Connect()
+        stream = Stream(url=stream_url)
+
+        # Pass parameters to the stream
+        if direction == "inbound":
+            stream.parameter(name="callSid", value=_SLOT.format("call_sid"))
+            stream.parameter(name="callerNumber", value=_SLOT.format("caller_number"))
+        else:
+            stream.parameter(name="callSid", value="{{CallSid}}")
+        stream.parameter(name="direction", value=direction)
+        stream.parameter(name="systemPrompt", value=system_prompt)
+
+        connect.append(stream)
+        twiml.append(connect)
+        return tuple(_SLOT_PATTERN.split(str(twiml)))
+
+
+twiml_templates = TwimlTemplates()
@@ -0,0 +1,15 @@
+# backend/tests/conftest.py
+
+import pytest
+
+from app.config import settings
+
+
+@pytest.fixture
+def sqlite_settings(tmp_path, monkeypatch):
+    """Local database in a fresh SQLite file, no external database"""
+    monkeypatch.setattr(settings, "db_backend", "sqlite")
+    monkeypatch.setattr(settings, "db_sqlite_path", str(tmp_path / "test.sqlite3"))
+    monkeypatch.setattr(settings, "use_external_db", False)
+    monkeypatch.setattr(settings, "mirror_spool_path", str(tmp_path / "mirror_spool.jsonl"))
+    monkeypatch.setattr(settings, "failover_replay_spool_path", str(tmp_path / "failover_replay.jsonl"))
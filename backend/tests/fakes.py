@@ -0,0 +1,57 @@
+# backend/tests/fakes.py
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def execute(self, query, params=()):
+        error = self.conn.errors.get(query)
+        if error:
+            raise error
+        self.conn.applied.append(query)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, applied, errors):
+        self.applied = applied
+        self.errors = errors
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    async def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool:
+    """Hands out one connection per acquire; errors maps a query to what executing it raises"""
+
+    def __init__(self):
+        self.applied = []
+        self.errors = {}
+        self.connections = []
+
+    def acquire(self):
+        pool = self
+
+        class Acquire:
+            async def __aenter__(self):
+                conn = FakeConnection(pool.applied, pool.errors)
+                pool.connections.append(conn)
+                return conn
+
+            async def __aexit__(self, *exc):
+                pass
+
+        return Acquire()
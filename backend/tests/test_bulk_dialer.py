@@ -0,0 +1,31 @@
+# backend/tests/test_bulk_dialer.py
+
+from app.config import settings
+from app.services.bulk_dialer import _Pacing
+
+
+class FixedMonitor:
+    def __init__(self, outbound, calls_per_minute):
+        self.outbound = outbound
+        self.calls_per_minute = calls_per_minute
+
+    def calculate_call_capacity(self):
+        return {"recommended_outbound_concurrent": self.outbound,
+                "recommended_calls_per_minute": self.calls_per_minute}
+
+
+def test_outbound_capacity_paces_call_starts(monkeypatch):
+    monkeypatch.setattr(settings, "twilio_calls_per_second", 10.0)
+    monkeypatch.setattr(settings, "bulk_dial_max_concurrency", 20)
+    monkeypatch.setattr(settings, "bulk_dial_capacity_refresh", 15.0)
+
+    # Headroom for 3 more live calls: 3 starts per 15s window, requests unbounded by it
+    limit, rate = _Pacing(FixedMonitor(3, 600)).capacity()
+    assert limit == 20
+    assert rate == 3 / 15.0
+
+    # Plenty of headroom: Twilio's own rate is the cap
+    assert _Pacing(FixedMonitor(1000, 6000)).capacity() == (20, 10.0)
+
+    # No headroom: trickle one call a minute
+    assert _Pacing(FixedMonitor(0, 0)).capacity() == (20, 1 / 60.0)
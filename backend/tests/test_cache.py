@@ -0,0 +1,116 @@
+# backend/tests/test_cache.py
+
+import asyncio
+
+from app.persistence.cache import QueryCache
+from app.security.user_cache import UserCache
+
+
+def test_waiters_load_again_when_the_shared_load_is_cancelled():
+    async def main():
+        cache = QueryCache()
+        key = cache.make_key("local", "SELECT * FROM calls", ())
+        release = asyncio.Event()
+        loads = []
+
+        async def loader():
+            loads.append(len(loads))
+            if len(loads) == 1:
+                await release.wait()
+            return [{"load": len(loads)}]
+
+        first = asyncio.create_task(cache.get_or_load(key, frozenset({"calls"}), 60, loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_load(key, frozenset({"calls"}), 60, loader))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        assert await waiter == [{"load": 2}]
+        assert first.cancelled()
+        assert loads == [0, 1]
+
+    asyncio.run(main())
+
+
+def test_user_waiters_load_again_when_the_shared_lookup_is_cancelled():
+    async def main():
+        cache = UserCache()
+        release = asyncio.Event()
+        lookups = []
+
+        async def loader(username):
+            lookups.append(username)
+            if len(lookups) == 1:
+                await release.wait()
+            return {"username": username}
+
+        first = asyncio.create_task(cache.get_or_load("admin", loader))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.get_or_load("admin", loader))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        assert await waiter == {"username": "admin"}
+        assert lookups == ["admin", "admin"]
+
+    asyncio.run(main())
+
+
+def test_writes_invalidate_the_tables_they_touch():
+    async def main():
+        cache = QueryCache()
+        loads = []
+
+        async def loader():
+            loads.append(1)
+            return [{"n": len(loads)}]
+
+        calls_key = cache.make_key("local", "SELECT * FROM calls", ())
+        users_key = cache.make_key("local", "SELECT * FROM users", ())
+        assert await cache.get_or_load(calls_key, frozenset({"calls"}), 60, loader) == [{"n": 1}]
+        assert await cache.get_or_load(users_key, frozenset({"users"}), 60, loader) == [{"n": 2}]
+        assert await cache.get_or_load(calls_key, frozenset({"calls"}), 60, loader) == [{"n": 1}]
+
+        seen = []
+        cache.add_listener(seen.append)
+        cache.invalidate(["calls"])
+        assert seen == [frozenset({"calls"})]
+        assert await cache.get_or_load(calls_key, frozenset({"calls"}), 60, loader) == [{"n": 3}]
+        assert await cache.get_or_load(users_key, frozenset({"users"}), 60, loader) == [{"n": 2}]
+        assert cache.stats()["invalidations"] == 1
+
+    asyncio.run(main())
+
+
+def test_read_overlapping_a_write_is_not_stored():
+    async def main():
+        cache = QueryCache()
+        key = cache.make_key("local", "SELECT * FROM calls", ())
+
+        async def stale_loader():
+            # A write lands while the rows are on their way back
+            cache.invalidate(["calls"])
+            return [{"status": "ringing"}]
+
+        async def loader():
+            return [{"status": "completed"}]
+
+        assert await cache.get_or_load(key, frozenset({"calls"}), 60, stale_loader) == [{"status": "ringing"}]
+        assert await cache.get_or_load(key, frozenset({"calls"}), 60, loader) == [{"status": "completed"}]
+
+    asyncio.run(main())
+
+
+def test_cached_rows_are_copies():
+    async def main():
+        cache = QueryCache()
+        key = cache.make_key("local", "SELECT * FROM calls WHERE id = %s", (1,))
+
+        async def loader():
+            return [{"status": "completed"}]
+
+        rows = await cache.get_or_load(key, frozenset({"calls"}), 60, loader)
+        rows[0]["status"] = "changed"
+        assert await cache.get_or_load(key, frozenset({"calls"}), 60, loader) == [{"status": "completed"}]
+
+    asyncio.run(main())
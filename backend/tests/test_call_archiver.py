@@ -0,0 +1,47 @@
+# backend/tests/test_call_archiver.py
+
+import asyncio
+from datetime import datetime
+
+from app.database import Database
+from app.persistence.migrator import MigrationRunner
+from app.services.call_archiver import CallArchiver
+
+
+def test_calls_move_to_the_archive_with_their_child_rows(sqlite_settings):
+    async def main():
+        database = Database()
+        await database.connect(start_jobs=False)
+        try:
+            assert await MigrationRunner(database).run(use_local=True)
+            for call_sid, start_time in (("CA1", "2020-01-01 10:00:00"), ("CA2", "2099-01-01 10:00:00")):
+                await database.execute(
+                    "INSERT INTO calls (call_sid, from_number, to_number, direction, status, start_time, transcription) "
+                    "VALUES (%s, '+1', '+2', 'outbound', 'completed', %s, 'agent: Hello')",
+                    (call_sid, start_time), use_local=True, mirror=False
+                )
+                await database.execute(
+                    "INSERT INTO call_actions (call_sid, action_type, action_data) VALUES (%s, 'search', '{}')",
+                    (call_sid,), use_local=True, mirror=False
+                )
+                await database.execute(
+                    "INSERT INTO call_analysis (call_sid, analysis) VALUES (%s, '{}')",
+                    (call_sid,), use_local=True, mirror=False
+                )
+
+            result = await CallArchiver(database, archive_after_days=0).run(cutoff=datetime(2021, 1, 1))
+            assert result["archived"] == 1
+
+            async def call_sids(table):
+                rows = await database.execute(f"SELECT call_sid FROM {table} ORDER BY call_sid", use_local=True)
+                return [row["call_sid"] for row in rows]
+
+            assert await call_sids("calls") == ["CA2"]
+            assert await call_sids("calls_archive") == ["CA1"]
+            for table in ("call_actions", "call_analysis"):
+                assert await call_sids(table) == ["CA2"], table
+                assert await call_sids(f"{table}_archive") == ["CA1"], table
+        finally:
+            await database.close()
+
+    asyncio.run(main())
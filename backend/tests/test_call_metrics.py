@@ -0,0 +1,39 @@
+# backend/tests/test_call_metrics.py
+
+import asyncio
+
+from app.database import Database
+from app.persistence.migrator import MigrationRunner
+from app.services.call_metrics import CallMetricsRollup
+
+
+def test_each_day_is_reconciled_by_one_worker(sqlite_settings):
+    async def main():
+        database = Database()
+        await database.connect(start_jobs=False)
+        try:
+            assert await MigrationRunner(database).run(use_local=True)
+            reconciled = []
+
+            def worker():
+                rollup = CallMetricsRollup(database)
+
+                async def reconcile(day):
+                    # Stands in for the Twilio call log fetch
+                    await asyncio.sleep(0.01)
+                    reconciled.append(day)
+                    return {"day": day.isoformat()}
+
+                rollup.reconcile = reconcile
+                return rollup
+
+            results = await asyncio.gather(*(worker().reconcile_recent(2) for _ in range(4)))
+            assert sum(len(result) for result in results) == 2
+            assert len(set(reconciled)) == 2
+
+            # Later in the same UTC day nobody takes the days again
+            assert await worker().reconcile_recent(2) == []
+        finally:
+            await database.close()
+
+    asyncio.run(main())
@@ -0,0 +1,167 @@
+# backend/tests/test_campaign_queue.py
+
+import asyncio
+
+from app.config import settings
+from app.database import Database
+from app.persistence.migrator import MigrationRunner
+from app.services.bulk_dialer import BulkDialer
+from app.services.campaign_queue import CampaignQueue
+
+
+class SlowDialer:
+    """Places each call `delay` seconds after the previous one"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def dial(self, numbers, from_number, ultravox_url=None, prompt_id=None, before_dial=None):
+        for index, number in enumerate(numbers):
+            await asyncio.sleep(self.delay)
+            if before_dial and not await before_dial(index):
+                yield {"index": index, "number": number, "status": "skipped"}
+                continue
+            yield {"index": index, "number": number, "status": "success", "call_sid": f"CA{index}"}
+
+
+class UnlimitedMonitor:
+    def calculate_call_capacity(self):
+        return {"recommended_outbound_concurrent": 100000, "recommended_calls_per_minute": 60000}
+
+
+class FakeTwilio:
+    """make_call runs `on_call(number)`, which may raise like TwilioService does"""
+
+    def __init__(self, on_call=None):
+        self.on_call = on_call
+        self.dialed = []
+
+    async def make_call(self, to_number, from_number, ultravox_url=None, prompt_id=None):
+        self.dialed.append(to_number)
+        if self.on_call:
+            await self.on_call(to_number)
+        return {"call_sid": f"CA{len(self.dialed)}"}
+
+
+async def target_statuses(database, campaign_id):
+    rows = await database.execute(
+        "SELECT status, lease_owner FROM campaign_targets WHERE campaign_id = %s ORDER BY position",
+        (campaign_id,)
+    )
+    return [(row["status"], row["lease_owner"]) for row in rows]
+
+
+def test_lease_outlives_a_slow_batch(sqlite_settings):
+    async def main():
+        database = Database()
+        await database.connect(start_jobs=False)
+        try:
+            assert await MigrationRunner(database).run(use_local=True)
+            queue = CampaignQueue(database, dialer=SlowDialer(0.1), batch_size=10, lease_seconds=0.3)
+            other_worker = CampaignQueue(database, dialer=SlowDialer(0), lease_seconds=0.3)
+            campaign = await queue.create([f"+1555000{i:04d}" for i in range(6)], "+15550000000")
+
+            batch = asyncio.create_task(queue.run_batch())
+            # Another worker sweeping for lost leases while the batch takes twice the lease
+            while not batch.done():
+                assert await other_worker.expire_leases() == 0
+                await asyncio.sleep(0.05)
+            assert await batch == 6
+
+            progress = await queue.progress(campaign["campaign_id"])
+            assert progress["targets"]["dialed"] == 6
+            assert progress["status"] == "completed"
+        finally:
+            await database.close()
+
+    asyncio.run(main())
+
+
+def test_crashed_lease_only_loses_the_target_in_flight(sqlite_settings):
+    async def main():
+        database = Database()
+        await database.connect(start_jobs=False)
+        try:
+            assert await MigrationRunner(database).run(use_local=True)
+            crashed = CampaignQueue(database, dialer=SlowDialer(0), lease_seconds=0.1)
+            campaign = await crashed.create([f"+1555000{i:04d}" for i in range(4)], "+15550000000")
+
+            # The worker leases the batch, starts its first call and dies
+            targets = await crashed.lease(campaign)
+            assert len(targets) == 4
+            assert await crashed._claim(campaign["campaign_id"], targets[0]["position"])
+            await asyncio.sleep(0.15)
+
+            other_worker = CampaignQueue(database, dialer=SlowDialer(0), lease_seconds=0.1)
+            assert await other_worker.expire_leases() == 1
+            assert await other_worker.run_batch() == 3
+
+            progress = await other_worker.progress(campaign["campaign_id"])
+            assert progress["targets"]["unknown"] == 1
+            assert progress["targets"]["dialed"] == 3
+            assert progress["status"] == "completed"
+        finally:
+            await database.close()
+
+    asyncio.run(main())
+
+
+def test_cancel_stops_leased_targets(sqlite_settings, monkeypatch):
+    monkeypatch.setattr(settings, "twilio_calls_per_second", 1000.0)
+    monkeypatch.setattr(settings, "bulk_dial_max_concurrency", 1)
+
+    async def main():
+        database = Database()
+        await database.connect(start_jobs=False)
+        try:
+            assert await MigrationRunner(database).run(use_local=True)
+
+            async def cancel_on_first_call(number):
+                await queue.cancel(campaign["campaign_id"])
+
+            twilio = FakeTwilio(cancel_on_first_call)
+            queue = CampaignQueue(database, dialer=BulkDialer(twilio=twilio, monitor=UnlimitedMonitor()))
+            campaign = await queue.create([f"+1555000{i:04d}" for i in range(5)], "+15550000000")
+
+            assert await queue.run_batch() == 1
+            assert twilio.dialed == ["+15550000000"]
+            statuses = await target_statuses(database, campaign["campaign_id"])
+            assert statuses[0][0] == "dialed"
+            # The rest were never dialed and are released, not left leased or in doubt
+            assert statuses[1:] == [("pending", None)] * 4
+            assert (await queue.progress(campaign["campaign_id"]))["status"] == "cancelled"
+        finally:
+            await database.close()
+
+    asyncio.run(main())
+
+
+def test_twilio_timeout_is_recorded_unknown(sqlite_settings, monkeypatch):
+    monkeypatch.setattr(settings, "twilio_calls_per_second", 1000.0)
+
+    async def main():
+        database = Database()
+        await database.connect(start_jobs=False)
+        try:
+            assert await MigrationRunner(database).run(use_local=True)
+
+            async def outcome(number):
+                if number.endswith("1"):
+                    # TwilioService.make_call wraps its errors, chaining the cause
+                    try:
+                        raise asyncio.TimeoutError("Twilio create call timed out after 10s")
+                    except asyncio.TimeoutError as e:
+                        raise Exception(f"Failed to initiate call: {e}") from e
+                if number.endswith("2"):
+                    raise Exception("Failed to initiate call: invalid number")
+
+            queue = CampaignQueue(database, dialer=BulkDialer(twilio=FakeTwilio(outcome), monitor=UnlimitedMonitor()))
+            campaign = await queue.create(["+15550000000", "+15550000001", "+15550000002"], "+15550000000")
+
+            assert await queue.run_batch() == 3
+            statuses = await target_statuses(database, campaign["campaign_id"])
+            assert [status for status, _ in statuses] == ["dialed", "unknown", "failed"]
+        finally:
+            await database.close()
+
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+# backend/tests/test_codec.py
+
+import pytest
+
+from app.persistence import codec
+from app.persistence.codec import FORMAT_RAW, FORMAT_ZLIB, compress_text, decompress_text
+from app.services.transcript_store import decode_transcription
+
+
+def test_short_text_is_stored_raw():
+    blob = compress_text("agent: Hello")
+    assert blob[0] == FORMAT_RAW
+    assert decompress_text(blob) == "agent: Hello"
+
+
+def test_long_text_round_trips_compressed(monkeypatch):
+    monkeypatch.setattr(codec, "_zstd_compressor", None)
+    text = "user: je voudrais un rendez-vous demain, merci\n" * 100
+    blob = compress_text(text)
+    assert blob[0] == FORMAT_ZLIB and len(blob) < len(text)
+    assert decompress_text(blob) == text
+    assert decompress_text(memoryview(blob)) == text
+
+
+def test_none_empty_and_unknown_formats():
+    assert compress_text(None) is None
+    assert decompress_text(None) is None
+    assert decompress_text(compress_text("")) == ""
+    with pytest.raises(ValueError):
+        decompress_text(bytes([99]) + b"x")
+
+
+def test_decode_transcription_prefers_the_compressed_column():
+    row = {"transcription": "old", "transcription_z": compress_text("new")}
+    assert decode_transcription(row) == "new"
+    assert "transcription_z" not in row
+    assert decode_transcription({"transcription": "plain", "transcription_z": None}) == "plain"
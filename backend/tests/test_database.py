@@ -0,0 +1,88 @@
+# backend/tests/test_database.py
+
+import asyncio
+
+from app.database import Database
+from app.security.token_cache import token_cache
+
+
+def test_connect_starts_and_close_stops_revocation_reload(sqlite_settings):
+    async def main():
+        database = Database()
+        await database.connect()
+        try:
+            assert token_cache.database is database
+            assert token_cache._task is not None and not token_cache._task.done()
+        finally:
+            await database.close()
+        assert token_cache._task is None
+
+    asyncio.run(main())
+
+
+def test_connect_starts_and_close_stops_service_jobs(sqlite_settings, monkeypatch):
+    from app.services.call_archiver import call_archiver
+    from app.services.call_metrics import call_metrics_rollup
+    from app.services.campaign_queue import campaign_queue
+    from app.services.log_retention import log_retention
+
+    async def main():
+        database = Database()
+        jobs = (log_retention, campaign_queue, call_metrics_rollup, call_archiver)
+        for job in jobs:
+            monkeypatch.setattr(job, "database", database)
+        await database.connect()
+        try:
+            for job in jobs:
+                assert job._task is not None and not job._task.done(), job
+        finally:
+            await database.close()
+        for job in jobs:
+            assert job._task is None, job
+
+    asyncio.run(main())
+
+
+def test_one_off_connect_starts_no_service_jobs(sqlite_settings, monkeypatch):
+    from app.services.log_retention import log_retention
+
+    async def main():
+        database = Database()
+        monkeypatch.setattr(log_retention, "database", database)
+        await database.connect(start_jobs=False)
+        try:
+            assert log_retention._task is None
+        finally:
+            await database.close()
+
+    asyncio.run(main())
+
+
+def test_close_writes_queued_status_callbacks(sqlite_settings, monkeypatch):
+    from app.persistence.migrator import MigrationRunner
+    from app.services.status_callbacks import status_callbacks
+
+    async def main():
+        database = Database()
+        monkeypatch.setattr(status_callbacks, "database", database)
+        await database.connect(start_jobs=False)
+        try:
+            assert await MigrationRunner(database).run(use_local=True)
+            await database.execute(
+                "INSERT INTO calls (call_sid, from_number, to_number, direction, status, start_time) "
+                "VALUES ('CA1', '+1', '+2', 'outbound', 'initiated', '2024-01-02 10:00:00')",
+                use_local=True, mirror=False
+            )
+            status_callbacks.submit({"CallSid": "CA1", "CallStatus": "ringing"})
+        finally:
+            await database.close()
+        assert status_callbacks._task is None
+
+        await database.connect(start_jobs=False)
+        try:
+            rows = await database.execute("SELECT status FROM calls WHERE call_sid = 'CA1'", use_local=True)
+            assert rows[0]["status"] == "ringing"
+        finally:
+            await database.close()
+
+    asyncio.run(main())
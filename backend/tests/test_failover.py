@@ -0,0 +1,66 @@
+# backend/tests/test_failover.py
+
+import asyncio
+from types import SimpleNamespace
+
+from app.persistence.failover import FailoverMonitor
+from app.persistence.mirror import MirrorQueue
+
+from fakes import FakePool
+
+
+class ExternalPool(FakePool):
+    async def clear(self):
+        pass
+
+
+def make_monitor():
+    database = SimpleNamespace(pool=ExternalPool(), local_pool=object())
+    replay = MirrorQueue(maxsize=100, batch_size=10, flush_interval=1, spool_path="",
+                         autoflush=False, drop_rejected=False)
+    monitor = FailoverMonitor(database, probe_interval=1, probe_timeout=1, failure_threshold=1,
+                              recovery_threshold=1, replay=replay)
+    monitor._activate("test")
+    return monitor, database.pool
+
+
+def test_fail_back_waits_for_writes_in_flight():
+    async def main():
+        monitor, external = make_monitor()
+        monitor.record_write([("before", ())])
+        monitor.write_started()
+
+        fail_back = asyncio.create_task(monitor._fail_back())
+        await asyncio.sleep(0.01)
+        assert monitor.active
+
+        # The write sent during the outage finishes while fail back is under way
+        monitor.record_write([("in flight", ())])
+        monitor.write_finished()
+        await fail_back
+
+        assert not monitor.active
+        assert external.applied == ["before", "in flight"]
+
+    asyncio.run(main())
+
+
+def test_rejected_replay_keeps_traffic_local():
+    async def main():
+        monitor, external = make_monitor()
+        monitor.record_write([("one", ())])
+        monitor.record_write([("bad", ())])
+        monitor.record_write([("three", ())])
+        external.errors["bad"] = ValueError("duplicate entry")
+
+        await monitor._fail_back()
+        assert monitor.active
+        assert external.applied == ["one"]
+        assert monitor.replay.stats()["pending"] == 2
+
+        del external.errors["bad"]
+        await monitor._fail_back()
+        assert not monitor.active
+        assert external.applied == ["one", "bad", "three"]
+
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+# backend/tests/test_migrator.py
+
+import asyncio
+import os
+
+from app.database import Database
+from app.persistence.migrator import MIGRATIONS, MIGRATIONS_DIR, SUPERSEDED_CHECKSUMS, MigrationRunner, file_checksum
+
+
+def run_with_database(test):
+    async def main():
+        database = Database()
+        await database.connect()
+        try:
+            return await test(database)
+        finally:
+            await database.close()
+
+    return asyncio.run(main())
+
+
+async def ledger(database):
+    rows = await database.execute("SELECT version, checksum FROM schema_migrations", use_local=True)
+    return {row["version"]: row["checksum"] for row in rows}
+
+
+async def columns(database, table):
+    rows = await database.execute(f"SELECT name FROM pragma_table_info('{table}')", use_local=True)
+    return {row["name"] for row in rows}
+
+
+def test_manifest_files_exist():
+    for filename, scope in MIGRATIONS:
+        assert scope in ("local", "all")
+        assert os.path.exists(os.path.join(MIGRATIONS_DIR, filename)), filename
+
+
+def test_full_manifest_applies_to_fresh_sqlite(sqlite_settings):
+    async def test(database):
+        assert await MigrationRunner(database).run(use_local=True)
+
+        applied = await ledger(database)
+        assert set(applied) == {filename for filename, _ in MIGRATIONS}
+        for filename, _ in MIGRATIONS:
+            assert applied[filename] == file_checksum(os.path.join(MIGRATIONS_DIR, filename))
+
+        assert {"serp_api_key", "google_search_cx"} <= await columns(database, "service_connections")
+        assert {"system_prompt", "transcription_z", "rollup_counted"} <= await columns(database, "calls")
+        assert "transcription_z" in await columns(database, "call_transcriptions")
+        for table in ("system_monitor_logs", "calls_archive", "revoked_tokens", "campaign_targets", "call_metrics_daily"):
+            assert await columns(database, table), table
+        assert {"id", "name", "phone_number", "email", "address"} <= await columns(database, "clients")
+
+        # Current databases cost one ledger read and apply nothing
+        assert await MigrationRunner(database).run(use_local=True)
+
+    run_with_database(test)
+
+
+def test_existing_schema_without_ledger_is_adopted(sqlite_settings):
+    async def test(database):
+        assert await MigrationRunner(database).run(use_local=True)
+        await database.execute("DROP TABLE schema_migrations", use_local=True, mirror=False)
+
+        assert await MigrationRunner(database).run(use_local=True)
+        assert set(await ledger(database)) == {filename for filename, _ in MIGRATIONS}
+
+    run_with_database(test)
+
+
+def test_superseded_checksum_is_replaced(sqlite_settings):
+    version = "add_call_features_tables.sql"
+    old_checksum = next(iter(SUPERSEDED_CHECKSUMS[version]))
+
+    async def test(database):
+        assert await MigrationRunner(database).run(use_local=True)
+        await database.execute(
+            "UPDATE schema_migrations SET checksum = %s WHERE version = %s",
+            (old_checksum, version), use_local=True, mirror=False
+        )
+
+        assert await MigrationRunner(database).run(use_local=True)
+        assert (await ledger(database))[version] == file_checksum(os.path.join(MIGRATIONS_DIR, version))
+
+    run_with_database(test)
+
+
+def test_failed_migration_stops_the_run(sqlite_settings, tmp_path):
+    migrations_dir = tmp_path / "migrations"
+    migrations_dir.mkdir()
+    (migrations_dir / "one.sql").write_text("CREATE TABLE one (id INT);")
+    (migrations_dir / "two.sql").write_text("ALTER TABLE missing ADD COLUMN x INT;")
+    (migrations_dir / "three.sql").write_text("CREATE TABLE three (id INT);")
+    manifest = [("one.sql", "all"), ("two.sql", "all"), ("three.sql", "all")]
+
+    async def test(database):
+        assert not await MigrationRunner(database, str(migrations_dir), manifest).run(use_local=True)
+        assert set(await ledger(database)) == {"one.sql"}
+
+    run_with_database(test)
+
+
+def test_archived_calls_are_backfilled_once(sqlite_settings):
+    backfill = ("backfill_call_metrics_archive.sql", "all")
+    before_backfill = MIGRATIONS[:MIGRATIONS.index(backfill)]
+
+    async def test(database):
+        assert await MigrationRunner(database, manifest=before_backfill).run(use_local=True)
+        for id, status, cost in ((1, "completed", "0.5"), (2, "no-answer", "0.25"), (3, "ringing", "1")):
+            await database.execute(
+                "INSERT INTO calls_archive (id, call_sid, from_number, to_number, direction, status, "
+                "start_time, duration, cost, ultravox_cost) VALUES (%s, %s, '+1', '+2', 'outbound', %s, %s, 60, %s, 0.1)",
+                (id, f"CA{id}", status, "2024-01-02 10:00:00", cost), use_local=True, mirror=False
+            )
+
+        assert await MigrationRunner(database).run(use_local=True)
+        # Re-adopting the schema must not count the archived calls again
+        await database.execute("DROP TABLE schema_migrations", use_local=True, mirror=False)
+        assert await MigrationRunner(database).run(use_local=True)
+        # Nor re-running it after a crash between adding the totals and marking the calls
+        await database.execute("UPDATE calls_archive SET rollup_counted = FALSE", use_local=True, mirror=False)
+        await database.execute(
+            "DELETE FROM schema_migrations WHERE version = %s", (backfill[0],), use_local=True, mirror=False
+        )
+        assert await MigrationRunner(database).run(use_local=True)
+
+        rows = await database.execute("SELECT * FROM call_metrics_daily", use_local=True)
+        assert len(rows) == 1
+        assert rows[0]["total_calls"] == 2
+        assert rows[0]["total_duration"] == 120
+        assert float(rows[0]["total_cost"]) == 0.75
+
+    run_with_database(test)
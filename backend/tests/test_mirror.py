@@ -0,0 +1,149 @@
+# backend/tests/test_mirror.py
+
+import asyncio
+
+import pytest
+
+from app.persistence import mirror
+from app.persistence.mirror import MirrorQueue
+
+from fakes import FakePool
+
+
+def make_queue(pool):
+    queue = MirrorQueue(maxsize=100, batch_size=10, flush_interval=1, spool_path="", autoflush=False)
+    queue.pool = pool
+    return queue
+
+
+def test_connection_lost_mid_batch_keeps_the_rest_in_order():
+    async def main():
+        pool = FakePool()
+        queue = make_queue(pool)
+        for query in ("one", "two", "three"):
+            queue.enqueue([(query, ())])
+        pool.errors["two"] = ConnectionError("server went away")
+
+        assert not await queue.flush()
+        assert pool.applied == ["one"]
+        assert pool.connections[0].closed
+        assert queue.stats()["pending"] == 2
+        assert queue.failed == 0
+
+        del pool.errors["two"]
+        assert await queue.flush()
+        assert pool.applied == ["one", "two", "three"]
+        assert queue.stats()["pending"] == 0
+
+    asyncio.run(main())
+
+
+def test_rejected_statement_is_dropped_and_counted():
+    async def main():
+        pool = FakePool()
+        queue = make_queue(pool)
+        for query in ("one", "bad", "three"):
+            queue.enqueue([(query, ())])
+        pool.errors["bad"] = ValueError("syntax error")
+
+        assert await queue.flush()
+        assert pool.applied == ["one", "three"]
+        assert queue.failed == 1
+        assert queue.stats()["pending"] == 0
+
+    asyncio.run(main())
+
+
+def spooled_queue(path, pool=None, maxsize=100):
+    queue = MirrorQueue(maxsize=maxsize, batch_size=2, flush_interval=1, spool_path=str(path), autoflush=False)
+    return queue, pool or FakePool()
+
+
+def crash(queue):
+    # The process dies: nothing is flushed, recorded or cleaned up
+    queue._spool.close()
+    queue._head_file.close()
+
+
+def test_spooled_writes_survive_a_crash(tmp_path):
+    async def main():
+        queue, pool = spooled_queue(tmp_path / "spool.jsonl")
+        await queue.start(pool)
+        for query in ("one", "two", "three"):
+            assert queue.enqueue([(query, ())])
+        assert await queue.flush()
+        assert pool.applied == ["one", "two"]
+        crash(queue)
+
+        restarted, pool = spooled_queue(tmp_path / "spool.jsonl")
+        await restarted.start(pool)
+        # Only what was not applied yet comes back
+        assert restarted.stats()["pending"] == 1
+        assert await restarted.flush()
+        assert pool.applied == ["three"]
+        await restarted.close()
+        assert (tmp_path / "spool.jsonl").stat().st_size == 0
+
+    asyncio.run(main())
+
+
+def test_full_queue_overflows_to_disk_in_order(tmp_path):
+    async def main():
+        queue, pool = spooled_queue(tmp_path / "spool.jsonl", maxsize=2)
+        await queue.start(pool)
+        queries = [f"q{i}" for i in range(7)]
+        for query in queries:
+            assert queue.enqueue([(query, ())])
+        assert queue.stats()["pending"] == 7
+        assert queue.stats()["on_disk"] == 5
+        assert queue.dropped == 0
+
+        # New writes queue behind the ones on disk
+        assert await queue.flush()
+        queue.enqueue([("q7", ())])
+        while queue.stats()["pending"]:
+            assert await queue.flush()
+        assert pool.applied == queries + ["q7"]
+        await queue.close()
+
+    asyncio.run(main())
+
+
+def test_applied_head_of_the_spool_is_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(mirror, "SPOOL_COMPACT_BYTES", 1)
+
+    async def main():
+        queue, pool = spooled_queue(tmp_path / "spool.jsonl", maxsize=3)
+        await queue.start(pool)
+        for i in range(6):
+            queue.enqueue([(f"q{i}", ())])
+        assert await queue.flush()
+        assert await queue.flush()
+        assert "q3" not in (tmp_path / "spool.jsonl").read_text()
+        crash(queue)
+
+        restarted, pool = spooled_queue(tmp_path / "spool.jsonl")
+        await restarted.start(pool)
+        while restarted.stats()["pending"]:
+            assert await restarted.flush()
+        assert pool.applied == ["q4", "q5"]
+        await restarted.close()
+
+    asyncio.run(main())
+
+
+@pytest.mark.skipif(mirror.fcntl is None, reason="spool locking needs fcntl")
+def test_each_process_gets_its_own_spool(tmp_path):
+    async def main():
+        first, _ = spooled_queue(tmp_path / "spool.jsonl")
+        second, _ = spooled_queue(tmp_path / "spool.jsonl")
+        await first.start(None)
+        await second.start(None)
+        first.enqueue([("first", ())])
+        second.enqueue([("second", ())])
+        assert (tmp_path / "spool.jsonl").read_text().count("first") == 1
+        assert (tmp_path / "spool.jsonl.1").read_text().count("second") == 1
+        await first.close()
+        await second.close()
+
+    asyncio.run(main())
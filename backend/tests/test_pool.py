@@ -0,0 +1,38 @@
+# backend/tests/test_pool.py
+
+import asyncio
+
+from app.persistence.pool import PoolSizer
+
+
+class IdlePool:
+    """Sizes only: the sizer must not acquire or close connections"""
+
+    def __init__(self, size):
+        self.size = size
+        self.freesize = size
+        self._minsize = size
+
+
+def test_resize_only_moves_the_pools_minsize():
+    async def main():
+        pool = IdlePool(2)
+        sizer = PoolSizer("test", pool, minsize=2, maxsize=10, target_wait=0.01, resize_interval=1)
+
+        sizer.begin_wait()
+        sizer.end_wait(0.5)
+        await sizer.resize()
+        assert sizer.target == 3 and pool._minsize == 3
+
+        sizer.begin_wait()
+        await sizer.resize()
+        assert pool._minsize == 5
+
+        # Idle again: back down towards the peak, never below minsize
+        sizer.end_wait(None)
+        for _ in range(5):
+            await sizer.resize()
+        assert pool._minsize == 2
+        assert pool.size == 2 and pool.freesize == 2
+
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+# backend/tests/test_router.py
+
+from app.persistence.router import normalize_statement, parse_statement
+
+
+def test_reads_and_writes():
+    read = parse_statement("SELECT c.id FROM calls c JOIN call_actions a ON a.call_sid = c.call_sid WHERE c.id = %s")
+    assert (read.verb, read.intent, read.writes) == ("select", "read", False)
+    assert read.tables == {"calls", "call_actions"}
+
+    write = parse_statement("UPDATE calls SET status = %s WHERE call_sid = %s")
+    assert (write.verb, write.intent, write.writes) == ("update", "write", True)
+    assert write.tables == {"calls"}
+
+
+def test_locking_reads_are_writes():
+    info = parse_statement("SELECT id FROM campaign_targets WHERE status = 'pending' LIMIT 10 FOR UPDATE SKIP LOCKED")
+    assert info.writes and info.intent == "write"
+
+
+def test_auth_tables_win_over_read_and_write():
+    assert parse_statement("SELECT * FROM users WHERE username = %s").intent == "auth"
+    assert parse_statement("INSERT INTO revoked_tokens (token_digest) VALUES (%s)").intent == "auth"
+    assert parse_statement("SELECT * FROM `app`.`users`").tables == {"users"}
+
+
+def test_cte_verb_and_keywords_in_literals():
+    assert parse_statement("WITH recent AS (SELECT id FROM calls) SELECT * FROM recent").verb == "select"
+    info = parse_statement("SELECT id FROM calls WHERE note = 'update users set x' -- delete from users")
+    assert info.tables == {"calls"} and info.intent == "read"
+
+
+def test_fingerprint_collapses_literals_and_lists():
+    assert normalize_statement("SELECT * FROM calls WHERE id IN (%s, %s, %s) AND status = 'done'") == \
+        normalize_statement("select *  from calls where id in (%s, %s) and status = 'busy'")
+    assert normalize_statement("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)") == \
+        normalize_statement("INSERT INTO t (a, b) VALUES (%s, %s)")
+    assert normalize_statement("SELECT * FROM calls LIMIT 50") == "select * from calls limit ?"
+
+
+def test_keywords_that_name_no_table():
+    upsert = parse_statement(
+        "INSERT INTO call_metrics_daily (day, total_calls) VALUES (%s, %s)\n"
+        "ON DUPLICATE KEY\n    UPDATE total_calls = total_calls + VALUES(total_calls), status = VALUES(status)"
+    )
+    assert upsert.tables == {"call_metrics_daily"}
+
+    for lock in ("FOR UPDATE", "FOR UPDATE SKIP LOCKED", "FOR  UPDATE NOWAIT", "FOR UPDATE OF campaign_targets"):
+        info = parse_statement(f"SELECT position FROM campaign_targets WHERE status = 'pending' {lock}")
+        assert info.tables == {"campaign_targets"}, lock
+        assert info.writes
+
+    functions = parse_statement(
+        "SELECT EXTRACT(YEAR FROM start_time) AS year, TRIM(LEADING '0' FROM phone_number), "
+        "SUBSTRING(call_sid FROM 3 FOR 8) FROM calls WHERE EXTRACT(MONTH FROM created_at) = %s"
+    )
+    assert functions.tables == {"calls"}
+
+    # A real subquery inside a function call still counts
+    nested = parse_statement("SELECT TRIM((SELECT name FROM clients LIMIT 1)) FROM calls")
+    assert nested.tables == {"clients", "calls"}
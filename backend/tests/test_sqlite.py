@@ -0,0 +1,69 @@
+# backend/tests/test_sqlite.py
+
+import asyncio
+
+from app.persistence.sqlite import create_pool, translate
+
+
+def test_dml_rewrites():
+    assert translate("INSERT IGNORE INTO t (a) VALUES (%s)") == ("INSERT OR IGNORE INTO t (a) VALUES (?)",)
+    assert translate(
+        "INSERT INTO t (k, n) VALUES (%s, %s) ON DUPLICATE KEY UPDATE n = n + VALUES(n)"
+    ) == ("INSERT INTO t (k, n) VALUES (?, ?) ON CONFLICT DO UPDATE SET n = n + excluded.n",)
+    assert translate("SELECT GREATEST(a, NOW()) FROM t WHERE b = %(b)s FOR UPDATE SKIP LOCKED") == \
+        ("SELECT MAX(a, datetime('now', 'localtime')) FROM t WHERE b = :b",)
+    delete, = translate("DELETE FROM logs WHERE created_at < %s ORDER BY id LIMIT 100")
+    assert delete.startswith("DELETE FROM logs WHERE rowid IN (SELECT rowid FROM logs WHERE created_at < ?")
+
+
+def test_create_table_ddl():
+    create, index = translate("""
+        CREATE TABLE IF NOT EXISTS t (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            kind ENUM('a', 'b') NOT NULL COMMENT 'Kind',
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            UNIQUE KEY unique_kind (kind),
+            INDEX idx_created (created_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+    assert "INTEGER PRIMARY KEY AUTOINCREMENT" in create
+    assert "kind TEXT NOT NULL," in create and "COMMENT" not in create and "ENGINE" not in create
+    assert "UNIQUE (kind)" in create
+    assert index == "CREATE INDEX IF NOT EXISTS t_idx_created ON t (created_at)"
+
+
+def test_alter_table_ddl():
+    assert translate(
+        "ALTER TABLE t ADD COLUMN note TEXT COMMENT 'x' AFTER kind, ADD INDEX idx_note (note), MODIFY COLUMN kind TEXT NULL"
+    ) == (
+        "ALTER TABLE t ADD COLUMN note TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_note ON t (note)",
+        "ALTER TABLE t MODIFY COLUMN kind TEXT NULL",
+    )
+    assert translate("DROP INDEX idx_note ON t") == ("DROP INDEX IF EXISTS idx_note",)
+
+
+def test_modify_column_rebuilds_the_table(tmp_path):
+    async def main():
+        pool = await create_pool(str(tmp_path / "test.sqlite3"))
+        try:
+            async with pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("CREATE TABLE t (id INT AUTO_INCREMENT PRIMARY KEY, body JSON NOT NULL, tag INT)")
+                    await cursor.execute("CREATE INDEX idx_tag ON t (tag)")
+                    await cursor.execute("INSERT INTO t (body, tag) VALUES (%s, %s)", ("[]", 7))
+
+                    await cursor.execute("ALTER TABLE t MODIFY COLUMN body JSON NULL COMMENT 'Now optional'")
+                    await cursor.execute("INSERT INTO t (body, tag) VALUES (NULL, 8)")
+                    await cursor.execute("SELECT id, body, tag FROM t ORDER BY id")
+                    assert await cursor.fetchall() == [(1, "[]", 7), (2, None, 8)]
+                    await cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 't'")
+                    assert ("idx_tag",) in await cursor.fetchall()
+
+                    # Same definition again: nothing to rebuild
+                    await cursor.execute("ALTER TABLE t MODIFY COLUMN body JSON NULL")
+        finally:
+            pool.close()
+            await pool.wait_closed()
+
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+# backend/tests/test_token_cache.py
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from jose import jwt
+
+from app.database import Database
+from app.persistence.migrator import MigrationRunner
+from app.security import token_cache as token_cache_module
+from app.security.token_cache import TokenCache, token_digest
+
+SECRET = "test-secret"
+
+
+class AheadClock(datetime):
+    """The app server's clock two hours ahead of the database's"""
+
+    fromtimestamp = datetime.fromtimestamp
+
+    @classmethod
+    def now(cls, tz=None):
+        return datetime.now(tz) + timedelta(hours=2)
+
+
+def test_revocation_reaches_other_workers_whatever_the_database_clock(sqlite_settings, monkeypatch):
+    monkeypatch.setattr(token_cache_module, "datetime", AheadClock)
+
+    async def main():
+        database = Database()
+        await database.connect(start_jobs=False)
+        try:
+            assert await MigrationRunner(database).run(use_local=True)
+            worker, other_worker = TokenCache(database=database), TokenCache(database=database)
+            assert await other_worker.load_revocations() == 0
+
+            token = jwt.encode({"sub": "user", "exp": int(time.time()) + 86400}, SECRET, algorithm="HS256")
+            assert await worker.revoke(token, SECRET, ["HS256"])
+
+            assert await other_worker.load_revocations() == 1
+            assert token_digest(token) in other_worker.revoked
+        finally:
+            await database.close()
+
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+# backend/tests/test_transcript_store.py
+
+import asyncio
+
+from app.database import Database
+from app.persistence.migrator import MigrationRunner
+from app.services.transcript_store import TranscriptStore
+
+
+def test_transcripts_round_trip_compressed(sqlite_settings):
+    messages = [{"role": "agent", "text": "Hello"}, {"role": "user", "text": "Bonjour, ça va ?"}]
+
+    async def main():
+        database = Database()
+        await database.connect(start_jobs=False)
+        try:
+            assert await MigrationRunner(database).run(use_local=True)
+            await database.execute(
+                "INSERT INTO calls (call_sid, from_number, to_number, direction, status, start_time) "
+                "VALUES ('CA1', '+1', '+2', 'outbound', 'completed', '2024-01-02 10:00:00')",
+                use_local=True, mirror=False
+            )
+            store = TranscriptStore(database)
+
+            await store.save_transcript_messages("CA1", messages)
+            await store.save_transcript_messages("CA1", messages[:1])
+            assert await store.get_transcript_messages("CA1") == messages[:1]
+            assert await store.get_transcript_messages("CA2") is None
+
+            await store.save_call_transcription("CA1", "agent: Hello")
+            assert await store.get_call_transcription("CA1") == "agent: Hello"
+
+            row = await database.fetch_one("SELECT transcription, transcription_z FROM calls WHERE call_sid = 'CA1'")
+            assert row["transcription"] is None and row["transcription_z"]
+        finally:
+            await database.close()
+
+    asyncio.run(main())